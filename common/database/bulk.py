@@ -0,0 +1,143 @@
+"""
+Массовая выгрузка и загрузка заказов через COPY в бинарном формате.
+
+Работает напрямую с соединением asyncpg из пула движка: без компиляции запросов
+SQLAlchemy и без создания строк или объектов на каждую запись.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Tuple, Union
+
+import asyncpg
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from common.database.coalescing import single_flight
+from common.database.connection import engine, replica_router
+from common.database.crud import ORDER_STATS_SUMMARY, order_crud
+from common.models.models import Order
+from common.monitoring.metrics import DB_COPY_ROWS
+from common.monitoring.timing import phase
+
+# Сколько фрагментов COPY выгрузка может прочитать из БД впрок, пока клиент не забрал предыдущие
+COPY_QUEUE_SIZE = int(os.getenv("COPY_QUEUE_SIZE", "16"))
+
+ORDER_TABLE = Order.__tablename__
+# Выгрузка и восстановление из выгрузки - все колонки, вместе с ID
+ORDER_COPY_COLUMNS = [column.name for column in Order.__table__.columns]
+# Загрузка новых заказов: ID назначает последовательность
+ORDER_IMPORT_COLUMNS = ["user_id", "product_name", "price", "created_at"]
+
+# Запись загрузки: (user_id, product_name, price, created_at); created_at=None - время транзакции
+OrderRecord = Tuple[int, str, Decimal, Optional[datetime]]
+
+# После восстановления с ID последовательность должна выдавать ID больше загруженных
+_SYNC_ORDER_ID_SQL = (
+    f"SELECT setval(pg_get_serial_sequence('{ORDER_TABLE}', 'id'), "
+    f"(SELECT coalesce(max(id), 0) + 1 FROM {ORDER_TABLE}), false)"
+)
+# COPY не обновляет сводку заказов построчно, поэтому после загрузки она пересчитывается целиком
+_REBUILD_STATS_SQL = str(
+    order_crud.rebuild_stats_statement().compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+)
+
+
+@asynccontextmanager
+async def raw_connection(source: AsyncEngine = engine) -> AsyncIterator[asyncpg.Connection]:
+    """Соединение asyncpg из пула движка; по выходу возвращается в пул"""
+    async with source.connect() as conn:
+        raw = await conn.get_raw_connection()
+        yield raw.driver_connection
+
+
+def _copied_rows(status: str) -> int:
+    """Число строк из статуса команды: 'COPY 123'"""
+    return int(status.split()[-1])
+
+
+async def export_orders_binary() -> AsyncIterator[bytes]:
+    """Выгрузка всех заказов потоком фрагментов COPY BINARY (формат PGCOPY), читается с реплики,
+    если она доступна. Если клиент перестал читать, COPY отменяется"""
+    queue: asyncio.Queue = asyncio.Queue(COPY_QUEUE_SIZE)
+
+    async def copy():
+        try:
+            async with raw_connection(replica_router.read_engine()) as conn:
+                status = await conn.copy_from_table(
+                    ORDER_TABLE, columns=ORDER_COPY_COLUMNS, output=queue.put, format="binary"
+                )
+            DB_COPY_ROWS.labels("out").inc(_copied_rows(status))
+            await queue.put(None)
+        except Exception as e:
+            await queue.put(e)
+
+    task = asyncio.create_task(copy())
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+async def _copy_in(copy, after: Optional[str] = None) -> int:
+    """COPY в одной транзакции: либо загружаются все строки, либо ни одной.
+    Нарушения ограничений и неверные данные - ValueError"""
+    async with raw_connection() as conn:
+        try:
+            with phase("sql"):
+                async with conn.transaction():
+                    status = await copy(conn)
+                    if after:
+                        await conn.execute(after)
+                    if ORDER_STATS_SUMMARY:
+                        await conn.execute(_REBUILD_STATS_SQL)
+        except (asyncpg.IntegrityConstraintViolationError, asyncpg.DataError) as e:
+            raise ValueError(f"Загрузка отменена: {e}")
+    single_flight.note_write()
+    # Чтения сразу после загрузки - с основного сервера, пока реплики догоняют
+    replica_router.note_write()
+    rows = _copied_rows(status)
+    DB_COPY_ROWS.labels("in").inc(rows)
+    return rows
+
+
+async def _with_created_at(records: Union[Iterable[OrderRecord], AsyncIterable[OrderRecord]],
+                           now: datetime) -> AsyncIterator[OrderRecord]:
+    """Записи загрузки с временем создания по умолчанию, как у INSERT"""
+    if not hasattr(records, "__aiter__"):
+        for user_id, product_name, price, created_at in records:
+            yield user_id, product_name, price, created_at or now
+        return
+    async for user_id, product_name, price, created_at in records:
+        yield user_id, product_name, price, created_at or now
+
+
+async def import_orders(records: Union[Iterable[OrderRecord], AsyncIterable[OrderRecord]]) -> int:
+    """Загрузить новые заказы одной командой COPY BINARY; возвращает число строк.
+    Заказ несуществующего пользователя отменяет всю загрузку"""
+    async def copy(conn: asyncpg.Connection) -> str:
+        # Время транзакции - то же значение, что дает now() в INSERT
+        now = await conn.fetchval("SELECT localtimestamp")
+        return await conn.copy_records_to_table(
+            ORDER_TABLE, records=_with_created_at(records, now), columns=ORDER_IMPORT_COLUMNS
+        )
+
+    return await _copy_in(copy)
+
+
+async def restore_orders_binary(chunks: AsyncIterable[bytes]) -> int:
+    """Загрузить заказы вместе с ID из потока, полученного export_orders_binary; возвращает число строк"""
+    async def copy(conn: asyncpg.Connection) -> str:
+        return await conn.copy_to_table(
+            ORDER_TABLE, source=chunks, columns=ORDER_COPY_COLUMNS, format="binary"
+        )
+
+    return await _copy_in(copy, after=_SYNC_ORDER_ID_SQL)
@@ -0,0 +1,127 @@
+"""
+Объединение одинаковых одновременных чтений (single-flight).
+
+Пока запрос выполняется, такие же запросы (тот же тип, параметры и узел БД) не идут в БД,
+а ждут его результат. Объединяются только чтения строк Core (Row, кортежи): они не привязаны
+к сессии, и один результат можно отдать нескольким обработчикам. Результат только для чтения.
+
+Типы запросов - имена методов CRUD без get_ (all_rows, row_by_id, ...), включаются через
+DB_COALESCE через запятую или all. По умолчанию - списки и агрегаты по всей таблице: они
+дорогие, одинаковы у всех клиентов, и на них приходится основная нагрузка. Для запросов
+по ключу под нагрузкой совпадений меньше.
+
+Read-your-writes: после записи в этом процессе (note_write) новые чтения не присоединяются
+к запросам, начатым до нее.
+"""
+import asyncio
+import functools
+import os
+from dataclasses import astuple, is_dataclass
+from typing import Awaitable, Callable, Dict, Hashable
+
+from common.database.deadline import DeadlineExceeded
+from common.monitoring.metrics import DB_COALESCED_READS
+
+COALESCE_QUERIES = {
+    "all_rows", "all_rows_versioned", "all_version", "row_by_id", "row_by_id_versioned", "version",
+    "rows_by_user_id",
+    "user_orders", "user_orders_version", "user_stats", "top_users", "daily_stats",
+}
+_setting = os.getenv("DB_COALESCE", "all_rows,all_rows_versioned,all_version,top_users,daily_stats")
+DB_COALESCE = COALESCE_QUERIES if _setting == "all" else {name for name in _setting.split(",") if name}
+if DB_COALESCE - COALESCE_QUERIES:
+    raise RuntimeError(
+        f"Недопустимые типы запросов в DB_COALESCE: {', '.join(sorted(DB_COALESCE - COALESCE_QUERIES))}. "
+        f"Допустимые: {', '.join(sorted(COALESCE_QUERIES))}, all"
+    )
+
+
+class _Abandoned(Exception):
+    """Первый запрос отменен, не дождавшись результата"""
+
+
+class SingleFlight:
+    """Выполняющиеся запросы по ключу: первый выполняет запрос, остальные ждут его результат"""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        # Номер записи: входит в ключ, чтобы чтения после записи не получили старый результат
+        self.generation = 0
+
+    def note_write(self):
+        """Отметить завершенную запись"""
+        self.generation += 1
+
+    async def do(self, query: str, key: Hashable, fetch: Callable[[], Awaitable]):
+        while key in self._flights:
+            flight = self._flights[key]
+            self._waiters[key] += 1
+            DB_COALESCED_READS.labels(query, "coalesced").inc()
+            try:
+                # shield: отмена ожидающего не отменяет общий запрос
+                return await asyncio.shield(flight)
+            except _Abandoned:
+                # Первый запрос отменен (клиент отключился, истек срок) - выполняем сами или ждем следующий
+                continue
+            finally:
+                # Ожидающий, отмененный до завершения запроса, больше не ждет его результат
+                if self._flights.get(key) is flight:
+                    self._waiters[key] -= 1
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self._waiters[key] = 0
+        DB_COALESCED_READS.labels(query, "executed").inc()
+        try:
+            result = await fetch()
+        except BaseException as e:
+            # Ожидающие получают ту же ошибку, а при отмене первого запроса или истечении его срока
+            # (у ожидающих срок свой) - _Abandoned.
+            # Без ожидающих ошибку никто не заберет: будущее отменяется, чтобы asyncio не предупреждал
+            if not self._waiters[key]:
+                flight.cancel()
+            elif isinstance(e, (asyncio.CancelledError, DeadlineExceeded)):
+                flight.set_exception(_Abandoned())
+            else:
+                flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
+            del self._waiters[key]
+
+
+single_flight = SingleFlight()
+
+
+def _hashable(value):
+    return astuple(value) if is_dataclass(value) else value
+
+
+def _read_bind(db):
+    """Узел БД, на который пойдет чтение сессии: с репликами (RoutingSession) - выбранная
+    для сессии реплика или основной сервер после записи, иначе - движок сессии"""
+    read_bind = getattr(db.sync_session, "read_bind", None)
+    return read_bind() if read_bind is not None else db.bind
+
+
+def coalesced(name: str):
+    """Метод CRUD (self, db, *параметры) с объединением одинаковых одновременных вызовов.
+    Ключ - таблица, тип запроса, узел БД, на который пойдет чтение, номер записи и параметры"""
+    def decorate(method):
+        @functools.wraps(method)
+        async def wrapper(self, db, *args, **kwargs):
+            if name not in DB_COALESCE:
+                return await method(self, db, *args, **kwargs)
+            query = f"{self.model.__tablename__}.{name}"
+            key = (
+                query, _read_bind(db), single_flight.generation,
+                tuple(_hashable(arg) for arg in args),
+                tuple(sorted((k, _hashable(v)) for k, v in kwargs.items())),
+            )
+            return await single_flight.do(query, key, lambda: method(self, db, *args, **kwargs))
+        return wrapper
+    return decorate
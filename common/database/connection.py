@@ -1,6 +1,10 @@
 import os
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from common.database.deadline import install_statement_timeout
+from common.database.routing import ReplicaRouter, RoutingSession
+from common.monitoring.logging_setup import install_sql_logging
+from common.monitoring.timing import TimedAsyncQueuePool, instrument_engine
 
 # Получаем параметры подключения из переменных окружения
 DB_USER = os.getenv("POSTGRES_USER", "postgres")
@@ -9,16 +13,68 @@ DB_HOST = os.getenv("POSTGRES_HOST", "db")  # Имя сервиса в docker-co
 DB_PORT = os.getenv("POSTGRES_PORT", "5432")
 DB_NAME = os.getenv("POSTGRES_DB", "postgres")
 
+# Реплики только для чтения через запятую: "host[:port],host[:port]".
+# Пусто - все запросы идут на основной сервер
+DB_REPLICA_HOSTS = [host.strip() for host in os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",") if host.strip()]
+
+def _database_url(host: str, port: str) -> str:
+    return f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{host}:{port}/{DB_NAME}"
+
 # Строка подключения к базе данных
-DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+DATABASE_URL = _database_url(DB_HOST, DB_PORT)
+
+# Полный вывод всех SQL-запросов (echo) только для отладки
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+# Размер кеша подготовленных запросов asyncpg на соединение (по умолчанию в SQLAlchemy - 100).
+# Каждая комбинация фильтров - отдельный SQL, поэтому запас больше
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "500"))
+
+# Общий бюджет соединений с каждым узлом БД на все рабочие процессы сервиса (WEB_CONCURRENCY,
+# common/gunicorn_conf.py): делится поровну, пул процесса - без переполнения, поэтому всего
+# соединений не больше бюджета. 0 - пул по умолчанию (5 и до 10 сверху) в каждом процессе
+DB_CONNECTION_BUDGET = int(os.getenv("DB_CONNECTION_BUDGET", "0"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+def _pool_options() -> dict:
+    if DB_CONNECTION_BUDGET <= 0:
+        return {}
+    return {"pool_size": max(1, DB_CONNECTION_BUDGET // max(1, WEB_CONCURRENCY)), "max_overflow": 0}
+
+def _create_engine(url: str):
+    """Движок с замером SQL-запросов для Server-Timing и метрик, логированием медленных запросов
+    и statement_timeout по сроку запроса"""
+    new_engine = create_async_engine(
+        url, echo=DB_ECHO, poolclass=TimedAsyncQueuePool,
+        connect_args={"prepared_statement_cache_size": DB_PREPARED_STATEMENT_CACHE_SIZE},
+        **_pool_options(),
+    )
+    instrument_engine(new_engine)
+    install_sql_logging(new_engine)
+    install_statement_timeout(new_engine)
+    return new_engine
 
 # Создаем движок для работы с базой данных
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = _create_engine(DATABASE_URL)
+
+# Движки реплик и маршрутизатор чтения
+def _replica_url(spec: str) -> str:
+    host, _, port = spec.partition(":")
+    return _database_url(host, port or DB_PORT)
+
+replica_engines = [_create_engine(_replica_url(spec)) for spec in DB_REPLICA_HOSTS]
+replica_router = ReplicaRouter(engine, replica_engines)
 
-# Создаем фабрику сессий
-async_session = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
+# Создаем фабрику сессий: с репликами - сессия с маршрутизацией запросов
+if replica_engines:
+    async_session = sessionmaker(
+        engine, class_=AsyncSession, sync_session_class=RoutingSession,
+        router=replica_router, expire_on_commit=False
+    )
+else:
+    async_session = sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
 
 # Функция для получения сессии
 async def get_db():
@@ -1,44 +1,200 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+import os
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import delete
-from typing import List, Optional, TypeVar, Generic, Type
-from common.models.models import User, Order
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy import (
+    BigInteger, Date, Integer, String, and_, bindparam, cast, exists, func, literal, literal_column, Row,
+)
+from sqlalchemy.engine.result import result_tuple
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from typing import AsyncIterator, List, Optional, Sequence, Tuple, TypeVar, Generic, Type
+from common.models.models import User, Order, UserOrderStats
+from common.database.coalescing import coalesced, single_flight
+from common.database.filters import OrderFilter
+from common.database.group_commit import GroupCommit
+from common.monitoring.timing import phase
+
+# Сводка заказов по пользователям в отдельной таблице: статистика пользователя и топ читаются
+# по индексам, без агрегации всех заказов. Сводка пересчитывается при миграции (maintain_schema)
+ORDER_STATS_SUMMARY = os.getenv("ORDER_STATS_SUMMARY", "false").lower() == "true"
+
+# Групповая фиксация заказов: заказы одновременных запросов копятся до
+# ORDER_GROUP_COMMIT_MAX_DELAY_MS (или до ORDER_GROUP_COMMIT_MAX_BATCH заказов) и пишутся одним
+# INSERT в одной транзакции - одна фиксация на пачку вместо фиксации на каждый заказ
+ORDER_GROUP_COMMIT = os.getenv("ORDER_GROUP_COMMIT", "false").lower() == "true"
+ORDER_GROUP_COMMIT_MAX_BATCH = int(os.getenv("ORDER_GROUP_COMMIT_MAX_BATCH", "100"))
+ORDER_GROUP_COMMIT_MAX_DELAY_MS = float(os.getenv("ORDER_GROUP_COMMIT_MAX_DELAY_MS", "2"))
+
+# Поля, по которым строится топ пользователей
+TOP_USERS_FIELDS = ("total_spent", "order_count")
 
 # Создаем обобщенный тип для моделей
 T = TypeVar('T')
 
+def _xmin(table):
+    """Системная колонка Postgres xmin (транзакция, последней изменившая строку) как число"""
+    return literal_column(f"{table.name}.xmin::text::bigint")
+
+def _xmin_sum(table):
+    """Сумма xmin строк - версия набора строк вместе с их числом.
+
+    Любая вставка, изменение или удаление меняет сумму: строка появляется или пропадает со своим
+    xmin либо получает xmin новой транзакции. Максимум xmin для этого не годится: после
+    переполнения счетчика транзакций (wraparound) новые xmin меньше старых, и максимум
+    не меняется. Сумма не растет монотонно - ETag сравнивается только на равенство. Совпасть
+    после изменений она может лишь при случайном равенстве сумм xmin удаленных и новых строк"""
+    return cast(func.sum(_xmin(table)), BigInteger)
+
+def _rows_version(versions: list) -> Tuple[int, Optional[int]]:
+    """Версия набора строк по xmin загруженных строк, как у запросов с _xmin_sum"""
+    return len(versions), sum(versions) if versions else None
+
+def _stats_delta(user_id: int, count: int, amount):
+    """Атомарное изменение сводки пользователя; строка создается при первом заказе"""
+    stmt = insert(UserOrderStats.__table__).values(user_id=user_id, order_count=count, total_spent=amount)
+    return stmt.on_conflict_do_update(
+        index_elements=[UserOrderStats.user_id],
+        set_={
+            "order_count": UserOrderStats.order_count + stmt.excluded.order_count,
+            "total_spent": UserOrderStats.total_spent + stmt.excluded.total_spent,
+        },
+    )
+
+def _insert_orders_from(rows):
+    """INSERT заказов из строк rows (user_id, product_name, price) с существующими пользователями"""
+    return (
+        insert(Order.__table__)
+        .from_select(
+            ["user_id", "product_name", "price"],
+            select(rows.c.user_id, rows.c.product_name, rows.c.price).where(exists().where(User.id == rows.c.user_id)),
+        )
+        .returning(*Order.__table__.columns)
+    )
+
+def _filtered(filters: Optional[OrderFilter]) -> bool:
+    """Заданы ли фильтры или сортировка, отличные от умолчаний"""
+    return filters is not None and not filters.is_default()
+
 class BaseCRUD(Generic[T]):
     """Базовый класс для CRUD операций"""
     
     def __init__(self, model: Type[T]):
         self.model = model
+        table = model.__table__
+        # Частые запросы собираются один раз с bindparam вместо значений: ключ кеша вычисляется
+        # один раз на объект, SQL берется из кеша компиляции движка, а подготовленный запрос -
+        # из кеша соединения asyncpg
+        self._select_all = select(model)
+        self._select_all_rows = select(*table.columns)
+        self._select_by_id = select(model).where(model.id == bindparam("id"))
+        self._select_row_by_id = select(*table.columns).where(model.id == bindparam("id"))
+        self._select_version = select(_xmin(table)).where(model.id == bindparam("id"))
+        self._select_all_version = select(func.count(), _xmin_sum(table)).select_from(table)
+        # Строки вместе с xmin: версия для ETag считается по загруженным строкам, без второго запроса
+        self._row = result_tuple([column.name for column in table.columns])
+        self._select_all_rows_versioned = select(_xmin(table).label("row_version"), *table.columns)
+        self._select_row_by_id_versioned = self._select_all_rows_versioned.where(model.id == bindparam("id"))
     
     async def get_all(self, db: AsyncSession) -> List[T]:
         """Получить все записи"""
-        result = await db.execute(select(self.model))
-        return result.scalars().all()
+        with phase("orm"):
+            result = await db.execute(self._select_all)
+            return result.scalars().all()
+    
+    @coalesced("all_rows")
+    async def get_all_rows(self, db: AsyncSession) -> List[Row]:
+        """Получить все записи как строки, без создания ORM-объектов"""
+        with phase("orm"):
+            result = await db.execute(self._select_all_rows)
+            return result.all()
+    
+    @coalesced("all_rows_versioned")
+    async def get_all_rows_versioned(self, db: AsyncSession) -> Tuple[Tuple[int, Optional[int]], List[Row]]:
+        """Все записи как строки и их версия для ETag одним запросом.
+        Версия совпадает с get_all_version"""
+        with phase("orm"):
+            result = await db.execute(self._select_all_rows_versioned)
+            rows = result.all()
+        return _rows_version([row.row_version for row in rows]), [self._row(row[1:]) for row in rows]
+    
+    @coalesced("row_by_id")
+    async def get_row_by_id(self, db: AsyncSession, id: int) -> Optional[Row]:
+        """Получить запись по ID как строку, без создания ORM-объекта"""
+        with phase("orm"):
+            result = await db.execute(self._select_row_by_id, {"id": id})
+            return result.first()
+    
+    @coalesced("row_by_id_versioned")
+    async def get_row_by_id_versioned(self, db: AsyncSession, id: int) -> Optional[Tuple[int, Row]]:
+        """Запись по ID как строка и ее версия для ETag одним запросом; None, если записи нет.
+        Версия совпадает с get_version"""
+        with phase("orm"):
+            result = await db.execute(self._select_row_by_id_versioned, {"id": id})
+            row = result.first()
+        if row is None:
+            return None
+        return row.row_version, self._row(row[1:])
+    
+    async def stream_rows(self, db: AsyncSession, batch_size: int = 1000) -> AsyncIterator[List[Row]]:
+        """Потоково читать все записи серверным курсором, пачками по batch_size строк"""
+        result = await db.stream(
+            select(*self.model.__table__.columns)
+            .order_by(self.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield partition
+    
+    @coalesced("version")
+    async def get_version(self, db: AsyncSession, id: int) -> Optional[int]:
+        """Версия записи для ETag: без загрузки самой записи"""
+        with phase("orm"):
+            result = await db.execute(self._select_version, {"id": id})
+            return result.scalar()
+    
+    @coalesced("all_version")
+    async def get_all_version(self, db: AsyncSession) -> Tuple[int, Optional[int]]:
+        """Версия всей таблицы для ETag: число строк и сумма их xmin (_xmin_sum)"""
+        with phase("orm"):
+            result = await db.execute(self._select_all_version)
+            return tuple(result.one())
     
     async def get_by_id(self, db: AsyncSession, id: int) -> Optional[T]:
         """Получить запись по ID"""
-        result = await db.execute(select(self.model).where(self.model.id == id))
-        return result.scalars().first()
+        with phase("orm"):
+            result = await db.execute(self._select_by_id, {"id": id})
+            return result.scalars().first()
+    
+    async def warm_up(self, db: AsyncSession):
+        """Частые запросы по ключу с несуществующим ID: SQL попадает в кеш компиляции движка,
+        а подготовленный запрос - в кеш соединения. Запросы по всей таблице не выполняются"""
+        await self.get_row_by_id(db, 0)
+        await self.get_row_by_id_versioned(db, 0)
+        await self.get_by_id(db, 0)
+        await self.get_version(db, 0)
     
     async def create(self, db: AsyncSession, **kwargs) -> T:
         """Создать новую запись"""
-        obj = self.model(**kwargs)
-        db.add(obj)
-        await db.commit()
-        await db.refresh(obj)
-        return obj
+        with phase("orm"):
+            obj = self.model(**kwargs)
+            db.add(obj)
+            await db.commit()
+            single_flight.note_write()
+            await db.refresh(obj)
+            return obj
     
     async def delete(self, db: AsyncSession, id: int) -> bool:
         """Удалить запись по ID"""
         obj = await self.get_by_id(db, id)
         if not obj:
             return False
-        await db.delete(obj)
-        await db.commit()
-        return True
+        with phase("orm"):
+            await db.delete(obj)
+            await db.commit()
+            single_flight.note_write()
+            return True
 
 # Конкретные классы для работы с моделями
 class UserCRUD(BaseCRUD[User]):
@@ -52,11 +208,376 @@ class OrderCRUD(BaseCRUD[Order]):
     
     def __init__(self):
         super().__init__(Order)
+        # Запросы заказов пользователя без фильтров - самые частые, собираем их один раз
+        self._select_by_user_id = self.select_orders((Order,), bindparam("user_id"))
+        self._select_rows_by_user_id = self.select_orders(Order.__table__.columns, bindparam("user_id"))
+        self._select_user_orders_version = self._user_orders_version_query()
+        self._select_user_orders = self._user_orders_query()
+        # Пачка заказов - массивы колонок через unnest: один подготовленный запрос
+        # для пачки любого размера
+        self._insert_batch = _insert_orders_from(
+            func.unnest(
+                bindparam("user_id", type_=ARRAY(Integer)),
+                bindparam("product_name", type_=ARRAY(String)),
+                bindparam("price", type_=ARRAY(Order.price.type)),
+            ).table_valued("user_id", "product_name", "price").render_derived(name="new_orders")
+        )
+        self._price_quantum = Decimal(1).scaleb(-Order.price.type.scale)
+        self._group_commit = GroupCommit(
+            Order.__tablename__, self._write_batch,
+            ORDER_GROUP_COMMIT_MAX_BATCH, ORDER_GROUP_COMMIT_MAX_DELAY_MS / 1000,
+        )
+    
+    def select_orders(self, columns, user_id=None, filters: Optional[OrderFilter] = None):
+        """Запрос списка заказов с фильтрами и сортировкой; user_id - значение или bindparam"""
+        stmt = select(*columns)
+        if user_id is not None:
+            stmt = stmt.where(Order.user_id == user_id)
+        if _filtered(filters):
+            stmt = filters.apply(stmt)
+        return stmt
+    
+    def _user_orders_version_query(self, filters: Optional[OrderFilter] = None):
+        """Версия списка заказов пользователя: версия пользователя, число заказов и сумма их xmin"""
+        user_id = bindparam("user_id")
+        user_version = select(_xmin(User.__table__)).where(User.id == user_id).scalar_subquery()
+        stmt = (
+            select(user_version, func.count(), _xmin_sum(Order.__table__))
+            .where(Order.user_id == user_id)
+        )
+        if _filtered(filters):
+            stmt = stmt.where(*filters.conditions())
+        return stmt
+    
+    def _user_orders_query(self, filters: Optional[OrderFilter] = None):
+        """Пользователь и его заказы через LEFT JOIN вместе с версиями строк"""
+        conditions = [Order.user_id == User.id]
+        order_by = []
+        if _filtered(filters):
+            # Фильтры - в условии соединения, чтобы пользователь без подходящих заказов не пропал
+            conditions += filters.conditions()
+            order_by = filters.order_by()
+        return (
+            select(
+                _xmin(User.__table__).label("user_version"),
+                _xmin(Order.__table__).label("order_version"),
+                *Order.__table__.columns,
+            )
+            .select_from(User)
+            .outerjoin(Order, and_(*conditions))
+            .where(User.id == bindparam("user_id"))
+            .order_by(*order_by)
+        )
     
-    async def get_by_user_id(self, db: AsyncSession, user_id: int) -> List[Order]:
+    async def warm_up(self, db: AsyncSession):
+        """Частые запросы заказов пользователя и его статистики без фильтров"""
+        await super().warm_up(db)
+        await self.get_by_user_id(db, 0)
+        await self.get_rows_by_user_id(db, 0)
+        await self.get_user_orders_version(db, 0)
+        await self.get_user_orders(db, 0)
+        await self.get_user_stats(db, 0)
+    
+    async def get_all(self, db: AsyncSession, filters: Optional[OrderFilter] = None) -> List[Order]:
+        """Получить все заказы с фильтрами"""
+        stmt = self.select_orders((Order,), filters=filters) if _filtered(filters) else self._select_all
+        with phase("orm"):
+            result = await db.execute(stmt)
+            return result.scalars().all()
+    
+    @coalesced("all_rows")
+    async def get_all_rows(self, db: AsyncSession, filters: Optional[OrderFilter] = None) -> List[Row]:
+        """Получить все заказы с фильтрами как строки, без создания ORM-объектов"""
+        stmt = (
+            self.select_orders(Order.__table__.columns, filters=filters)
+            if _filtered(filters) else self._select_all_rows
+        )
+        with phase("orm"):
+            result = await db.execute(stmt)
+            return result.all()
+    
+    @coalesced("all_version")
+    async def get_all_version(self, db: AsyncSession,
+                              filters: Optional[OrderFilter] = None) -> Tuple[int, Optional[int]]:
+        """Версия заказов, подходящих под фильтры, для ETag: число строк и сумма их xmin"""
+        stmt = self._select_all_version
+        if _filtered(filters):
+            stmt = stmt.where(*filters.conditions())
+        with phase("orm"):
+            result = await db.execute(stmt)
+            return tuple(result.one())
+    
+    @coalesced("all_rows_versioned")
+    async def get_all_rows_versioned(self, db: AsyncSession, filters: Optional[OrderFilter] = None
+                                     ) -> Tuple[Tuple[int, Optional[int]], List[Row]]:
+        """Заказы с фильтрами как строки и их версия для ETag одним запросом.
+        Версия совпадает с get_all_version с теми же фильтрами"""
+        stmt = self._select_all_rows_versioned
+        if _filtered(filters):
+            stmt = filters.apply(stmt)
+        with phase("orm"):
+            result = await db.execute(stmt)
+            rows = result.all()
+        return _rows_version([row.row_version for row in rows]), [self._row(row[1:]) for row in rows]
+    
+    async def get_by_user_id(self, db: AsyncSession, user_id: int,
+                             filters: Optional[OrderFilter] = None) -> List[Order]:
         """Получить заказы пользователя по ID пользователя"""
-        result = await db.execute(select(Order).where(Order.user_id == user_id))
-        return result.scalars().all()
+        stmt = (
+            self.select_orders((Order,), bindparam("user_id"), filters)
+            if _filtered(filters) else self._select_by_user_id
+        )
+        with phase("orm"):
+            result = await db.execute(stmt, {"user_id": user_id})
+            return result.scalars().all()
+    
+    @coalesced("rows_by_user_id")
+    async def get_rows_by_user_id(self, db: AsyncSession, user_id: int,
+                                  filters: Optional[OrderFilter] = None) -> List[Row]:
+        """Получить заказы пользователя как строки, без создания ORM-объектов"""
+        stmt = (
+            self.select_orders(Order.__table__.columns, bindparam("user_id"), filters)
+            if _filtered(filters) else self._select_rows_by_user_id
+        )
+        with phase("orm"):
+            result = await db.execute(stmt, {"user_id": user_id})
+            return result.all()
+    
+    @coalesced("user_orders_version")
+    async def get_user_orders_version(self, db: AsyncSession, user_id: int,
+                                      filters: Optional[OrderFilter] = None) -> Tuple:
+        """Версия списка заказов пользователя для ETag, включая версию самого пользователя"""
+        stmt = (
+            self._user_orders_version_query(filters)
+            if _filtered(filters) else self._select_user_orders_version
+        )
+        with phase("orm"):
+            result = await db.execute(stmt, {"user_id": user_id})
+            return tuple(result.one())
+    
+    @coalesced("user_orders")
+    async def get_user_orders(self, db: AsyncSession, user_id: int,
+                              filters: Optional[OrderFilter] = None) -> Optional[Tuple[Tuple, List[Row]]]:
+        """Заказы пользователя и их версия для ETag одним запросом; None, если пользователя нет.
+        Версия совпадает с get_user_orders_version"""
+        stmt = self._user_orders_query(filters) if _filtered(filters) else self._select_user_orders
+        with phase("orm"):
+            result = await db.execute(stmt, {"user_id": user_id})
+            rows = result.all()
+        if not rows:
+            return None
+        # У пользователя без заказов LEFT JOIN дает одну строку с пустыми колонками заказа
+        orders = [row for row in rows if row.id is not None]
+        version = (rows[0].user_version, *_rows_version([row.order_version for row in orders]))
+        return version, [self._row(row[2:]) for row in orders]
+    
+    def _order_key(self, user_id: int, product_name: str, price) -> tuple:
+        """Содержимое заказа с ценой, округленной как в колонке"""
+        return user_id, product_name, Decimal(str(price)).quantize(self._price_quantum, ROUND_HALF_UP)
+    
+    async def _write_batch(self, bind: AsyncEngine, items: list) -> list:
+        """Пачка заказов (user_id, product_name, price) одним INSERT ... SELECT и одной фиксацией;
+        созданные строки в порядке items, None - пользователя нет, исключение - ошибка заказа"""
+        params = {
+            "user_id": [item[0] for item in items],
+            "product_name": [item[1] for item in items],
+            "price": [item[2] for item in items],
+        }
+        try:
+            async with bind.begin() as conn:
+                created = (await conn.execute(self._insert_batch, params)).all()
+                if ORDER_STATS_SUMMARY:
+                    deltas = {}
+                    for order in created:
+                        count, amount = deltas.get(order.user_id, (0, 0))
+                        deltas[order.user_id] = (count + 1, amount + order.price)
+                    # По возрастанию user_id: одновременные пачки блокируют строки сводки в одном порядке
+                    for user_id in sorted(deltas):
+                        await conn.execute(_stats_delta(user_id, *deltas[user_id]))
+        except DBAPIError as e:
+            # Пачка не записана из-за одного заказа: пользователя удалили между проверкой и вставкой
+            # или значение не подходит колонке (название длиннее 255 символов, цена вне NUMERIC(10,2)).
+            # Пишем заказы по одному, ошибку получает только запрос с таким заказом.
+            # Потеря соединения касается всей пачки
+            if e.connection_invalidated:
+                raise
+            if len(items) == 1:
+                if isinstance(e, IntegrityError):
+                    return [None]
+                return [e]
+            results = []
+            for item in items:
+                results.extend(await self._write_batch(bind, [item]))
+            return results
+        single_flight.note_write()
+        
+        # Порядок строк RETURNING не гарантирован: сопоставляем по содержимому.
+        # Одинаковые заказы взаимозаменяемы, заказы без пользователя не вставлены
+        by_content = {}
+        for order in created:
+            by_content.setdefault(self._order_key(order.user_id, order.product_name, order.price), []).append(order)
+        results = []
+        for item in items:
+            orders = by_content.get(self._order_key(*item))
+            results.append(orders.pop() if orders else None)
+        return results
+    
+    async def create(self, db: AsyncSession, user_id: int, product_name: str,
+                     price: Decimal) -> Optional[Row]:
+        """Создать заказ одним запросом INSERT ... SELECT ... WHERE EXISTS; None, если пользователя нет.
+        С ORDER_GROUP_COMMIT заказ пишется в пачке с заказами одновременных запросов"""
+        if ORDER_GROUP_COMMIT:
+            with phase("orm"):
+                # Пачка пишется через движок сессии (основной сервер) в своей транзакции
+                order = await self._group_commit.submit(db.bind, (user_id, product_name, price))
+                router = getattr(db.sync_session, "router", None)
+                if router is not None:
+                    router.note_write()
+                return order
+        
+        user_exists = exists().where(User.id == user_id)
+        stmt = (
+            insert(Order.__table__)
+            .from_select(
+                ["user_id", "product_name", "price"],
+                select(literal(user_id), literal(product_name), literal(price, Order.price.type))
+                .where(user_exists),
+            )
+            .returning(*Order.__table__.columns)
+        )
+        with phase("orm"):
+            try:
+                order = (await db.execute(stmt)).first()
+                if order is None:
+                    await db.rollback()
+                    return None
+                if ORDER_STATS_SUMMARY:
+                    await db.execute(_stats_delta(order.user_id, 1, order.price))
+                await db.commit()
+                single_flight.note_write()
+            except IntegrityError:
+                # Пользователя удалили между проверкой и вставкой - внешний ключ не дал создать заказ
+                await db.rollback()
+                return None
+            return order
+    
+    async def delete(self, db: AsyncSession, id: int) -> bool:
+        """Удалить заказ и обновить сводку пользователя в той же транзакции"""
+        order = await self.get_by_id(db, id)
+        if not order:
+            return False
+        with phase("orm"):
+            if ORDER_STATS_SUMMARY:
+                await db.execute(_stats_delta(order.user_id, -1, -order.price))
+            await db.delete(order)
+            await db.commit()
+            single_flight.note_write()
+            return True
+    
+    def _user_stats_query(self):
+        """Статистика заказов по пользователям: user_id, order_count, total_spent, avg_price"""
+        if ORDER_STATS_SUMMARY:
+            order_count = func.coalesce(UserOrderStats.order_count, 0)
+            total_spent = func.coalesce(UserOrderStats.total_spent, 0)
+            avg_price = UserOrderStats.total_spent / func.nullif(UserOrderStats.order_count, 0)
+            return select(
+                User.id.label("user_id"),
+                order_count.label("order_count"),
+                total_spent.label("total_spent"),
+                func.round(avg_price, 2).label("avg_price"),
+            ).select_from(User).outerjoin(UserOrderStats, UserOrderStats.user_id == User.id)
+        return select(
+            User.id.label("user_id"),
+            func.count(Order.id).label("order_count"),
+            func.coalesce(func.sum(Order.price), 0).label("total_spent"),
+            func.round(func.avg(Order.price), 2).label("avg_price"),
+        ).select_from(User).outerjoin(Order, Order.user_id == User.id).group_by(User.id)
+    
+    @coalesced("user_stats")
+    async def get_user_stats(self, db: AsyncSession, user_id: int) -> Optional[Row]:
+        """Статистика заказов пользователя; None, если пользователя нет"""
+        with phase("orm"):
+            result = await db.execute(self._user_stats_query().where(User.id == user_id))
+            return result.first()
+    
+    async def get_users_stats(self, db: AsyncSession, user_ids: Sequence[int]) -> List[Row]:
+        """Статистика заказов нескольких пользователей одним запросом"""
+        with phase("orm"):
+            result = await db.execute(self._user_stats_query().where(User.id.in_(user_ids)))
+            return result.all()
+    
+    @coalesced("top_users")
+    async def get_top_users(self, db: AsyncSession, limit: int = 10,
+                            by: str = "total_spent") -> List[Row]:
+        """Топ пользователей по сумме или числу заказов"""
+        if by not in TOP_USERS_FIELDS:
+            raise ValueError(f"Недопустимое поле: {by}. Допустимые: {', '.join(TOP_USERS_FIELDS)}")
+        with phase("orm"):
+            if ORDER_STATS_SUMMARY:
+                # Внутреннее соединение: сортировка по индексу сводки, без пользователей без заказов
+                column = getattr(UserOrderStats, by)
+                stmt = select(
+                    UserOrderStats.user_id,
+                    UserOrderStats.order_count,
+                    UserOrderStats.total_spent,
+                    func.round(
+                        UserOrderStats.total_spent / func.nullif(UserOrderStats.order_count, 0), 2
+                    ).label("avg_price"),
+                ).where(UserOrderStats.order_count > 0)
+                stmt = stmt.order_by(column.desc(), UserOrderStats.user_id)
+            else:
+                stmt = self._user_stats_query().having(func.count(Order.id) > 0)
+                stmt = stmt.order_by(stmt.selected_columns[by].desc(), User.id)
+            result = await db.execute(stmt.limit(limit))
+            return result.all()
+    
+    @coalesced("daily_stats")
+    async def get_daily_stats(self, db: AsyncSession, date_from: Optional[date] = None,
+                              date_to: Optional[date] = None) -> List[Row]:
+        """Заказы по дням в полуинтервале [date_from, date_to): число, сумма и средняя цена"""
+        with phase("orm"):
+            result = await db.execute(self.daily_stats_statement(date_from, date_to))
+            return result.all()
+    
+    def daily_stats_statement(self, date_from: Optional[date] = None, date_to: Optional[date] = None):
+        """Запрос статистики по дням"""
+        day = func.date(Order.created_at, type_=Date)
+        stmt = select(
+            day.label("day"),
+            func.count().label("order_count"),
+            func.sum(Order.price).label("total_spent"),
+            func.round(func.avg(Order.price), 2).label("avg_price"),
+        )
+        # Условия по created_at, а не по date(created_at), чтобы работал индекс и отсекались секции
+        if date_from is not None:
+            stmt = stmt.where(Order.created_at >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(Order.created_at < date_to)
+        return stmt.group_by(day).order_by(day)
+    
+    def rebuild_stats_statement(self):
+        """Пересчет сводки заказов по всем пользователям (идемпотентный upsert)"""
+        totals = (
+            select(
+                User.id,
+                func.count(Order.id),
+                func.coalesce(func.sum(Order.price), 0),
+            )
+            .select_from(User)
+            .outerjoin(Order, Order.user_id == User.id)
+            .group_by(User.id)
+            .order_by(User.id)
+        )
+        stmt = insert(UserOrderStats.__table__).from_select(
+            ["user_id", "order_count", "total_spent"], totals
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=[UserOrderStats.user_id],
+            set_={
+                "order_count": stmt.excluded.order_count,
+                "total_spent": stmt.excluded.total_spent,
+            },
+        )
 
 # Создаем экземпляры для использования
 user_crud = UserCRUD()
@@ -0,0 +1,79 @@
+"""
+Срок запроса (deadline) и его передача в БД.
+
+Транспорт задает срок обработки запроса (gRPC - deadline клиента, HTTP - заголовок
+x-request-timeout-ms или REQUEST_TIMEOUT_MS; common/middleware/deadline.py), а каждый SQL-запрос
+в Postgres выполняется с statement_timeout, равным оставшемуся времени: сервер БД сам прерывает
+запрос, ответ на который уже никто не ждет. Если срок истек до запроса, он не отправляется.
+В обоих случаях - DeadlineExceeded.
+
+Без срока запросы выполняются как раньше, без лишних команд.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from common.monitoring.metrics import ABANDONED_REQUESTS, ABANDONED_WORK_SECONDS
+
+# Момент time.monotonic(), к которому запрос должен быть обработан; None - без срока
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+# SQLSTATE query_canceled: запрос прерван по statement_timeout
+_QUERY_CANCELED = "57014"
+
+
+class DeadlineExceeded(Exception):
+    """Срок запроса истек"""
+
+    def __init__(self, message: str = "Срок обработки запроса истек"):
+        super().__init__(message)
+
+
+def set_deadline(timeout: Optional[float]):
+    """Задать срок через timeout секунд (None - без срока); токен передается в reset_deadline"""
+    return _deadline.set(None if timeout is None else time.monotonic() + timeout)
+
+
+def reset_deadline(token):
+    _deadline.reset(token)
+
+
+def time_remaining() -> Optional[float]:
+    """Секунд до срока текущего запроса; None - срока нет"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def note_abandoned(service: str, reason: str, started: float):
+    """Учесть запрос, обработка которого прервана: reason - deadline или client_disconnect,
+    started - time.monotonic() начала обработки"""
+    ABANDONED_REQUESTS.labels(service, reason).inc()
+    ABANDONED_WORK_SECONDS.labels(service, reason).inc(time.monotonic() - started)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    remaining = time_remaining()
+    if remaining is None:
+        return
+    if remaining <= 0:
+        raise DeadlineExceeded()
+    # set_config(..., true) - SET LOCAL с параметром: один подготовленный запрос на соединение
+    # для любых значений; действует до конца транзакции и перезаписывается перед каждым запросом
+    cursor.execute("SELECT set_config('statement_timeout', $1, true)", (str(max(1, int(remaining * 1000))),))
+
+
+def _handle_error(context):
+    if getattr(context.original_exception, "sqlstate", None) == _QUERY_CANCELED and _deadline.get() is not None:
+        return DeadlineExceeded()
+    return None
+
+
+def install_statement_timeout(engine: AsyncEngine):
+    """statement_timeout по сроку запроса для всех запросов движка Postgres"""
+    if engine.dialect.name != "postgresql":
+        return
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from common.models.models import Order
+
+# Поля, по которым разрешена сортировка заказов
+ORDER_SORT_FIELDS = {
+    "id": Order.id,
+    "price": Order.price,
+    "created_at": Order.created_at,
+    "product_name": Order.product_name,
+}
+
+
+@dataclass
+class OrderFilter:
+    """Фильтры и сортировка списка заказов.
+    Диапазоны: price_min <= price <= price_max, created_from <= created_at < created_to.
+    sort - имя поля, "-" в начале означает сортировку по убыванию"""
+
+    price_min: Optional[Decimal] = None
+    price_max: Optional[Decimal] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    product_prefix: Optional[str] = None
+    sort: str = "id"
+
+    def __post_init__(self):
+        if self.sort.lstrip("-") not in ORDER_SORT_FIELDS:
+            raise ValueError(
+                f"Недопустимое поле сортировки: {self.sort}. "
+                f"Допустимые: {', '.join(ORDER_SORT_FIELDS)}"
+            )
+
+    def is_default(self) -> bool:
+        """Нет ни фильтров, ни сортировки - запрос можно не менять"""
+        return self == OrderFilter()
+
+    def conditions(self) -> list:
+        """Условия фильтров; отдельно от сортировки - для агрегатов и условия соединения"""
+        conditions = []
+        if self.price_min is not None:
+            conditions.append(Order.price >= self.price_min)
+        if self.price_max is not None:
+            conditions.append(Order.price <= self.price_max)
+        if self.created_from is not None:
+            conditions.append(Order.created_at >= self.created_from)
+        if self.created_to is not None:
+            conditions.append(Order.created_at < self.created_to)
+        if self.product_prefix:
+            # Шаблон собираем заранее: LIKE 'префикс%' с константой использует индекс с text_pattern_ops
+            pattern = self.product_prefix.replace("/", "//").replace("%", "/%").replace("_", "/_")
+            conditions.append(Order.product_name.like(pattern + "%", escape="/"))
+        return conditions
+
+    def order_by(self) -> list:
+        """Выражения сортировки"""
+        column = ORDER_SORT_FIELDS[self.sort.lstrip("-")]
+        descending = self.sort.startswith("-")
+        order = [column.desc() if descending else column.asc()]
+        if column is not Order.id:
+            # id - для однозначного порядка при равных значениях
+            order.append(Order.id.desc() if descending else Order.id.asc())
+        return order
+
+    def apply(self, stmt):
+        """Добавить условия и сортировку к запросу"""
+        return stmt.where(*self.conditions()).order_by(*self.order_by())
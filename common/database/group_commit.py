@@ -0,0 +1,87 @@
+"""
+Групповая фиксация (group commit) записей из одновременных запросов.
+
+Каждая фиксация транзакции в Postgres ждет записи WAL на диск (fsync), и при частых записях
+сервер БД занят в основном этим. Здесь записи одновременных запросов копятся до max_delay
+секунд (или до max_batch записей) и пишутся одной командой в одной транзакции: одна фиксация
+на пачку. Каждый запрос получает свой результат - созданную строку.
+
+Запрос, отмененный во время ожидания (клиент отключился, истек срок), свою запись не отменяет:
+пачка выполняется целиком. Ошибка отдельной записи (исключение вместо результата) достается
+только ее запросу, ошибка всей пачки - всем.
+"""
+import asyncio
+import contextvars
+from typing import Awaitable, Callable, Dict, Hashable, List, Set, Tuple
+
+from common.monitoring.metrics import DB_GROUP_COMMIT_BATCH
+
+
+def _retrieve(future: asyncio.Future):
+    # Результат запроса, который уже не ждут: забираем, чтобы asyncio не предупреждал об ошибке
+    if not future.cancelled():
+        future.exception()
+
+
+class GroupCommit:
+    """Пачки записей по ключу (движок БД): write(key, items) пишет пачку одной транзакцией
+    и возвращает результаты в порядке записей; исключение вместо результата - ошибка записи"""
+
+    def __init__(self, table: str, write: Callable[[Hashable, list], Awaitable[list]],
+                 max_batch: int, max_delay: float):
+        self.table = table
+        self.write = write
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        # Ключ -> (записи, будущие результаты) и таймер пачки
+        self._pending: Dict[Hashable, Tuple[list, List[asyncio.Future]]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        # Выполняющиеся пачки: ссылки, чтобы задачи не собрал сборщик мусора
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, key: Hashable, item):
+        """Добавить запись в пачку и дождаться ее результата"""
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = ([], [])
+            self._timers[key] = loop.call_later(self.max_delay, self._flush, key)
+        future = loop.create_future()
+        batch[0].append(item)
+        batch[1].append(future)
+        if len(batch[0]) >= self.max_batch:
+            self._flush(key)
+        try:
+            # shield: отмена запроса не отменяет пачку
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(_retrieve)
+            raise
+
+    def _flush(self, key: Hashable):
+        items, futures = self._pending.pop(key)
+        self._timers.pop(key).cancel()
+        DB_GROUP_COMMIT_BATCH.labels(self.table).observe(len(items))
+        # Пачка выполняется в пустом контексте: срок и замеры фаз запроса, начавшего пачку,
+        # к ней не относятся
+        task = contextvars.Context().run(asyncio.ensure_future, self._run(key, items, futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key: Hashable, items: list, futures: List[asyncio.Future]):
+        try:
+            results = await self.write(key, items)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+        except BaseException:
+            # Пачку отменили (остановка сервиса)
+            for future in futures:
+                future.cancel()
+            raise
+        else:
+            for future, result in zip(futures, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
@@ -0,0 +1,231 @@
+"""
+Ключи идемпотентности для создания записей.
+
+Клиент передает ключ (REST - заголовок Idempotency-Key, GraphQL - аргумент idempotencyKey
+мутации, gRPC - метаданные idempotency-key), и повтор запроса с тем же ключом получает
+сохраненную созданную запись без обращения к БД. Повтор с тем же ключом и другими параметрами -
+ошибка mismatch; повтор, пока первый запрос еще выполняется, в том же процессе ждет его
+результат, в другом процессе - ошибка in_progress.
+
+Сохраняются только созданные записи: при ошибке или если запись не создана (нет пользователя)
+ключ освобождается, и повтор выполняется заново.
+
+Хранилище - в памяти процесса (не больше IDEMPOTENCY_MAX_KEYS ключей, давно не использованные
+вытесняются) или общее в Redis (IDEMPOTENCY_REDIS_URL) - для нескольких процессов и экземпляров
+сервиса. Ключ хранится IDEMPOTENCY_TTL_SECONDS. Недоступный Redis ключи не применяет.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from common.monitoring.metrics import IDEMPOTENT_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "100000"))
+IDEMPOTENCY_REDIS_URL = os.getenv("IDEMPOTENCY_REDIS_URL", "")
+
+IDEMPOTENCY_KEY_HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+# Срок резервирования ключа в Redis: если процесс завершится, не сохранив результат,
+# ключ освободится сам
+PENDING_TTL_SECONDS = 60
+
+
+class IdempotencyError(Exception):
+    """Запрос с ключом идемпотентности отклонен: reason - invalid_key, mismatch или in_progress"""
+
+    _MESSAGES = {
+        "invalid_key": f"Ключ идемпотентности длиннее {MAX_KEY_LENGTH} символов",
+        "mismatch": "Ключ идемпотентности уже использован с другими параметрами запроса",
+        "in_progress": "Запрос с этим ключом идемпотентности еще выполняется, повторите позже",
+    }
+
+    def __init__(self, reason: str):
+        super().__init__(self._MESSAGES[reason])
+        self.reason = reason
+
+
+class MemoryStore:
+    """Ключи в памяти процесса"""
+
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL_SECONDS, max_keys: int = IDEMPOTENCY_MAX_KEYS):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        # Ключ -> (срок хранения, отпечаток параметров, значения колонок; None - выполняется);
+        # порядок - от давно не использованных
+        self._entries: Dict[str, Tuple[float, str, Optional[tuple]]] = {}
+
+    def _set(self, key: str, fingerprint: str, values: Optional[tuple]):
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl, fingerprint, values)
+        while len(self._entries) > self.max_keys:
+            del self._entries[next(iter(self._entries))]
+
+    async def reserve(self, key: str, fingerprint: str) -> Optional[Tuple[str, Optional[tuple]]]:
+        """Занять ключ; None - занят, иначе (отпечаток, значения) уже занятого ключа"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries[key] = self._entries.pop(key)
+            return entry[1], entry[2]
+        self._set(key, fingerprint, None)
+        return None
+
+    async def put(self, key: str, fingerprint: str, values: tuple):
+        self._set(key, fingerprint, values)
+
+    async def release(self, key: str):
+        self._entries.pop(key, None)
+
+
+class RedisStore:
+    """Общие ключи в Redis. Redis недоступен - ключи не применяются (fail open)"""
+
+    def __init__(self, url: str, ttl: float = IDEMPOTENCY_TTL_SECONDS, prefix: str = "idempotency:"):
+        # Импорт по требованию: redis нужен только с общим хранилищем
+        import redis.asyncio
+
+        self.client = redis.asyncio.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self._last_error = float("-inf")
+
+    def _warn(self, error: Exception):
+        # Не чаще раза в 10 секунд, чтобы при недоступном Redis не залить журнал
+        if time.monotonic() - self._last_error > 10:
+            self._last_error = time.monotonic()
+            logger.warning("Хранилище ключей идемпотентности недоступно", extra={"error": str(error)})
+
+    async def reserve(self, key: str, fingerprint: str) -> Optional[Tuple[str, Optional[tuple]]]:
+        try:
+            pending = json.dumps([fingerprint, None])
+            if await self.client.set(self.prefix + key, pending, nx=True, px=int(PENDING_TTL_SECONDS * 1000)):
+                return None
+            raw = await self.client.get(self.prefix + key)
+        except Exception as e:
+            self._warn(e)
+            return None
+        if raw is None:
+            # Ключ истек между командами - считаем, что он еще выполняется
+            return fingerprint, None
+        stored_fingerprint, values = json.loads(raw)
+        return stored_fingerprint, None if values is None else tuple(values)
+
+    async def put(self, key: str, fingerprint: str, values: tuple):
+        try:
+            # Дата и Decimal - строками, восстанавливаются по типам колонок (_row)
+            raw = json.dumps([fingerprint, values], default=str)
+            await self.client.set(self.prefix + key, raw, px=int(self.ttl * 1000))
+        except Exception as e:
+            self._warn(e)
+
+    async def release(self, key: str):
+        try:
+            await self.client.delete(self.prefix + key)
+        except Exception as e:
+            self._warn(e)
+
+
+def _canonical(value):
+    """Параметр запроса для отпечатка: одно число в разной записи (10.5 и 10.50) совпадает"""
+    if isinstance(value, float):
+        value = Decimal(repr(value))
+    if isinstance(value, Decimal):
+        return str(value.normalize())
+    return value
+
+
+def fingerprint(params: tuple) -> str:
+    """Отпечаток параметров запроса"""
+    canonical = [_canonical(value) for value in params]
+    return hashlib.sha256(json.dumps(canonical, default=str).encode()).hexdigest()
+
+
+_row_types: Dict[str, type] = {}
+
+
+def _load(column, value):
+    # Из Redis дата и Decimal приходят строками
+    if isinstance(value, str):
+        python_type = column.type.python_type
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is Decimal:
+            return Decimal(value)
+    return value
+
+
+def _row(table, values: tuple):
+    """Сохраненная запись: кортеж с полями колонок, как строка Core (атрибуты и _fields)"""
+    row_type = _row_types.get(table.name)
+    if row_type is None:
+        row_type = _row_types[table.name] = namedtuple(f"{table.name}_row", [c.name for c in table.columns])
+    return row_type(*(_load(column, value) for column, value in zip(table.columns, values)))
+
+
+class Idempotency:
+    """Выполнение создания записей с ключами идемпотентности"""
+
+    def __init__(self, store):
+        self.store = store
+        # Выполняющиеся в процессе запросы по ключу: повторы ждут их завершения
+        self._flights: Dict[str, asyncio.Future] = {}
+
+    async def run(self, crud, key: Optional[str], params: tuple, create: Callable[[], Awaitable]):
+        """Создать запись через create() (crud - CRUD ее таблицы, params - параметры запроса)
+        или вернуть запись, созданную ранее с тем же ключом. Без ключа - просто create()"""
+        if not key:
+            return await create()
+        if len(key) > MAX_KEY_LENGTH:
+            raise IdempotencyError("invalid_key")
+        table = crud.model.__table__
+        operation = f"{table.name}.create"
+        key = f"{operation}:{key}"
+        request_fingerprint = fingerprint(params)
+
+        while True:
+            existing = await self.store.reserve(key, request_fingerprint)
+            if existing is None:
+                break
+            stored_fingerprint, values = existing
+            if stored_fingerprint != request_fingerprint:
+                IDEMPOTENT_REQUESTS.labels(operation, "mismatch").inc()
+                raise IdempotencyError("mismatch")
+            if values is not None:
+                IDEMPOTENT_REQUESTS.labels(operation, "replayed").inc()
+                return _row(table, values)
+            flight = self._flights.get(key)
+            if flight is None:
+                IDEMPOTENT_REQUESTS.labels(operation, "in_progress").inc()
+                raise IdempotencyError("in_progress")
+            # Первый запрос выполняется в этом процессе: ждем и проверяем ключ снова.
+            # shield: отмена повтора не отменяет ожидание других
+            await asyncio.shield(flight)
+
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        IDEMPOTENT_REQUESTS.labels(operation, "executed").inc()
+        try:
+            created = await create()
+            if created is None:
+                await self.store.release(key)
+            else:
+                await self.store.put(key, request_fingerprint, tuple(getattr(created, c.name) for c in table.columns))
+            return created
+        except BaseException:
+            # Ошибка или отмена - ключ свободен, повтор выполнит запрос заново
+            await self.store.release(key)
+            raise
+        finally:
+            del self._flights[key]
+            flight.set_result(None)
+
+
+idempotency = Idempotency(RedisStore(IDEMPOTENCY_REDIS_URL) if IDEMPOTENCY_REDIS_URL else MemoryStore())
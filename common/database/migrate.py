@@ -0,0 +1,82 @@
+"""
+Миграции схемы БД - отдельный шаг перед запуском сервисов (Alembic, common/migrations).
+
+    python -m common.database.migrate [upgrade|check]
+
+upgrade (по умолчанию) - применить миграции до последней версии и обслуживание схемы
+    (секции заказов, сводка). Всё в одной транзакции под блокировкой схемы.
+    БД, созданная до миграций через create_all, сначала дополняется по моделям
+    и помечается базовой версией.
+check - код выхода 1, если версия схемы в БД не совпадает с SCHEMA_VERSION.
+"""
+import asyncio
+import logging
+import os
+import sys
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+
+from common.database.connection import engine
+from common.database.schema import (
+    SCHEMA_VERSION, create_tables, lock_schema, maintain_schema, schema_version, verify_schema,
+)
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+# Ревизия, которой помечается схема, созданная до миграций
+BASELINE_VERSION = "0001"
+
+
+def alembic_config(connection=None) -> Config:
+    """Конфигурация Alembic без alembic.ini; соединение передается в env.py"""
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    config.attributes["connection"] = connection
+    return config
+
+
+def check_head():
+    """SCHEMA_VERSION должна совпадать с последней миграцией, иначе сервисы не примут схему"""
+    head = ScriptDirectory.from_config(alembic_config()).get_current_head()
+    if head != SCHEMA_VERSION:
+        raise RuntimeError(f"Последняя миграция {head}, а SCHEMA_VERSION = {SCHEMA_VERSION}")
+
+
+def upgrade(connection):
+    lock_schema(connection)
+    tables = inspect(connection).get_table_names()
+    if "alembic_version" not in tables and "users" in tables:
+        logger.info("Схема создана без миграций: дополняем по моделям и помечаем версией %s", BASELINE_VERSION)
+        create_tables(connection)
+        command.stamp(alembic_config(connection), BASELINE_VERSION)
+    command.upgrade(alembic_config(connection), "head")
+    maintain_schema(connection)
+    logger.info("Схема БД версии %s", schema_version(connection))
+
+
+async def main(action: str) -> int:
+    try:
+        check_head()
+        async with engine.begin() as conn:
+            if action == "check":
+                await conn.run_sync(verify_schema)
+            else:
+                await conn.run_sync(upgrade)
+    except RuntimeError as e:
+        logger.error("%s", e)
+        return 1
+    finally:
+        await engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s [%(name)s] %(message)s")
+    action = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    if action not in ("upgrade", "check"):
+        sys.exit(f"Неизвестная команда: {action}. Допустимые: upgrade, check")
+    sys.exit(asyncio.run(main(action)))
@@ -0,0 +1,134 @@
+"""
+Месячные секции таблицы orders (ORDERS_PARTITIONED=true, только Postgres).
+
+Секция orders_pYYYY_MM хранит заказы с created_at в [1-е число месяца, 1-е число следующего).
+Заказы вне созданных секций попадают в orders_default. Старые секции удаляются целиком
+(DROP TABLE) вместо DELETE по строкам, поэтому таблица не раздувается.
+"""
+import logging
+import os
+import re
+from datetime import date
+from typing import List
+
+from sqlalchemy import text
+
+from common.models.models import Order
+
+logger = logging.getLogger(__name__)
+
+# Сколько месяцев назад и вперед от текущего создавать секции при старте
+ORDERS_PARTITIONS_BACK = int(os.getenv("ORDERS_PARTITIONS_BACK", "12"))
+ORDERS_PARTITIONS_AHEAD = int(os.getenv("ORDERS_PARTITIONS_AHEAD", "3"))
+# Хранить секции за столько месяцев до текущего; 0 - ничего не удалять
+ORDERS_RETENTION_MONTHS = int(os.getenv("ORDERS_RETENTION_MONTHS", "0"))
+
+ORDER_TABLE = Order.__tablename__
+DEFAULT_PARTITION = f"{ORDER_TABLE}_default"
+_PARTITION_NAME = re.compile(rf"^{ORDER_TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def add_months(month: date, months: int) -> date:
+    """Первое число месяца через months месяцев (отрицательное - назад)"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{ORDER_TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+def is_partitioned(connection) -> bool:
+    """orders уже создана как секционированная таблица"""
+    relkind = connection.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": ORDER_TABLE}
+    ).scalar()
+    return relkind == "p"
+
+
+def monthly_partitions(connection) -> List[date]:
+    """Месяцы существующих месячных секций"""
+    names = connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table)"
+    ), {"table": ORDER_TABLE}).scalars()
+    months = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def _create_partition(connection, month: date):
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {ORDER_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    ))
+
+
+def _move_from_default(connection, month: date) -> int:
+    """Создать секцию месяца, строки которого уже лежат в секции по умолчанию, и перенести их.
+    Postgres не создаст такую секцию, пока строки в секции по умолчанию: она отсоединяется
+    на время переноса (в той же транзакции). Возвращает число перенесенных строк"""
+    bounds = {"start": month, "end": add_months(month, 1)}
+    in_month = "created_at >= :start AND created_at < :end"
+    exists = connection.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_month})"), bounds
+    ).scalar()
+    if not exists:
+        _create_partition(connection, month)
+        return 0
+
+    connection.execute(text(f"ALTER TABLE {ORDER_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    _create_partition(connection, month)
+    moved = connection.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {in_month} RETURNING *) "
+        f"INSERT INTO {partition_name(month)} SELECT * FROM moved"
+    ), bounds).rowcount
+    connection.execute(text(f"ALTER TABLE {ORDER_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    return moved
+
+
+def ensure_order_partitions(connection, today: date = None):
+    """Создать секции на ORDERS_PARTITIONS_BACK месяцев назад и ORDERS_PARTITIONS_AHEAD вперед,
+    секцию по умолчанию и удалить секции старше ORDERS_RETENTION_MONTHS"""
+    if not is_partitioned(connection):
+        # Существующую обычную таблицу переводит миграция с переносом данных, а не старт сервиса
+        logger.warning("Таблица %s не секционирована, секции не создаются", ORDER_TABLE)
+        return
+
+    current = (today or date.today()).replace(day=1)
+    back = ORDERS_PARTITIONS_BACK
+    if ORDERS_RETENTION_MONTHS > 0:
+        back = min(back, ORDERS_RETENTION_MONTHS)
+    existing = set(monthly_partitions(connection))
+    has_default = connection.execute(
+        text("SELECT to_regclass(:table) IS NOT NULL"), {"table": DEFAULT_PARTITION}
+    ).scalar()
+    for offset in range(-back, ORDERS_PARTITIONS_AHEAD + 1):
+        month = add_months(current, offset)
+        if month in existing:
+            continue
+        if not has_default:
+            _create_partition(connection, month)
+            logger.info("Создана секция %s", partition_name(month))
+            continue
+        # Заказы месяца без секции (например, секции не создавались дольше
+        # ORDERS_PARTITIONS_AHEAD месяцев) лежат в секции по умолчанию: переносим их в новую
+        moved = _move_from_default(connection, month)
+        if moved:
+            logger.warning(
+                "Создана секция %s, из %s перенесено строк: %d",
+                partition_name(month), DEFAULT_PARTITION, moved,
+            )
+        else:
+            logger.info("Создана секция %s", partition_name(month))
+    connection.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {ORDER_TABLE} DEFAULT"))
+
+    if ORDERS_RETENTION_MONTHS > 0:
+        oldest = add_months(current, -ORDERS_RETENTION_MONTHS)
+        for month in existing:
+            if month < oldest:
+                connection.execute(text(f"DROP TABLE {partition_name(month)}"))
+                logger.info("Удалена секция %s", partition_name(month))
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Optional, Sequence
+
+from sqlalchemy import Delete, Insert, Select, Update, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from common.monitoring.metrics import DB_REPLICA_UP, DB_ROUTED_STATEMENTS
+
+# Период и таймаут проверки реплик в секундах
+REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", "2"))
+REPLICA_HEALTH_TIMEOUT = float(os.getenv("REPLICA_HEALTH_TIMEOUT", "1"))
+# Сколько секунд после записи все чтения процесса идут на основной сервер (read-your-writes)
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "1"))
+
+logger = logging.getLogger(__name__)
+
+
+def _label(engine: AsyncEngine) -> str:
+    return f"{engine.url.host}:{engine.url.port or 5432}"
+
+
+class ReplicaRouter:
+    """Выбор узла БД: запись - основной сервер, чтение - доступные реплики по кругу.
+    После записи чтение на время REPLICA_STICKY_SECONDS идет на основной сервер,
+    без доступных реплик - тоже"""
+
+    def __init__(self, primary: AsyncEngine, replicas: Sequence[AsyncEngine],
+                 sticky_seconds: float = REPLICA_STICKY_SECONDS):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.sticky_seconds = sticky_seconds
+        # До первой проверки реплики считаются доступными
+        self._healthy = list(self.replicas)
+        self._next = 0
+        self._last_write = float("-inf")
+        self._task: Optional[asyncio.Task] = None
+        for replica in self.replicas:
+            DB_REPLICA_UP.labels(_label(replica)).set(1)
+
+    @property
+    def healthy(self) -> list:
+        """Реплики, прошедшие последнюю проверку"""
+        return list(self._healthy)
+
+    def note_write(self):
+        """Отметить запись: следующие чтения увидят ее, пока реплики догоняют"""
+        self._last_write = time.monotonic()
+
+    def read_engine(self) -> AsyncEngine:
+        """Движок для чтения"""
+        if not self._healthy or time.monotonic() - self._last_write < self.sticky_seconds:
+            return self.primary
+        engine = self._healthy[self._next % len(self._healthy)]
+        self._next += 1
+        return engine
+
+    async def _ping(self, replica: AsyncEngine) -> bool:
+        try:
+            async with replica.connect() as conn:
+                await asyncio.wait_for(conn.execute(text("SELECT 1")), REPLICA_HEALTH_TIMEOUT)
+            return True
+        except Exception as e:
+            logger.debug("Проверка реплики не прошла", extra={"replica": _label(replica), "error": str(e)})
+            return False
+
+    async def check(self):
+        """Проверить все реплики и обновить список доступных"""
+        results = await asyncio.gather(*(self._ping(replica) for replica in self.replicas))
+        healthy = [replica for replica, ok in zip(self.replicas, results) if ok]
+        for replica, ok in zip(self.replicas, results):
+            if ok != (replica in self._healthy):
+                logger.warning(
+                    "Реплика доступна" if ok else "Реплика исключена из чтения",
+                    extra={"replica": _label(replica)},
+                )
+            DB_REPLICA_UP.labels(_label(replica)).set(1 if ok else 0)
+        self._healthy = healthy
+
+    def start(self):
+        """Запустить фоновые проверки в текущем цикле событий"""
+        if self.replicas and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(REPLICA_HEALTH_INTERVAL)
+
+
+class RoutingSession(Session):
+    """Сессия, выбирающая узел БД для каждого запроса через ReplicaRouter.
+    Реплика выбирается один раз на сессию, чтобы запросы одного обращения видели одни данные;
+    после записи в сессии все ее запросы идут на основной сервер"""
+
+    def __init__(self, router: ReplicaRouter, **kwargs):
+        super().__init__(**kwargs)
+        self.router = router
+        self._replica: Optional[AsyncEngine] = None
+        self._wrote = False
+
+    def read_bind(self) -> AsyncEngine:
+        """Узел БД, на который пойдут чтения сессии"""
+        if self._wrote:
+            return self.router.primary
+        if self._replica is None:
+            self._replica = self.router.read_engine()
+        return self._replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        is_write = self._flushing or isinstance(clause, (Insert, Update, Delete)) or (
+            isinstance(clause, Select) and clause._for_update_arg is not None
+        )
+        if is_write:
+            self._wrote = True
+            self.router.note_write()
+
+        engine = self.read_bind() if isinstance(clause, Select) else self.router.primary
+
+        DB_ROUTED_STATEMENTS.labels("primary" if engine is self.router.primary else "replica").inc()
+        return engine.sync_engine
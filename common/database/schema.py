@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from sqlalchemy import inspect, text
+from common.models.base import Base
+import common.models.models  # noqa: F401 - регистрирует таблицы в Base.metadata
+from common.models.models import ORDERS_PARTITIONED
+from common.database.crud import ORDER_STATS_SUMMARY, order_crud
+from common.database.partitions import ensure_order_partitions
+
+logger = logging.getLogger(__name__)
+
+# Версия схемы (ревизия Alembic в common/migrations), с которой работает этот код.
+# Меняется вместе с каждой новой миграцией
+SCHEMA_VERSION = "0001"
+
+# Подготовка схемы при старте сервиса:
+# verify - только сверить версию схемы; схему готовит отдельный шаг python -m common.database.migrate
+# create - создать таблицы и индексы самому сервису, как раньше (локальная разработка без миграций)
+SCHEMA_STARTUP = os.getenv("SCHEMA_STARTUP", "verify")
+
+# Как часто сервис продлевает секции заказов вперед, секунд (0 - только при старте): без этого
+# сервис, работающий без новых миграций дольше ORDERS_PARTITIONS_AHEAD месяцев, пишет заказы
+# в секцию по умолчанию
+ORDERS_PARTITIONS_INTERVAL = float(os.getenv("ORDERS_PARTITIONS_INTERVAL", "3600"))
+
+# Ключ блокировки на время изменения схемы: три API и миграция могут стартовать одновременно
+_SCHEMA_LOCK_KEY = 7_365_001
+
+
+def lock_schema(connection):
+    """Дождаться и взять блокировку изменения схемы до конца транзакции (только Postgres)"""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _SCHEMA_LOCK_KEY})
+
+
+def create_tables(connection):
+    """Создать таблицы и недостающие индексы по моделям.
+    create_all не добавляет новые индексы в уже существующие таблицы, поэтому создаем их отдельно"""
+    Base.metadata.create_all(connection)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def maintain_schema(connection):
+    """Обслуживание, не зависящее от версии схемы: секции заказов и сводка"""
+    if ORDERS_PARTITIONED:
+        ensure_order_partitions(connection)
+
+    # Сводка могла отстать, пока была выключена: пересчитываем
+    if ORDER_STATS_SUMMARY:
+        connection.execute(order_crud.rebuild_stats_statement())
+
+
+def create_schema(connection):
+    """Создать таблицы, индексы и секции заказов без миграций"""
+    lock_schema(connection)
+    create_tables(connection)
+    maintain_schema(connection)
+
+
+def schema_version(connection) -> Optional[str]:
+    """Версия схемы в БД по таблице Alembic; None - миграции не применялись"""
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def verify_schema(connection):
+    """Проверить, что схема БД той версии, с которой работает код"""
+    version = schema_version(connection)
+    if version != SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Версия схемы БД: {version or 'нет'}, ожидается {SCHEMA_VERSION}. "
+            "Примените миграции: python -m common.database.migrate"
+        )
+
+
+def ensure_partitions(connection):
+    """Секции заказов под блокировкой изменения схемы (ORDERS_PARTITIONED)"""
+    if ORDERS_PARTITIONED:
+        lock_schema(connection)
+        ensure_order_partitions(connection)
+
+
+def prepare_schema(connection):
+    """Подготовка схемы при старте сервиса по SCHEMA_STARTUP"""
+    if SCHEMA_STARTUP == "create":
+        create_schema(connection)
+    else:
+        verify_schema(connection)
+        # Секции - по текущему месяцу, а не по дате последней миграции
+        ensure_partitions(connection)
+
+
+class PartitionMaintenance:
+    """Продление секций заказов в фоне каждые ORDERS_PARTITIONS_INTERVAL секунд"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, engine):
+        """Запустить продление секций в текущем цикле событий"""
+        if ORDERS_PARTITIONED and ORDERS_PARTITIONS_INTERVAL > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run(engine))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, engine):
+        while True:
+            await asyncio.sleep(ORDERS_PARTITIONS_INTERVAL)
+            try:
+                async with engine.begin() as conn:
+                    await conn.run_sync(ensure_partitions)
+            except Exception:
+                logger.exception("Не удалось продлить секции заказов")
+
+
+partition_maintenance = PartitionMaintenance()
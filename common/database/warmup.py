@@ -0,0 +1,73 @@
+"""
+Прогрев соединений с БД при старте сервиса.
+
+Первые запросы после запуска платят за установку соединений asyncpg, инициализацию
+соединения (типы, кодеки) и подготовку запросов. Прогрев заранее открывает соединения пула
+(основного сервера и реплик) и выполняет на каждом частые запросы CRUD, поэтому они попадают
+в кеш подготовленных запросов соединения еще до первого запроса клиента.
+"""
+import asyncio
+import os
+from datetime import datetime
+from decimal import Decimal
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.engine.result import result_tuple
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from common.database.connection import replica_router
+from common.database.crud import order_crud, user_crud
+from common.models.models import Order, User
+
+# false - сервис готов сразу после старта, без прогрева
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+# Сколько соединений открыть в каждом пуле; 0 - по размеру пула движка
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "0"))
+
+
+def sample_row(model, **values):
+    """Строка с колонками таблицы модели, как у select(*table.columns), для прогрева сериализации"""
+    columns = [column.name for column in model.__table__.columns]
+    return result_tuple(columns)([values.get(name) for name in columns])
+
+
+def sample_user():
+    return sample_row(User, id=1, name="Warm Up", email="warmup@example.com", created_at=datetime.utcnow())
+
+
+def sample_order():
+    return sample_row(Order, id=1, user_id=1, product_name="warmup", price=Decimal("9.99"),
+                      created_at=datetime.utcnow())
+
+
+async def _warm_connection(conn):
+    async with AsyncSession(bind=conn) as db:
+        await user_crud.warm_up(db)
+        await order_crud.warm_up(db)
+
+
+async def warm_engine(engine: AsyncEngine, connections: int = WARMUP_CONNECTIONS):
+    """Открыть connections соединений одновременно (иначе пул отдаст одно и то же)
+    и подготовить на каждом частые запросы; соединения остаются в пуле"""
+    connections = connections or engine.pool.size()
+    results = await asyncio.gather(
+        *(engine.connect().start() for _ in range(connections)), return_exceptions=True
+    )
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    try:
+        await asyncio.gather(*(_warm_connection(conn) for conn in opened))
+    finally:
+        await asyncio.gather(*(conn.close() for conn in opened))
+    for error in results:
+        if isinstance(error, BaseException):
+            raise error
+
+
+async def warm_up(render: Optional[Callable[[], Awaitable]] = None):
+    """Прогрев сервиса: пулы основного сервера и реплик, затем render - первая сериализация
+    ответов каждого вида, своя у каждого сервиса"""
+    if not WARMUP_ENABLED:
+        return
+    await asyncio.gather(*(warm_engine(engine) for engine in [replica_router.primary, *replica_router.replicas]))
+    if render is not None:
+        await render()
@@ -0,0 +1,59 @@
+"""
+Конфигурация gunicorn для REST и GraphQL API в несколько рабочих процессов.
+
+    gunicorn -c python:common.gunicorn_conf app.main:app --bind 0.0.0.0:8000
+
+- процессов - WEB_CONCURRENCY (по умолчанию 1);
+- каждый процесс - uvicorn с одним циклом событий (реализация и HTTP-парсер - из
+  common/runtime.py), приложение импортируется уже в нем,
+  поэтому движки и пулы БД создаются после fork; с --preload пулы, унаследованные от
+  мастера, заменяются новыми в post_fork;
+- DB_CONNECTION_BUDGET делится между процессами (common/database/connection.py);
+- метрики Prometheus всех процессов собираются через PROMETHEUS_MULTIPROC_DIR.
+"""
+import os
+import shutil
+import sys
+
+# Каталог метрик задается до импорта prometheus_client: процессы наследуют его от мастера
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+
+from prometheus_client import multiprocess  # noqa: E402
+from uvicorn.workers import UvicornWorker  # noqa: E402
+
+from common.runtime import uvicorn_options  # noqa: E402
+
+
+class RuntimeUvicornWorker(UvicornWorker):
+    """Рабочий процесс uvicorn с циклом событий и HTTP-парсером из common.runtime"""
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, **uvicorn_options()}
+
+
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "common.gunicorn_conf.RuntimeUvicornWorker"
+# Время на прогрев при старте процесса и на завершение запросов при остановке
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+# Логи приложения - JSON из common/monitoring/logging_setup; журнал доступа gunicorn не нужен
+accesslog = None
+
+
+def on_starting(server):
+    """Метрики прошлых запусков не должны попасть в новые: каталог очищается"""
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+
+def post_fork(server, worker):
+    """С preload_app движки созданы в мастере: процесс получает новые пулы,
+    соединения мастера при этом не закрываются"""
+    connection = sys.modules.get("common.database.connection")
+    if connection is not None:
+        for engine in (connection.engine, *connection.replica_engines):
+            engine.sync_engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """Датчики завершенного процесса больше не учитываются в live-режимах"""
+    multiprocess.mark_process_dead(worker.pid)
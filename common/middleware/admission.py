@@ -0,0 +1,313 @@
+"""
+Контроль допуска запросов: ограничение частоты по клиентам и адаптивный предел одновременных
+запросов сервиса. Лишний запрос сразу получает отказ (429 / RESOURCE_EXHAUSTED), а не ждет
+в очереди к пулу соединений БД.
+
+- Частота: корзина токенов на клиента, RATE_LIMIT_RPS запросов в секунду, всплеск до
+  RATE_LIMIT_BURST. Клиент - адрес, а если задан RATE_LIMIT_CLIENT_HEADER - значение этого
+  заголовка (метаданных gRPC), например от шлюза. Корзины в памяти процесса или общие
+  в Redis (RATE_LIMIT_REDIS_URL): одна квота на все процессы и экземпляры сервиса.
+- Одновременные запросы: ADMISSION_LIMIT_ALGORITHM
+    off - без предела; fixed - ADMISSION_INITIAL_LIMIT;
+    aimd - предел растет на 1 за "окно" успешных запросов и уменьшается в
+           ADMISSION_AIMD_BACKOFF раз, если задержка выше ADMISSION_TARGET_LATENCY_MS или ошибка;
+    gradient - предел следует отношению задержки без очереди (минимальной) к текущей.
+  Предел - в границах ADMISSION_MIN_LIMIT..ADMISSION_MAX_LIMIT.
+
+Подключение: AdmissionMiddleware (REST), common/middleware/admission_strawberry.py (GraphQL),
+common/middleware/admission_grpc.py (gRPC).
+"""
+import json
+import logging
+import math
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from common.monitoring.metrics import ADMISSION_IN_FLIGHT, ADMISSION_LIMIT, ADMISSION_REJECTED
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", "0"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "0")) or 2 * RATE_LIMIT_RPS
+RATE_LIMIT_CLIENT_HEADER = os.getenv("RATE_LIMIT_CLIENT_HEADER", "").lower()
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "")
+# Корзин в памяти не больше: при переполнении удаляются давно не использованные
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+
+ADMISSION_LIMIT_ALGORITHM = os.getenv("ADMISSION_LIMIT_ALGORITHM", "off")
+ADMISSION_INITIAL_LIMIT = int(os.getenv("ADMISSION_INITIAL_LIMIT", "20"))
+ADMISSION_MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", "2"))
+ADMISSION_MAX_LIMIT = int(os.getenv("ADMISSION_MAX_LIMIT", "200"))
+ADMISSION_TARGET_LATENCY_MS = float(os.getenv("ADMISSION_TARGET_LATENCY_MS", "50"))
+ADMISSION_AIMD_BACKOFF = float(os.getenv("ADMISSION_AIMD_BACKOFF", "0.9"))
+GRADIENT_WINDOW = 1000
+GRADIENT_TOLERANCE = 2.0
+
+_ALGORITHMS = ("off", "fixed", "aimd", "gradient")
+if ADMISSION_LIMIT_ALGORITHM not in _ALGORITHMS:
+    raise RuntimeError(
+        f"Недопустимое значение ADMISSION_LIMIT_ALGORITHM: {ADMISSION_LIMIT_ALGORITHM}. "
+        f"Допустимые: {', '.join(_ALGORITHMS)}"
+    )
+
+ADMISSION_ENABLED = RATE_LIMIT_RPS > 0 or ADMISSION_LIMIT_ALGORITHM != "off"
+
+# Служебные пути, к которым ограничения не применяются
+EXCLUDED_PATHS = ("/metrics", "/ready", "/admin")
+
+
+class Rejected(Exception):
+    """Запрос не допущен: reason - rate_limit или concurrency, retry_after - секунды"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(
+            "Превышен лимит запросов клиента" if reason == "rate_limit" else "Сервис перегружен, повторите позже"
+        )
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class MemoryBuckets:
+    """Корзины токенов в памяти процесса"""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = RATE_LIMIT_MAX_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        # Клиент -> (токены, время обновления); порядок - от давно не использованных
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    async def take(self, client: str, cost: float = 1) -> float:
+        """Списать cost токенов; 0 - допущен, иначе через сколько секунд токенов хватит"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / self.rate
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            del self._buckets[next(iter(self._buckets))]
+        return wait
+
+
+# Корзина в хеше Redis: токены и время обновления по часам Redis, ключ истекает, когда полон
+_TAKE_SCRIPT = """
+local rate, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= cost then tokens = tokens - cost else wait = (cost - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisBuckets:
+    """Общие корзины токенов в Redis. Redis недоступен - запросы допускаются (fail open)"""
+
+    def __init__(self, url: str, rate: float, burst: float, prefix: str = "ratelimit:"):
+        # Импорт по требованию: redis нужен только с общими корзинами
+        import redis.asyncio
+
+        self.client = redis.asyncio.from_url(url)
+        self.rate = rate
+        self.burst = burst
+        self.prefix = prefix
+        self._script = self.client.register_script(_TAKE_SCRIPT)
+        self._last_error = float("-inf")
+
+    async def take(self, client: str, cost: float = 1) -> float:
+        try:
+            return float(await self._script(keys=[self.prefix + client], args=[self.rate, self.burst, cost]))
+        except Exception as e:
+            # Не чаще раза в 10 секунд, чтобы при недоступном Redis не залить журнал
+            if time.monotonic() - self._last_error > 10:
+                self._last_error = time.monotonic()
+                logger.warning("Общие корзины недоступны, лимит частоты не применяется", extra={"error": str(e)})
+            return 0.0
+
+
+class ConcurrencyLimit:
+    """Предел одновременных запросов, подстраиваемый по задержке ответов"""
+
+    def __init__(self, algorithm: str = ADMISSION_LIMIT_ALGORITHM, initial: int = ADMISSION_INITIAL_LIMIT,
+                 minimum: int = ADMISSION_MIN_LIMIT, maximum: int = ADMISSION_MAX_LIMIT,
+                 target_latency: float = ADMISSION_TARGET_LATENCY_MS / 1000,
+                 backoff: float = ADMISSION_AIMD_BACKOFF):
+        self.algorithm = algorithm
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.in_flight = 0
+        self._last_decrease = float("-inf")
+        # gradient: минимальная задержка по окнам из GRADIENT_WINDOW запросов и текущая (среднее)
+        self._window_min = self._previous_min = math.inf
+        self._window_samples = 0
+        self._recent_latency: Optional[float] = None
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency: float, ok: bool):
+        """Запрос завершен за latency секунд; ok=False - ошибка сервера"""
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        if self.algorithm == "aimd":
+            self._aimd(latency, ok, in_flight)
+        elif self.algorithm == "gradient":
+            self._gradient(latency, in_flight)
+
+    def _aimd(self, latency: float, ok: bool, in_flight: int):
+        now = time.monotonic()
+        if not ok or latency > self.target_latency:
+            # Не чаще раза за время ответа: запросы одной волны перегрузки уменьшают предел один раз
+            if now - self._last_decrease > latency:
+                self._last_decrease = now
+                self.limit = max(self.minimum, self.limit * self.backoff)
+        elif in_flight * 2 >= self.limit:
+            # Растет, только если предел используется; +1 за limit успешных запросов
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def _gradient(self, latency: float, in_flight: int):
+        # Задержка без очереди - минимум за текущее и прошлое окно: старый минимум забывается,
+        # если запросы стали дороже (данные выросли)
+        self._window_min = min(self._window_min, latency)
+        self._window_samples += 1
+        if self._window_samples >= GRADIENT_WINDOW:
+            self._previous_min, self._window_min, self._window_samples = self._window_min, math.inf, 0
+        if self._recent_latency is None:
+            self._recent_latency = latency
+        self._recent_latency += (latency - self._recent_latency) * 0.1
+        if in_flight * 2 < self.limit:
+            return
+        # Задержка до GRADIENT_TOLERANCE раз выше минимальной - предел растет на sqrt(limit) (очередь),
+        # выше - уменьшается, но не больше чем вдвое за шаг
+        no_load = min(self._window_min, self._previous_min)
+        gradient = max(0.5, min(1.0, GRADIENT_TOLERANCE * no_load / self._recent_latency))
+        new_limit = self.limit * gradient + math.sqrt(self.limit)
+        self.limit = max(self.minimum, min(self.maximum, self.limit * 0.8 + new_limit * 0.2))
+
+
+class Admission:
+    """Допуск запросов сервиса: корзина клиента, затем предел одновременных запросов"""
+
+    def __init__(self, service: str, buckets=None, limit: Optional[ConcurrencyLimit] = None):
+        self.service = service
+        self.buckets = buckets
+        self.limit = limit
+        self._published_limit = None
+        self._publish_limit()
+
+    def _publish_limit(self):
+        if self.limit is not None and int(self.limit.limit) != self._published_limit:
+            self._published_limit = int(self.limit.limit)
+            ADMISSION_LIMIT.labels(self.service).set(self._published_limit)
+
+    async def enter(self, client: str) -> float:
+        """Допустить запрос клиента или Rejected; результат передается в exit"""
+        if self.buckets is not None:
+            wait = await self.buckets.take(client)
+            if wait:
+                ADMISSION_REJECTED.labels(self.service, "rate_limit").inc()
+                raise Rejected("rate_limit", wait)
+        if self.limit is not None:
+            if not self.limit.try_acquire():
+                ADMISSION_REJECTED.labels(self.service, "concurrency").inc()
+                raise Rejected("concurrency", 1)
+            ADMISSION_IN_FLIGHT.labels(self.service).inc()
+        return time.perf_counter()
+
+    def exit(self, started: float, ok: bool = True):
+        """Запрос, допущенный enter, завершен"""
+        if self.limit is not None:
+            ADMISSION_IN_FLIGHT.labels(self.service).dec()
+            self.limit.release(time.perf_counter() - started, ok)
+            self._publish_limit()
+
+
+def create_admission(service: str) -> Admission:
+    """Допуск по настройкам окружения"""
+    buckets = None
+    if RATE_LIMIT_RPS > 0:
+        buckets = (
+            RedisBuckets(RATE_LIMIT_REDIS_URL, RATE_LIMIT_RPS, RATE_LIMIT_BURST, prefix=f"ratelimit:{service}:")
+            if RATE_LIMIT_REDIS_URL else MemoryBuckets(RATE_LIMIT_RPS, RATE_LIMIT_BURST)
+        )
+    limit = ConcurrencyLimit() if ADMISSION_LIMIT_ALGORITHM != "off" else None
+    return Admission(service, buckets, limit)
+
+
+def retry_after_header(retry_after: float) -> str:
+    """Значение Retry-After: целые секунды, не меньше 1"""
+    return str(max(1, math.ceil(retry_after)))
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def http_client(scope) -> str:
+    """Клиент HTTP-запроса: заголовок RATE_LIMIT_CLIENT_HEADER или адрес"""
+    if RATE_LIMIT_CLIENT_HEADER:
+        client = _header(scope, RATE_LIMIT_CLIENT_HEADER.encode("latin-1"))
+        if client:
+            return client
+    return scope["client"][0] if scope.get("client") else "unknown"
+
+
+class AdmissionMiddleware:
+    """ASGI-middleware: отказ 429 с Retry-After до обработки запроса"""
+
+    def __init__(self, app, service: str):
+        self.app = app
+        self.admission = create_admission(service)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXCLUDED_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            started = await self.admission.enter(http_client(scope))
+        except Rejected as e:
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"retry-after", retry_after_header(e.retry_after).encode("latin-1")),
+                ],
+            })
+            body = json.dumps({"detail": str(e)}, ensure_ascii=False, separators=(",", ":"))
+            await send({"type": "http.response.body", "body": body.encode()})
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.admission.exit(started, ok=status < 500)
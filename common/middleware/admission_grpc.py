@@ -0,0 +1,74 @@
+import grpc
+
+from common.middleware.admission import RATE_LIMIT_CLIENT_HEADER, Rejected, create_admission
+
+
+def grpc_client(context) -> str:
+    """Клиент вызова: метаданные RATE_LIMIT_CLIENT_HEADER или адрес без порта"""
+    if RATE_LIMIT_CLIENT_HEADER:
+        for key, value in context.invocation_metadata() or ():
+            if key == RATE_LIMIT_CLIENT_HEADER and value:
+                return value
+    # ipv4:10.0.0.1:12345, ipv6:[::1]:12345
+    return context.peer().rpartition(":")[0] or "unknown"
+
+
+class AdmissionInterceptor(grpc.aio.ServerInterceptor):
+    """Интерцептор gRPC: контроль допуска (common/middleware/admission.py).
+    Отказ - RESOURCE_EXHAUSTED и grpc-retry-pushback-ms в trailing metadata.
+    Потоковые вызовы (ExportOrders, ImportOrders, RestoreOrders) занимают место в пределе
+    одновременных запросов до конца потока"""
+
+    def __init__(self, service: str):
+        self.admission = create_admission(service)
+
+    async def _enter(self, context) -> float:
+        try:
+            return await self.admission.enter(grpc_client(context))
+        except Rejected as e:
+            await context.abort(
+                grpc.StatusCode.RESOURCE_EXHAUSTED, str(e),
+                trailing_metadata=(("grpc-retry-pushback-ms", str(int(e.retry_after * 1000))),),
+            )
+
+    def _admitted(self, behavior):
+        """Обработчик с одним ответом (unary_unary, stream_unary)"""
+        async def admitted_behavior(request_or_iterator, context):
+            started = await self._enter(context)
+            ok = False
+            try:
+                response = await behavior(request_or_iterator, context)
+                ok = True
+                return response
+            finally:
+                self.admission.exit(started, ok)
+        return admitted_behavior
+
+    def _admitted_stream(self, behavior):
+        """Обработчик с потоком ответов (unary_stream)"""
+        async def admitted_behavior(request, context):
+            started = await self._enter(context)
+            ok = False
+            try:
+                async for response in behavior(request, context):
+                    yield response
+                ok = True
+            finally:
+                self.admission.exit(started, ok)
+        return admitted_behavior
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return handler
+        serializers = {
+            "request_deserializer": handler.request_deserializer,
+            "response_serializer": handler.response_serializer,
+        }
+        if handler.unary_unary is not None:
+            return grpc.unary_unary_rpc_method_handler(self._admitted(handler.unary_unary), **serializers)
+        if handler.stream_unary is not None:
+            return grpc.stream_unary_rpc_method_handler(self._admitted(handler.stream_unary), **serializers)
+        if handler.unary_stream is not None:
+            return grpc.unary_stream_rpc_method_handler(self._admitted_stream(handler.unary_stream), **serializers)
+        return handler
@@ -0,0 +1,49 @@
+from typing import List, Optional
+
+from graphql import ExecutionResult, GraphQLError
+from strawberry.extensions import Extension
+
+from common.middleware.admission import Rejected, create_admission, http_client, retry_after_header
+
+# Код отказа в extensions ошибки GraphQL
+REJECTED_CODE = "RESOURCE_EXHAUSTED"
+
+
+def admission_extension(service: str):
+    """Расширение Strawberry с контролем допуска сервиса (common/middleware/admission.py).
+    Проверка - перед выполнением: запрос с ошибками разбора или валидации квоту не расходует.
+    Отказ - ошибка GraphQL с extensions.code и HTTP 429 с Retry-After; выполнение пропускается"""
+    admission = create_admission(service)
+
+    class AdmissionExtension(Extension):
+        def __init__(self, *, execution_context):
+            super().__init__(execution_context=execution_context)
+            self._started: Optional[float] = None
+
+        async def on_executing_start(self):
+            context = self.execution_context.context
+            request = context.get("request") if isinstance(context, dict) else None
+            if request is None:
+                # Схема вызвана напрямую (прогрев), а не через HTTP
+                return
+            try:
+                self._started = await admission.enter(http_client(request.scope))
+            except Rejected as e:
+                response = context.get("response")
+                if response is not None:
+                    response.status_code = 429
+                    response.headers["retry-after"] = retry_after_header(e.retry_after)
+                error = GraphQLError(str(e), extensions={"code": REJECTED_CODE, "reason": e.reason})
+                self.execution_context.result = ExecutionResult(data=None, errors=[error])
+
+        def on_executing_end(self):
+            if self._started is not None:
+                admission.exit(self._started)
+                self._started = None
+
+    return AdmissionExtension
+
+
+def without_rejections(errors: List[GraphQLError]) -> List[GraphQLError]:
+    """Ошибки без отказов допуска: отказы - ожидаемый ответ под нагрузкой, в журнал не пишутся"""
+    return [error for error in errors if (error.extensions or {}).get("code") != REJECTED_CODE]
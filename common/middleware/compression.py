@@ -0,0 +1,225 @@
+import asyncio
+import os
+import zlib
+from typing import Dict, List, Optional
+
+from common.monitoring.timing import phase
+
+# brotli и zstandard - необязательные зависимости: без них алгоритм просто недоступен
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Параметры сжатия из переменных окружения
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+# Алгоритмы в порядке предпочтения сервера
+COMPRESSION_ALGORITHMS = os.getenv("COMPRESSION_ALGORITHMS", "zstd,br,gzip")
+# Ответы меньше порога не сжимаются
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "3"))
+# Большие ответы сжимаются в пуле потоков, чтобы не блокировать цикл событий
+COMPRESSION_OFFLOAD_SIZE = int(os.getenv("COMPRESSION_OFFLOAD_SIZE", str(256 * 1024)))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/graphql", "text/")
+
+
+class GzipEncoder:
+    def __init__(self, level: int = GZIP_LEVEL):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int = BROTLI_QUALITY):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int = ZSTD_LEVEL):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def available_encoders() -> Dict[str, type]:
+    """Алгоритмы, доступные в текущем окружении"""
+    encoders = {"gzip": GzipEncoder}
+    if brotli is not None:
+        encoders["br"] = BrotliEncoder
+    if zstandard is not None:
+        encoders["zstd"] = ZstdEncoder
+    return encoders
+
+
+def choose_encoding(accept_encoding: str, preferred: List[str]) -> Optional[str]:
+    """Выбрать алгоритм по Accept-Encoding с учетом q-значений и предпочтений сервера"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+
+    for name in preferred:
+        if accepted.get(name, accepted.get("*", 0.0)) > 0:
+            return name
+    return None
+
+
+def _get_header(headers, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+class CompressionMiddleware:
+    """ASGI-middleware: сжатие ответов gzip/br/zstd по Accept-Encoding, в том числе потоковых"""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE,
+                 algorithms: str = COMPRESSION_ALGORITHMS):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders = available_encoders()
+        self.preferred = [name.strip() for name in algorithms.split(",") if name.strip() in self.encoders]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED or not self.preferred:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = _get_header(scope["headers"], b"accept-encoding")
+        encoding = choose_encoding(accept_encoding.decode("latin-1"), self.preferred) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(send, encoding, self.encoders[encoding], self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Сжатие одного ответа: целиком, если тело пришло одним сообщением, иначе потоково"""
+
+    def __init__(self, send, encoding: str, encoder_class, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.encoder_class = encoder_class
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.encoder = None
+        self.passthrough = False
+
+    async def send(self, message):
+        if self.passthrough:
+            await self._send(message)
+        elif message["type"] == "http.response.start":
+            self._on_start(message)
+            if self.passthrough:
+                await self._send(message)
+        elif message["type"] == "http.response.body":
+            await self._on_body(message)
+        else:
+            await self._send(message)
+
+    def _on_start(self, message):
+        headers = message.get("headers", [])
+        content_type = (_get_header(headers, b"content-type") or b"").decode("latin-1")
+        if (
+            message["status"] in (204, 304)
+            or _get_header(headers, b"content-encoding") is not None
+            or not content_type.startswith(COMPRESSIBLE_TYPES)
+        ):
+            self.passthrough = True
+        else:
+            # Заголовки отправим, когда станет известно, сжимается ли тело
+            self.start_message = message
+
+    def _compressed_start(self, content_length: Optional[int]):
+        headers = []
+        for key, value in self.start_message.get("headers", []):
+            name = key.lower()
+            if name == b"content-length":
+                continue
+            if name == b"etag" and not value.startswith(b"W/"):
+                # Сжатое представление побайтно отличается, поэтому ETag становится слабым
+                value = b"W/" + value
+            headers.append((key, value))
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        headers.append((b"vary", b"Accept-Encoding"))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        return {**self.start_message, "headers": headers}
+
+    def _compress_all(self, body: bytes) -> bytes:
+        encoder = self.encoder_class()
+        return encoder.compress(body) + encoder.finish()
+
+    async def _on_body(self, message):
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None and not more_body:
+            # Тело целиком в одном сообщении
+            if len(body) < self.minimum_size:
+                headers = list(self.start_message.get("headers", [])) + [(b"vary", b"Accept-Encoding")]
+                await self._send({**self.start_message, "headers": headers})
+                await self._send(message)
+                return
+            with phase("compress"):
+                if len(body) >= COMPRESSION_OFFLOAD_SIZE:
+                    loop = asyncio.get_running_loop()
+                    compressed = await loop.run_in_executor(None, self._compress_all, body)
+                else:
+                    compressed = self._compress_all(body)
+            await self._send(self._compressed_start(len(compressed)))
+            await self._send({"type": "http.response.body", "body": compressed})
+            return
+
+        if self.encoder is None:
+            # Потоковый ответ: длина заранее неизвестна, каждый фрагмент сбрасываем сразу
+            self.encoder = self.encoder_class()
+            await self._send(self._compressed_start(None))
+
+        with phase("compress"):
+            chunk = self.encoder.compress(body)
+            chunk += self.encoder.flush() if more_body else self.encoder.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
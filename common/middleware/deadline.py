@@ -0,0 +1,138 @@
+"""
+Срок обработки HTTP-запроса и отмена обработки при отключении клиента (REST и GraphQL).
+
+- Срок: заголовок x-request-timeout-ms клиента, не больше REQUEST_TIMEOUT_MS сервера
+  (0 - без ограничения сервера). Передается в SQL-запросы как statement_timeout
+  (common/database/deadline.py). Истек - обработка отменяется, ответ 504.
+- Потоковые выгрузки (пути, оканчивающиеся на /export) выполняются без срока: заголовки и
+  начало тела уходят клиенту сразу, и срок оборвал бы выгрузку на середине - клиент получил бы
+  усеченный ответ 200.
+- Клиент отключился до ответа (CANCEL_ON_DISCONNECT, по умолчанию выключено) - обработка
+  отменяется вместе с запросом к БД: asyncpg отправляет серверу отмену выполняющегося запроса.
+  Для этого каждый запрос идет через задачу и наблюдателя за сообщениями клиента; без срока и
+  без CANCEL_ON_DISCONNECT запрос передается приложению напрямую, без накладных расходов.
+- GraphQL отвечает на DeadlineExceeded из резолвера через расширение Strawberry
+  (common/middleware/deadline_strawberry.py): ошибка в резолвере не доходит до middleware.
+
+Прерванные запросы и время на них - api_requests_abandoned_total и
+api_abandoned_work_seconds_total.
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Optional
+
+from common.database.deadline import DeadlineExceeded, note_abandoned, reset_deadline, set_deadline
+
+REQUEST_TIMEOUT_MS = float(os.getenv("REQUEST_TIMEOUT_MS", "0"))
+CANCEL_ON_DISCONNECT = os.getenv("CANCEL_ON_DISCONNECT", "false").lower() == "true"
+
+TIMEOUT_HEADER = b"x-request-timeout-ms"
+
+# Служебные пути не ограничиваются
+EXCLUDED_PATHS = ("/metrics", "/ready", "/admin")
+# Окончания путей потоковых выгрузок: без срока, но с отменой при отключении клиента
+STREAMING_PATH_SUFFIXES = ("/export",)
+
+
+def request_timeout(scope) -> Optional[float]:
+    """Срок запроса в секундах: меньший из заголовка клиента и REQUEST_TIMEOUT_MS; None - без срока"""
+    if scope["path"].rstrip("/").endswith(STREAMING_PATH_SUFFIXES):
+        return None
+    timeouts = [REQUEST_TIMEOUT_MS] if REQUEST_TIMEOUT_MS > 0 else []
+    for key, value in scope["headers"]:
+        if key == TIMEOUT_HEADER:
+            try:
+                timeouts.append(max(0.0, float(value)))
+            except ValueError:
+                pass
+    return min(timeouts) / 1000 if timeouts else None
+
+
+class DeadlineMiddleware:
+    """ASGI-middleware: срок запроса и отмена обработки при отключении клиента"""
+
+    def __init__(self, app, service: str):
+        self.app = app
+        self.service = service
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXCLUDED_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        timeout = request_timeout(scope)
+        if timeout is None and not CANCEL_ON_DISCONNECT:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        # Сообщения клиента читает только наблюдатель и передает приложению через очередь:
+        # так отключение заметно, даже если приложение не читает тело (GET)
+        messages = asyncio.Queue(maxsize=1)
+        response_started = response_complete = False
+        abandoned = None
+
+        async def app_receive():
+            return await messages.get()
+
+        async def app_send(message):
+            nonlocal response_started, response_complete
+            if message["type"] == "http.response.start":
+                response_started = True
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        token = set_deadline(timeout)
+        try:
+            app_task = asyncio.ensure_future(self.app(scope, app_receive, app_send))
+        finally:
+            reset_deadline(token)
+
+        async def watch():
+            nonlocal abandoned
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    if messages.empty():
+                        messages.put_nowait(message)
+                    # После полного ответа отключение - обычное завершение запроса
+                    if CANCEL_ON_DISCONNECT and not response_complete and not app_task.done():
+                        abandoned = "client_disconnect"
+                        app_task.cancel()
+                    return
+                await messages.put(message)
+
+        watcher = asyncio.ensure_future(watch())
+        try:
+            done, _ = await asyncio.wait({app_task}, timeout=timeout)
+            if not done:
+                abandoned = "deadline"
+                app_task.cancel()
+            try:
+                await app_task
+            except asyncio.CancelledError:
+                if abandoned is None:
+                    raise
+            except DeadlineExceeded:
+                abandoned = "deadline"
+        except asyncio.CancelledError:
+            # Отменен сам запрос (остановка сервера)
+            app_task.cancel()
+            raise
+        finally:
+            watcher.cancel()
+
+        if abandoned is None:
+            return
+        note_abandoned(self.service, abandoned, started)
+        if abandoned == "deadline" and not response_started:
+            body = json.dumps({"detail": str(DeadlineExceeded())}, ensure_ascii=False, separators=(",", ":"))
+            await send({
+                "type": "http.response.start",
+                "status": 504,
+                "headers": [(b"content-type", b"application/json")],
+            })
+            await send({"type": "http.response.body", "body": body.encode()})
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import grpc
+
+from common.database.deadline import DeadlineExceeded, note_abandoned, reset_deadline, set_deadline
+
+
+class DeadlineInterceptor(grpc.aio.ServerInterceptor):
+    """Интерцептор gRPC: deadline клиента (context.time_remaining()) - срок SQL-запросов вызова
+    (common/database/deadline.py). Когда клиент отменяет вызов или срок истекает, grpc.aio
+    отменяет обработчик, а с ним и запрос к БД; такие вызовы учитываются как прерванные.
+    Для потоковых вызовов deadline клиента относится ко всему потоку, как в протоколе gRPC"""
+
+    def __init__(self, service: str):
+        self.service = service
+
+    def _abandoned(self, timeout, started: float):
+        # Отмена: истек срок или клиент отключился
+        expired = timeout is not None and time.monotonic() - started >= timeout
+        note_abandoned(self.service, "deadline" if expired else "client_disconnect", started)
+
+    def _with_deadline(self, behavior):
+        """Обработчик с одним ответом (unary_unary, stream_unary)"""
+        async def behavior_with_deadline(request_or_iterator, context):
+            timeout = context.time_remaining()
+            started = time.monotonic()
+            token = set_deadline(timeout)
+            try:
+                return await behavior(request_or_iterator, context)
+            except asyncio.CancelledError:
+                self._abandoned(timeout, started)
+                raise
+            except DeadlineExceeded as e:
+                note_abandoned(self.service, "deadline", started)
+                await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, str(e))
+            finally:
+                reset_deadline(token)
+        return behavior_with_deadline
+
+    def _stream_with_deadline(self, behavior):
+        """Обработчик с потоком ответов (unary_stream)"""
+        async def behavior_with_deadline(request, context):
+            timeout = context.time_remaining()
+            started = time.monotonic()
+            # Срок действует только на шаге генератора: код grpc между ответами выполняется
+            # без него, а токен сбрасывается там же, где выставлен
+            responses = behavior(request, context)
+            try:
+                while True:
+                    token = set_deadline(timeout - (time.monotonic() - started) if timeout is not None else None)
+                    try:
+                        response = await responses.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        reset_deadline(token)
+                    yield response
+            except asyncio.CancelledError:
+                self._abandoned(timeout, started)
+                raise
+            except DeadlineExceeded as e:
+                note_abandoned(self.service, "deadline", started)
+                await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, str(e))
+            finally:
+                await responses.aclose()
+        return behavior_with_deadline
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return handler
+        serializers = {
+            "request_deserializer": handler.request_deserializer,
+            "response_serializer": handler.response_serializer,
+        }
+        if handler.unary_unary is not None:
+            return grpc.unary_unary_rpc_method_handler(self._with_deadline(handler.unary_unary), **serializers)
+        if handler.stream_unary is not None:
+            return grpc.stream_unary_rpc_method_handler(self._with_deadline(handler.stream_unary), **serializers)
+        if handler.unary_stream is not None:
+            return grpc.unary_stream_rpc_method_handler(
+                self._stream_with_deadline(handler.unary_stream), **serializers
+            )
+        return handler
@@ -0,0 +1,48 @@
+import time
+from typing import List, Optional
+
+from graphql import GraphQLError
+from strawberry.extensions import Extension
+
+from common.database.deadline import DeadlineExceeded, note_abandoned
+
+# Код ошибки истекшего срока в extensions ошибки GraphQL
+DEADLINE_CODE = "DEADLINE_EXCEEDED"
+
+
+def deadline_extension(service: str):
+    """Расширение Strawberry для сроков запросов (common/middleware/deadline.py).
+    DeadlineExceeded из резолвера (срок истек до SQL-запроса или по statement_timeout) Strawberry
+    превращает в ошибку GraphQL с HTTP 200; расширение отмечает ее extensions.code и отвечает 504,
+    как REST, и учитывает прерванный запрос в api_requests_abandoned_total"""
+
+    class DeadlineExtension(Extension):
+        def __init__(self, *, execution_context):
+            super().__init__(execution_context=execution_context)
+            self._started: Optional[float] = None
+
+        def on_executing_start(self):
+            self._started = time.monotonic()
+
+        def on_executing_end(self):
+            result = self.execution_context.result
+            errors = [
+                error for error in (result.errors if result is not None else None) or []
+                if isinstance(error.original_error, DeadlineExceeded)
+            ]
+            if not errors:
+                return
+            for error in errors:
+                error.extensions = {**(error.extensions or {}), "code": DEADLINE_CODE}
+            context = self.execution_context.context
+            response = context.get("response") if isinstance(context, dict) else None
+            if response is not None:
+                response.status_code = 504
+            note_abandoned(service, "deadline", self._started)
+
+    return DeadlineExtension
+
+
+def without_deadline_errors(errors: List[GraphQLError]) -> List[GraphQLError]:
+    """Ошибки без истекших сроков: они учтены в метриках, в журнал не пишутся, как 504 у REST"""
+    return [error for error in errors if not isinstance(error.original_error, DeadlineExceeded)]
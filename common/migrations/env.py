@@ -0,0 +1,43 @@
+"""
+Окружение Alembic. common.database.migrate передает готовое соединение
+в config.attributes["connection"]; команды alembic из консоли подключаются
+движком из common.database.connection (переменные POSTGRES_*).
+"""
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+
+from common.models.base import Base
+import common.models.models  # noqa: F401 - регистрирует таблицы в Base.metadata
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations(connection):
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_with_engine():
+    from common.database.connection import engine
+    async with engine.begin() as connection:
+        await connection.run_sync(run_migrations)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    # SQL миграций без подключения к БД: alembic upgrade head --sql
+    from common.database.connection import DATABASE_URL
+    context.configure(url=DATABASE_URL, target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+elif config.attributes.get("connection") is not None:
+    run_migrations(config.attributes["connection"])
+else:
+    asyncio.run(run_migrations_with_engine())
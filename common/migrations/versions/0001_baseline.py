@@ -0,0 +1,66 @@
+"""Базовая схема: users, orders, user_order_stats
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from common.models.models import ORDERS_PARTITIONED
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("email", sa.String(length=100), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+
+    # Секционирование задается при создании таблицы: ORDERS_PARTITIONED нужно выставить до первой миграции
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("product_name", sa.String(length=255), nullable=False),
+        sa.Column("price", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=not ORDERS_PARTITIONED),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id", "created_at") if ORDERS_PARTITIONED else sa.PrimaryKeyConstraint("id"),
+        **({"postgresql_partition_by": "RANGE (created_at)"} if ORDERS_PARTITIONED else {}),
+    )
+    op.create_index("ix_orders_id", "orders", ["id"])
+    op.create_index("ix_orders_user_id_created_at", "orders", ["user_id", "created_at"])
+    op.create_index("ix_orders_created_at", "orders", ["created_at"])
+    op.create_index("ix_orders_price", "orders", ["price"])
+    op.create_index(
+        "ix_orders_product_name_prefix", "orders", ["product_name"],
+        postgresql_ops={"product_name": "text_pattern_ops"},
+    )
+
+    op.create_table(
+        "user_order_stats",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("order_count", sa.Integer(), nullable=False),
+        sa.Column("total_spent", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index("ix_user_order_stats_total_spent", "user_order_stats", ["total_spent"])
+    op.create_index("ix_user_order_stats_order_count", "user_order_stats", ["order_count"])
+
+
+def downgrade():
+    op.drop_table("user_order_stats")
+    op.drop_table("orders")
+    op.drop_table("users")
@@ -1 +1 @@
-from .models import User, Order
\ No newline at end of file
+from .models import User, Order, UserOrderStats
\ No newline at end of file
@@ -1,7 +1,12 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, DateTime, func
+import os
+from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from common.models.base import Base
 
+# Секционирование orders по месяцам created_at (только Postgres, секции создает
+# common/database/partitions.py). Ключ секционирования должен входить в первичный ключ
+ORDERS_PARTITIONED = os.getenv("ORDERS_PARTITIONED", "false").lower() == "true"
+
 class User(Base):
     __tablename__ = "users"
 
@@ -17,11 +22,44 @@ class User(Base):
 class Order(Base):
     __tablename__ = "orders"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # autoincrement явно: при составном первичном ключе SQLAlchemy сам не делает id SERIAL
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     product_name = Column(String(255), nullable=False)
     price = Column(Numeric(10, 2), nullable=False)
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, default=func.now(), primary_key=ORDERS_PARTITIONED)
 
     # Отношение к пользователю
-    user = relationship("User", back_populates="orders")
\ No newline at end of file
+    user = relationship("User", back_populates="orders")
+
+    # Индексы под фильтры и сортировку списка заказов
+    __table_args__ = (
+        # Заказы пользователя, в том числе по диапазону дат (ведущая колонка заменяет индекс по user_id)
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+        # Диапазон и сортировка по дате создания
+        Index("ix_orders_created_at", "created_at"),
+        # Диапазон и сортировка по цене
+        Index("ix_orders_price", "price"),
+        # Поиск по префиксу названия: LIKE 'префикс%' при любой collation
+        Index(
+            "ix_orders_product_name_prefix",
+            "product_name",
+            postgresql_ops={"product_name": "text_pattern_ops"},
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"} if ORDERS_PARTITIONED else {},
+    )
+
+
+class UserOrderStats(Base):
+    """Сводка заказов пользователя, обновляется вместе с заказами (ORDER_STATS_SUMMARY)"""
+    __tablename__ = "user_order_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    total_spent = Column(Numeric(14, 2), nullable=False, default=0)
+
+    # Топ пользователей без полного прохода по таблице заказов
+    __table_args__ = (
+        Index("ix_user_order_stats_total_spent", "total_spent"),
+        Index("ix_user_order_stats_order_count", "order_count"),
+    )
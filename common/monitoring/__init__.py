@@ -0,0 +1 @@
+from .timing import RequestTimer, phase, start_request, finish_request, mark_handler_done
@@ -0,0 +1,60 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from common.monitoring.metrics import render_metrics
+
+logger = logging.getLogger(__name__)
+
+# Обработчик получает параметры запроса и возвращает (статус, content-type, тело)
+AdminHandler = Callable[[Dict[str, str]], Awaitable[Tuple[int, str, bytes]]]
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 409: "Conflict", 503: "Service Unavailable"}
+
+
+async def metrics_handler(params: Dict[str, str]):
+    """Метрики в формате Prometheus"""
+    body, content_type = render_metrics()
+    return 200, content_type, body
+
+
+async def _handle_connection(routes: Dict[str, AdminHandler], reader, writer):
+    try:
+        request_line = await reader.readline()
+        # Заголовки запроса не нужны, дочитываем их до пустой строки
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+
+        parts = request_line.decode("latin-1").split()
+        if len(parts) < 2 or parts[0] != "GET":
+            status, content_type, body = 400, "text/plain", b"Only GET is supported\n"
+        else:
+            url = urlsplit(parts[1])
+            handler = routes.get(url.path)
+            if handler is None:
+                status, content_type, body = 404, "text/plain", b"Not found\n"
+            else:
+                status, content_type, body = await handler(dict(parse_qsl(url.query)))
+
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+    except Exception as e:
+        logger.warning(f"Ошибка обработки служебного запроса: {e}")
+    finally:
+        writer.close()
+
+
+async def start_admin_server(routes: Dict[str, AdminHandler], port: int, host: str = "0.0.0.0"):
+    """Запустить служебный HTTP-сервер (метрики и диагностика) рядом с gRPC"""
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_connection(routes, reader, writer), host, port
+    )
+    logger.info(f"Служебный HTTP-сервер запущен на порту {port}")
+    return server
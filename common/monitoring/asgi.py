@@ -0,0 +1,99 @@
+import asyncio
+import functools
+
+from fastapi import APIRouter, Request, Response
+from fastapi.routing import APIRoute
+
+from common.monitoring.metrics import render_metrics
+from common.monitoring.profiler import loop_lag_handler, profile_handler
+from common.monitoring.readiness import ready_handler
+from common.monitoring.timing import finish_request, mark_handler_done, start_request
+
+# Служебные пути, которые не замеряются
+EXCLUDED_PATHS = ("/metrics", "/ready", "/admin")
+
+
+class ServerTimingMiddleware:
+    """ASGI-middleware: замер фаз запроса, заголовок Server-Timing и гистограммы"""
+
+    def __init__(self, app, service: str):
+        self.app = app
+        self.service = service
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXCLUDED_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        timer, token = start_request(self.service)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                timer.mark_response_start()
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timer.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            timer.observe()
+            finish_request(token)
+
+
+def _mark_handler_done(endpoint):
+    """Обертка эндпоинта, отмечающая окончание обработчика"""
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            mark_handler_done()
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """Маршрут FastAPI, отделяющий время обработчика от валидации и сериализации ответа"""
+
+    def __init__(self, path, endpoint, **kwargs):
+        if asyncio.iscoroutinefunction(endpoint):
+            endpoint = _mark_handler_done(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _as_response(result):
+    status, content_type, body = result
+    return Response(content=body, status_code=status, media_type=content_type)
+
+
+# Служебные маршруты: метрики Prometheus и готовность к нагрузке
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+@metrics_router.get("/ready", include_in_schema=False)
+async def ready():
+    """200 после прогрева, до него - 503"""
+    return _as_response(await ready_handler({}))
+
+
+# Служебные эндпоинты профилирования, подключаются при PROFILER_ENABLED=true
+admin_router = APIRouter(prefix="/admin", include_in_schema=False)
+
+
+@admin_router.get("/profile")
+async def profile(request: Request):
+    """Свернутые стеки цикла событий за ?seconds=N"""
+    return _as_response(await profile_handler(dict(request.query_params)))
+
+
+@admin_router.get("/loop-lag")
+async def loop_lag(request: Request):
+    """Задержки цикла событий"""
+    return _as_response(await loop_lag_handler(dict(request.query_params)))
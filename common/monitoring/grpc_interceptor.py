@@ -0,0 +1,40 @@
+import grpc
+
+from common.monitoring.timing import finish_request, phase, start_request
+
+
+class ServerTimingInterceptor(grpc.aio.ServerInterceptor):
+    """Интерцептор gRPC: замер фаз вызова, Server-Timing в trailing metadata и гистограммы"""
+
+    def __init__(self, service: str):
+        self.service = service
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None or handler.unary_unary is None:
+            return handler
+
+        behavior = handler.unary_unary
+        serializer = handler.response_serializer
+        service = self.service
+
+        async def timed_behavior(request, context):
+            timer, token = start_request(service)
+            try:
+                response = await behavior(request, context)
+                # Сериализуем здесь, чтобы учесть время кодирования protobuf
+                with phase("serialize"):
+                    return serializer(response) if serializer else response
+            finally:
+                # Дополняем, а не заменяем trailing metadata обработчика и интерцепторов
+                # (например, grpc-retry-pushback-ms при отказе допуска)
+                trailers = tuple(context.trailing_metadata() or ())
+                context.set_trailing_metadata(trailers + (("server-timing", timer.server_timing()),))
+                timer.observe()
+                finish_request(token)
+
+        return grpc.unary_unary_rpc_method_handler(
+            timed_behavior,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=None,
+        )
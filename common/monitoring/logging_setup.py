@@ -0,0 +1,141 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+# Параметры логирования из переменных окружения
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Уровни отдельных логгеров: "sqlalchemy.engine=WARNING,app.main=DEBUG"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+# Формат вывода: json или text
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+
+# Медленные запросы логируются всегда, остальные - с заданной вероятностью
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "100"))
+SQL_LOG_SAMPLE_RATE = float(os.getenv("SQL_LOG_SAMPLE_RATE", "0"))
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Стандартные атрибуты LogRecord, не попадающие в JSON как дополнительные поля
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирование записей лога в одну строку JSON"""
+
+    def __init__(self, service: str):
+        super().__init__()
+        self.service = service
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "service": self.service,
+            "message": record.getMessage(),
+        }
+        # Поля, переданные через extra=...
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def parse_levels(spec: str):
+    """Разобрать строку вида "logger=LEVEL,logger2=LEVEL" """
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.strip().partition("=")
+        if sep and name:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(service: str, stream=None) -> logging.handlers.QueueListener:
+    """Настроить асинхронное логирование: запись в поток выполняется фоновым потоком"""
+    if LOG_FORMAT == "json":
+        formatter = JsonFormatter(service)
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(formatter)
+
+    # Цикл событий только кладет запись в очередь, форматирование и вывод - в listener
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(LOG_LEVEL.upper())
+
+    # uvicorn пишет в stdout своими обработчиками - направляем его логи в общую очередь
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    for name, level in parse_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    return listener
+
+
+sql_logger = logging.getLogger("common.database.sql")
+
+_SQL_STARTS_KEY = "sql_logging_starts"
+
+
+def log_sql(statement: str, duration_ms: float, slow_query_ms: float = SQL_SLOW_QUERY_MS,
+            sample_rate: float = SQL_LOG_SAMPLE_RATE):
+    """Записать SQL-запрос в лог, если он медленный или попал в выборку"""
+    if duration_ms >= slow_query_ms:
+        sql_logger.warning(
+            "Медленный запрос",
+            extra={"statement": statement, "duration_ms": round(duration_ms, 2)},
+        )
+    elif sample_rate and random.random() < sample_rate:
+        sql_logger.info(
+            "Запрос",
+            extra={"statement": statement, "duration_ms": round(duration_ms, 2)},
+        )
+
+
+def install_sql_logging(engine, slow_query_ms: float = SQL_SLOW_QUERY_MS,
+                        sample_rate: float = SQL_LOG_SAMPLE_RATE):
+    """Логировать медленные SQL-запросы и случайную выборку остальных вместо echo=True"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_SQL_STARTS_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_SQL_STARTS_KEY)
+        if not starts:
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+        log_sql(statement, duration_ms, slow_query_ms, sample_rate)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get(_SQL_STARTS_KEY) if conn is not None else None
+        if starts:
+            starts.pop()
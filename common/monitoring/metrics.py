@@ -0,0 +1,141 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+# Несколько рабочих процессов (common/gunicorn_conf.py): каждый пишет метрики в файлы этого
+# каталога, а /metrics любого процесса отдает их вместе. Не задан - один процесс
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Границы корзин гистограмм в секундах: от долей миллисекунды до нескольких секунд
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+# Время отдельных фаз обработки запроса (pool, sql, orm, serialize, ...)
+REQUEST_PHASE_SECONDS = Histogram(
+    "api_request_phase_seconds",
+    "Время фаз обработки запроса на сервере",
+    ["service", "phase"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Полное время обработки запроса на сервере
+REQUEST_DURATION_SECONDS = Histogram(
+    "api_request_duration_seconds",
+    "Полное время обработки запроса на сервере",
+    ["service"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+# Задержки цикла событий: насколько позже запланированного просыпается контрольная задача
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds",
+    "Задержка цикла событий",
+    ["service"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Маршрутизация запросов между основным сервером БД и репликами
+DB_ROUTED_STATEMENTS = Counter(
+    "db_routed_statements_total",
+    "Запросы сессий по узлам БД",
+    ["target"],
+)
+
+# Результат последней проверки реплики: 1 - доступна, 0 - исключена из чтения
+DB_REPLICA_UP = Gauge(
+    "db_replica_up",
+    "Доступность реплики БД",
+    ["replica"],
+    multiprocess_mode="livemin",
+)
+
+# Строки, выгруженные (out) и загруженные (in) через COPY
+DB_COPY_ROWS = Counter(
+    "db_copy_rows_total",
+    "Строки массовой выгрузки и загрузки через COPY",
+    ["direction"],
+)
+
+# Чтения, объединенные с одинаковыми одновременными (coalesced) и выполненные в БД (executed)
+DB_COALESCED_READS = Counter(
+    "db_coalesced_reads_total",
+    "Чтения с объединением одинаковых одновременных запросов",
+    ["query", "result"],
+)
+
+# Групповая фиксация: записей в пачке (одна транзакция и одна фиксация на пачку)
+DB_GROUP_COMMIT_BATCH = Histogram(
+    "db_group_commit_batch_size",
+    "Записей в пачке групповой фиксации",
+    ["table"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+
+# Создание записей с ключом идемпотентности: executed - выполнено, replayed - повтор получил
+# сохраненный результат, mismatch и in_progress - отказ (ключ с другими параметрами, еще выполняется)
+IDEMPOTENT_REQUESTS = Counter(
+    "idempotent_requests_total",
+    "Создание записей с ключом идемпотентности",
+    ["operation", "result"],
+)
+
+# Контроль допуска: отказы по причинам (rate_limit, concurrency), предел одновременных
+# запросов и запросы в работе; с несколькими процессами - сумма по процессам
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total",
+    "Запросы, не допущенные к обработке",
+    ["service", "reason"],
+)
+ADMISSION_LIMIT = Gauge(
+    "admission_concurrency_limit",
+    "Предел одновременных запросов",
+    ["service"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight",
+    "Допущенные запросы в работе",
+    ["service"],
+    multiprocess_mode="livesum",
+)
+
+# Запросы, обработка которых прервана (истек срок, клиент отключился), и время, потраченное
+# на них впустую
+ABANDONED_REQUESTS = Counter(
+    "api_requests_abandoned_total",
+    "Запросы, обработка которых прервана",
+    ["service", "reason"],
+)
+ABANDONED_WORK_SECONDS = Counter(
+    "api_abandoned_work_seconds_total",
+    "Время обработки прерванных запросов",
+    ["service", "reason"],
+)
+
+# Прогрев при старте: длительность и готовность к нагрузке (1 - прогрев завершен)
+WARMUP_DURATION_SECONDS = Gauge(
+    "warmup_duration_seconds",
+    "Длительность прогрева сервиса при старте",
+    ["service"],
+    multiprocess_mode="livemax",
+)
+SERVICE_READY = Gauge(
+    "service_ready",
+    "Готовность сервиса принимать нагрузку",
+    ["service"],
+    multiprocess_mode="livemin",
+)
+
+
+def render_metrics():
+    """Получить метрики в текстовом формате Prometheus"""
+    if PROMETHEUS_MULTIPROC_DIR:
+        # Счетчики и гистограммы складываются по процессам, датчики - по multiprocess_mode
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
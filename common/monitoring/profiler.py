@@ -0,0 +1,142 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, Optional
+
+from common.monitoring.metrics import EVENT_LOOP_LAG_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Служебные эндпоинты профилирования включаются явно
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+# Ограничения на параметры профилирования
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_DEFAULT_INTERVAL_MS = 5.0
+
+# Период проверки цикла событий и порог, после которого задержка считается блокировкой
+LOOP_LAG_INTERVAL_MS = float(os.getenv("LOOP_LAG_INTERVAL_MS", "100"))
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "50"))
+
+
+def _frame_name(frame) -> str:
+    """Имя кадра для свернутого стека: функция (файл:строка)"""
+    code = frame.f_code
+    filename = "/".join(code.co_filename.rsplit("/", 2)[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    """Стек от корня к листу через ';' - формат flamegraph.pl и speedscope"""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Семплирующий профайлер потока цикла событий на основе sys._current_frames"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def sample(self, thread_id: int, seconds: float, interval: float) -> Counter:
+        """Собрать стеки потока thread_id; выполняется в отдельном потоке"""
+        stacks = Counter()
+        try:
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                frame = sys._current_frames().get(thread_id)
+                if frame is not None:
+                    stacks[_collapse(frame)] += 1
+                time.sleep(interval)
+        finally:
+            self._lock.release()
+        return stacks
+
+    async def profile(self, seconds: float, interval: float) -> Optional[Counter]:
+        """Профилировать поток текущего цикла событий, не блокируя его.
+        Возвращает None, если профиль уже снимается"""
+        if not self._lock.acquire(blocking=False):
+            return None
+        loop = asyncio.get_running_loop()
+        thread_id = threading.get_ident()
+        try:
+            future = loop.run_in_executor(None, self.sample, thread_id, seconds, interval)
+        except BaseException:
+            self._lock.release()
+            raise
+        return await future
+
+
+class LoopLagMonitor:
+    """Контроль задержек цикла событий: гистограмма и последние блокировки"""
+
+    def __init__(self, history: int = 100):
+        self.blocks = deque(maxlen=history)
+        self.max_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, service: str):
+        """Запустить фоновую задачу в текущем цикле событий"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run(service))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, service: str):
+        interval = LOOP_LAG_INTERVAL_MS / 1000
+        histogram = EVENT_LOOP_LAG_SECONDS.labels(service)
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag = max(time.perf_counter() - started - interval, 0.0)
+            histogram.observe(lag)
+
+            lag_ms = lag * 1000
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            if lag_ms >= LOOP_BLOCK_THRESHOLD_MS:
+                self.blocks.append({"at": time.time(), "lag_ms": round(lag_ms, 2)})
+                logger.warning("Цикл событий был заблокирован", extra={"lag_ms": round(lag_ms, 2)})
+
+    def snapshot(self) -> Dict:
+        return {
+            "interval_ms": LOOP_LAG_INTERVAL_MS,
+            "threshold_ms": LOOP_BLOCK_THRESHOLD_MS,
+            "max_lag_ms": round(self.max_lag_ms, 2),
+            "blocks": list(self.blocks),
+        }
+
+
+profiler = SamplingProfiler()
+loop_lag_monitor = LoopLagMonitor()
+
+
+async def profile_handler(params: Dict[str, str]):
+    """Снять профиль: ?seconds=10&interval_ms=5, ответ - свернутые стеки"""
+    try:
+        seconds = float(params.get("seconds", "10"))
+        interval_ms = float(params.get("interval_ms", PROFILE_DEFAULT_INTERVAL_MS))
+    except ValueError:
+        return 400, "text/plain", b"seconds and interval_ms must be numbers\n"
+    if not 0 < seconds <= PROFILE_MAX_SECONDS or interval_ms <= 0:
+        return 400, "text/plain", f"seconds must be in (0, {PROFILE_MAX_SECONDS}]\n".encode()
+
+    stacks = await profiler.profile(seconds, interval_ms / 1000)
+    if stacks is None:
+        return 409, "text/plain", b"Profile is already running\n"
+    body = "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+    return 200, "text/plain", body.encode()
+
+
+async def loop_lag_handler(params: Dict[str, str]):
+    """Задержки цикла событий и последние блокировки"""
+    return 200, "application/json", json.dumps(loop_lag_monitor.snapshot()).encode()
@@ -0,0 +1,57 @@
+"""
+Готовность сервиса принимать нагрузку (GET /ready).
+
+Сервис слушает порт сразу после подготовки схемы, а прогрев (соединения пула, подготовленные
+запросы, первая сериализация ответов) идет в фоне. До его окончания /ready отвечает 503:
+балансировщик и тесты ждут готовности, а первые запросы не платят за прогрев.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Dict, Optional
+
+from common.monitoring.metrics import SERVICE_READY, WARMUP_DURATION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Флаг готовности, который выставляет фоновая задача прогрева"""
+
+    def __init__(self):
+        self.ready = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, service: str, warmup: Awaitable):
+        """Запустить прогрев в текущем цикле событий; по окончании сервис готов"""
+        if self._task is None:
+            SERVICE_READY.labels(service).set(0)
+            self._task = asyncio.get_running_loop().create_task(self._run(service, warmup))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, service: str, warmup: Awaitable):
+        started = time.perf_counter()
+        try:
+            await warmup
+        except Exception as e:
+            # Прогрев только ускоряет первые запросы: без него сервис все равно рабочий
+            logger.warning("Прогрев не завершен", extra={"error": str(e)})
+        duration = time.perf_counter() - started
+        WARMUP_DURATION_SECONDS.labels(service).set(duration)
+        SERVICE_READY.labels(service).set(1)
+        self.ready = True
+        logger.info("Сервис готов к нагрузке", extra={"warmup_ms": round(duration * 1000, 1)})
+
+
+readiness = Readiness()
+
+
+async def ready_handler(params: Dict[str, str]):
+    """200 после прогрева, до него - 503"""
+    if readiness.ready:
+        return 200, "text/plain", b"ready\n"
+    return 503, "text/plain", b"warming up\n"
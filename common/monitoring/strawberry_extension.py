@@ -0,0 +1,30 @@
+from strawberry.extensions import Extension
+
+from common.monitoring.timing import mark_handler_done, pop_phase, push_phase
+
+
+class TimingExtension(Extension):
+    """Расширение Strawberry: фазы parse и validate, окончание выполнения запроса"""
+
+    def __init__(self, *, execution_context):
+        super().__init__(execution_context=execution_context)
+        self._parsing = None
+        self._validation = None
+
+    def on_parsing_start(self):
+        self._parsing = push_phase("parse")
+
+    def on_parsing_end(self):
+        pop_phase(self._parsing)
+        self._parsing = None
+
+    def on_validation_start(self):
+        self._validation = push_phase("validate")
+
+    def on_validation_end(self):
+        pop_phase(self._validation)
+        self._validation = None
+
+    def on_request_end(self):
+        # Дальше роутер кодирует результат в JSON - это фаза serialize
+        mark_handler_done()
@@ -0,0 +1,160 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from common.monitoring.metrics import REQUEST_DURATION_SECONDS, REQUEST_PHASE_SECONDS
+
+
+class RequestTimer:
+    """Накопитель времени фаз одного запроса"""
+
+    def __init__(self, service: str):
+        self.service = service
+        self.started_at = time.perf_counter()
+        self.handler_done_at: Optional[float] = None
+        self._measured_before_done = 0.0
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float):
+        """Добавить время к фазе"""
+        self.phases[name] = self.phases.get(name, 0.0) + max(seconds, 0.0)
+
+    def elapsed(self) -> float:
+        """Время с начала запроса"""
+        return time.perf_counter() - self.started_at
+
+    def mark_handler_done(self):
+        """Отметить окончание работы обработчика"""
+        self.handler_done_at = time.perf_counter()
+        self._measured_before_done = sum(self.phases.values())
+
+    def mark_response_start(self):
+        """Отметить начало отправки ответа: всё после обработчика считается сериализацией"""
+        if self.handler_done_at is not None:
+            window = time.perf_counter() - self.handler_done_at
+            # Фазы, явно замеренные после обработчика (сериализация, сжатие), уже учтены
+            measured = sum(self.phases.values()) - self._measured_before_done
+            self.add("serialize", window - measured)
+            self.handler_done_at = None
+
+    def server_timing(self) -> str:
+        """Значение заголовка Server-Timing"""
+        total = self.elapsed()
+        parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.phases.items()]
+        # Всё, что не попало в фазы, - накладные расходы фреймворка
+        app = max(total - sum(self.phases.values()), 0.0)
+        parts.append(f"app;dur={app * 1000:.2f}")
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+    def observe(self):
+        """Записать фазы запроса в гистограммы Prometheus"""
+        for name, seconds in self.phases.items():
+            REQUEST_PHASE_SECONDS.labels(self.service, name).observe(seconds)
+        REQUEST_DURATION_SECONDS.labels(self.service).observe(self.elapsed())
+
+
+# Таймер текущего запроса и стек открытых фаз. Стек хранится отдельно в каждом
+# контексте, поэтому параллельные резолверы одного запроса не мешают друг другу
+_current_timer: ContextVar[Optional[RequestTimer]] = ContextVar("request_timer", default=None)
+_phase_stack: ContextVar[Tuple[list, ...]] = ContextVar("request_phase_stack", default=())
+
+
+def start_request(service: str):
+    """Начать замер запроса, возвращает таймер и токен для finish_request"""
+    timer = RequestTimer(service)
+    return timer, _current_timer.set(timer)
+
+
+def finish_request(token):
+    """Завершить замер запроса"""
+    _current_timer.reset(token)
+
+
+def current_timer() -> Optional[RequestTimer]:
+    """Таймер текущего запроса, если замер включен"""
+    return _current_timer.get()
+
+
+def mark_handler_done():
+    """Отметить окончание работы обработчика текущего запроса"""
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.mark_handler_done()
+
+
+def push_phase(name: str):
+    """Открыть фазу, возвращает дескриптор для pop_phase"""
+    timer = _current_timer.get()
+    if timer is None:
+        return None
+    # Кадр: имя фазы, время начала, время вложенных фаз
+    frame = [name, time.perf_counter(), 0.0]
+    return timer, frame, _phase_stack.set(_phase_stack.get() + (frame,))
+
+
+def pop_phase(handle):
+    """Закрыть фазу; в фазу попадает только собственное время без вложенных фаз"""
+    if handle is None:
+        return
+    timer, frame, token = handle
+    elapsed = time.perf_counter() - frame[1]
+    _phase_stack.reset(token)
+    timer.add(frame[0], elapsed - frame[2])
+    parent = _phase_stack.get()
+    if parent:
+        parent[-1][2] += elapsed
+
+
+@contextmanager
+def phase(name: str):
+    """Контекстный менеджер для замера фазы запроса"""
+    handle = push_phase(name)
+    try:
+        yield
+    finally:
+        pop_phase(handle)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, учитывающий ожидание соединения в фазе pool"""
+
+    def _do_get(self):
+        # В пуле нет события "до выдачи соединения", поэтому замеряем здесь
+        with phase("pool"):
+            return super()._do_get()
+
+
+# Логгер пула назван по модулю класса и не попадает под логгер "sqlalchemy",
+# поэтому задаем ему тот же уровень по умолчанию, что SQLAlchemy задает своим логгерам
+logging.getLogger(f"{__name__}.{TimedAsyncQueuePool.__name__}").setLevel(logging.WARNING)
+
+
+_SQL_PHASES_KEY = "request_timer_sql_phases"
+
+
+def instrument_engine(engine):
+    """Подписаться на события движка для замера фазы sql"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_SQL_PHASES_KEY, []).append(push_phase("sql"))
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        handles = conn.info.get(_SQL_PHASES_KEY)
+        if handles:
+            pop_phase(handles.pop())
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        handles = conn.info.get(_SQL_PHASES_KEY) if conn is not None else None
+        if handles:
+            pop_phase(handles.pop())
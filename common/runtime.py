@@ -0,0 +1,103 @@
+"""
+Среда выполнения сервисов: цикл событий, HTTP-парсер uvicorn и пул потоков по умолчанию.
+
+Выбор для каждого сервиса через переменные окружения его контейнера:
+- EVENT_LOOP: asyncio (по умолчанию) | uvloop | auto - uvloop, если установлен;
+- HTTP_PARSER (REST и GraphQL): h11 (по умолчанию) | httptools | auto - httptools, если установлен;
+- DEFAULT_EXECUTOR_WORKERS: потоков в пуле run_in_executor(None); 0 - как в asyncio.
+
+REST и GraphQL запускаются через этот модуль вместо команды uvicorn:
+
+    python -m common.runtime app.main:app --port 8000 [--reload]
+
+gRPC API запускает свой сервер через run().
+"""
+import argparse
+import asyncio
+import importlib.util
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOOP = os.getenv("EVENT_LOOP", "asyncio")
+HTTP_PARSER = os.getenv("HTTP_PARSER", "h11")
+DEFAULT_EXECUTOR_WORKERS = int(os.getenv("DEFAULT_EXECUTOR_WORKERS", "0"))
+
+_EVENT_LOOPS = ("asyncio", "uvloop", "auto")
+_HTTP_PARSERS = ("h11", "httptools", "auto")
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def _resolve(setting: str, value: str, choices: tuple, fast: str, default: str) -> str:
+    """auto - быстрая реализация, если пакет установлен; явно заданная должна быть установлена"""
+    if value not in choices:
+        raise RuntimeError(f"Недопустимое значение {setting}: {value}. Допустимые: {', '.join(choices)}")
+    if value == "auto":
+        return fast if _installed(fast) else default
+    if value == fast and not _installed(fast):
+        raise RuntimeError(f"{setting}={fast}, но пакет {fast} не установлен")
+    return value
+
+
+def event_loop() -> str:
+    """Реализация цикла событий: uvloop или asyncio"""
+    return _resolve("EVENT_LOOP", EVENT_LOOP, _EVENT_LOOPS, "uvloop", "asyncio")
+
+
+def http_parser() -> str:
+    """HTTP-парсер uvicorn: httptools или h11"""
+    return _resolve("HTTP_PARSER", HTTP_PARSER, _HTTP_PARSERS, "httptools", "h11")
+
+
+def install_event_loop_policy():
+    """Новые циклы событий процесса - выбранной реализации"""
+    if event_loop() == "uvloop":
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    else:
+        asyncio.set_event_loop_policy(None)
+
+
+def configure_loop(service: str):
+    """Настроить текущий цикл событий при старте сервиса: пул потоков по умолчанию"""
+    loop = asyncio.get_running_loop()
+    if DEFAULT_EXECUTOR_WORKERS > 0:
+        loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=DEFAULT_EXECUTOR_WORKERS, thread_name_prefix=f"{service}-executor")
+        )
+    logger.info(
+        "Среда выполнения",
+        extra={"loop": type(loop).__module__, "executor_workers": DEFAULT_EXECUTOR_WORKERS or "default"},
+    )
+
+
+def uvicorn_options() -> dict:
+    """Параметры uvicorn (запуск через main и рабочие процессы gunicorn)"""
+    return {"loop": event_loop(), "http": http_parser()}
+
+
+def run(main):
+    """asyncio.run с выбранной реализацией цикла событий"""
+    install_event_loop_policy()
+    return asyncio.run(main)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Запуск ASGI-приложения в uvicorn с настройками common.runtime")
+    parser.add_argument("app", help="приложение, например app.main:app")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--reload", action="store_true")
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(args.app, host=args.host, port=args.port, reload=args.reload, **uvicorn_options())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+from typing import List, Optional
+from sqlalchemy import Row
+from strawberry.dataloader import DataLoader
+from common.database.connection import async_session
+from common.database.crud import order_crud
+
+async def load_user_stats(user_ids: List[int]) -> List[Optional[Row]]:
+    """Статистика заказов всех запрошенных пользователей одним запросом"""
+    async with async_session() as db:
+        rows = await order_crud.get_users_stats(db, user_ids)
+    by_id = {row.user_id: row for row in rows}
+    return [by_id.get(user_id) for user_id in user_ids]
+
+async def get_context() -> dict:
+    """Контекст запроса: загрузчики живут один запрос, чтобы не было N+1 по полям User"""
+    return {"user_stats_loader": DataLoader(load_fn=load_user_stats)}
@@ -1,16 +1,29 @@
 import strawberry
-from typing import Optional
+from graphql import GraphQLError
+from typing import List, Optional
 from .types import User, Order, UserInput, OrderInput
 from common.database.connection import async_session  # Заменяем AsyncSessionLocal на async_session
 from common.database.crud import user_crud, order_crud
-from decimal import Decimal
+from common.database.bulk import import_orders as copy_orders
+from common.database.idempotency import IdempotencyError, idempotency
+
+async def idempotent_create(crud, key: Optional[str], params: tuple, create):
+    """Создание с ключом идемпотентности; отказ - ошибка с extensions.code IDEMPOTENCY_<причина>"""
+    try:
+        return await idempotency.run(crud, key, params, create)
+    except IdempotencyError as e:
+        raise GraphQLError(str(e), extensions={"code": f"IDEMPOTENCY_{e.reason.upper()}"})
 
 @strawberry.type
 class Mutation:
     @strawberry.mutation
-    async def create_user(self, input: UserInput) -> User:
+    async def create_user(self, input: UserInput, idempotency_key: Optional[str] = None) -> User:
+        # Повтор с тем же idempotencyKey возвращает созданного пользователя без обращения к БД
         async with async_session() as db:  # Используем async_session вместо AsyncSessionLocal
-            user = await user_crud.create(db, name=input.name, email=input.email)
+            user = await idempotent_create(
+                user_crud, idempotency_key, (input.name, input.email),
+                lambda: user_crud.create(db, name=input.name, email=input.email),
+            )
             return User.from_db_model(user)
     
     @strawberry.mutation
@@ -19,16 +32,28 @@ class Mutation:
             return await user_crud.delete(db, id)
     
     @strawberry.mutation
-    async def create_order(self, input: OrderInput) -> Order:
+    async def create_order(self, input: OrderInput, idempotency_key: Optional[str] = None) -> Order:
         async with async_session() as db:  # Используем async_session вместо AsyncSessionLocal
-            order = await order_crud.create(
-                db, 
-                user_id=input.user_id, 
-                product_name=input.product_name, 
-                price=input.price
+            order = await idempotent_create(
+                order_crud, idempotency_key, (input.user_id, input.product_name, input.price),
+                lambda: order_crud.create(
+                    db, 
+                    user_id=input.user_id, 
+                    product_name=input.product_name, 
+                    price=input.price
+                ),
             )
+            if order is None:
+                raise ValueError(f"Пользователь с ID {input.user_id} не найден")
             return Order.from_db_model(order)
     
+    @strawberry.mutation
+    async def import_orders(self, orders: List[OrderInput]) -> int:
+        # Одна команда COPY без ORM: все заказы или ни одного, возвращает число заказов
+        return await copy_orders(
+            (order.user_id, order.product_name, order.price, None) for order in orders
+        )
+    
     @strawberry.mutation
     async def delete_order(self, id: int) -> bool:
         async with async_session() as db:  # Используем async_session вместо AsyncSessionLocal
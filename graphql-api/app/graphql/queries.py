@@ -1,6 +1,7 @@
 import strawberry
 from typing import List, Optional
-from .types import User, Order
+from .types import User, Order, OrderFilterInput, UserStats, DailyOrderStats
+from datetime import date
 from common.database.connection import get_db, async_session  # Заменяем AsyncSessionLocal на async_session
 from common.database.crud import user_crud, order_crud
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,25 +12,40 @@ class Query:
     @strawberry.field
     async def users(self) -> List[User]:
         async with async_session() as db:  # Используем async_session вместо AsyncSessionLocal
-            users = await user_crud.get_all(db)
+            users = await user_crud.get_all_rows(db)
             return [User.from_db_model(user) for user in users]
     
     @strawberry.field
     async def user(self, id: int) -> Optional[User]:
         async with async_session() as db:  # Используем async_session вместо AsyncSessionLocal
-            user = await user_crud.get_by_id(db, id)
+            user = await user_crud.get_row_by_id(db, id)
             if user:
                 return User.from_db_model(user)
             return None
     
     @strawberry.field
-    async def orders(self) -> List[Order]:
+    async def orders(self, filter: Optional[OrderFilterInput] = None) -> List[Order]:
+        filters = filter.to_filter() if filter else None
         async with async_session() as db:  # Используем async_session вместо AsyncSessionLocal
-            orders = await order_crud.get_all(db)
+            orders = await order_crud.get_all_rows(db, filters)
             return [Order.from_db_model(order) for order in orders]
     
     @strawberry.field
-    async def orders_by_user(self, user_id: int) -> List[Order]:
+    async def orders_by_user(self, user_id: int, filter: Optional[OrderFilterInput] = None) -> List[Order]:
+        filters = filter.to_filter() if filter else None
         async with async_session() as db:  # Используем async_session вместо AsyncSessionLocal
-            orders = await order_crud.get_by_user_id(db, user_id)
-            return [Order.from_db_model(order) for order in orders]
\ No newline at end of file
+            orders = await order_crud.get_rows_by_user_id(db, user_id, filters)
+            return [Order.from_db_model(order) for order in orders]
+    
+    @strawberry.field
+    async def top_users(self, limit: int = 10, by: str = "total_spent") -> List[UserStats]:
+        async with async_session() as db:
+            rows = await order_crud.get_top_users(db, limit, by)
+            return [UserStats.from_row(row) for row in rows]
+    
+    @strawberry.field
+    async def daily_order_stats(self, date_from: Optional[date] = None,
+                                date_to: Optional[date] = None) -> List[DailyOrderStats]:
+        async with async_session() as db:
+            rows = await order_crud.get_daily_stats(db, date_from, date_to)
+            return [DailyOrderStats.from_row(row) for row in rows]
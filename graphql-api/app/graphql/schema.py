@@ -1,5 +1,21 @@
 import strawberry
 from .queries import Query
 from .mutations import Mutation
+from common.middleware.admission import ADMISSION_ENABLED
+from common.middleware.admission_strawberry import admission_extension, without_rejections
+from common.middleware.deadline_strawberry import deadline_extension, without_deadline_errors
+from common.monitoring.strawberry_extension import TimingExtension
 
-schema = strawberry.Schema(query=Query, mutation=Mutation)
\ No newline at end of file
+
+class Schema(strawberry.Schema):
+    def process_errors(self, errors, execution_context=None):
+        super().process_errors(without_deadline_errors(without_rejections(errors)), execution_context)
+
+
+# Истекший срок запроса в резолвере - 504, как у REST
+extensions = [TimingExtension, deadline_extension("graphql-api")]
+# Контроль допуска: лимит частоты по клиентам и предел одновременных запросов
+if ADMISSION_ENABLED:
+    extensions.append(admission_extension("graphql-api"))
+
+schema = Schema(query=Query, mutation=Mutation, extensions=extensions)
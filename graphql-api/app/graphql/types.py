@@ -1,8 +1,11 @@
 import strawberry
-from typing import List, Optional
-from datetime import datetime
+from typing import List, Optional, Union
+from datetime import date, datetime
 from decimal import Decimal
+from sqlalchemy import Row
 from common.models import User as UserModel, Order as OrderModel
+from common.database.filters import OrderFilter
+from strawberry.types import Info
 
 @strawberry.type
 class User:
@@ -12,13 +15,24 @@ class User:
     created_at: datetime
     
     @classmethod
-    def from_db_model(cls, user: UserModel) -> "User":
+    def from_db_model(cls, user: Union[UserModel, Row]) -> "User":
+        # Чтение отдает строки Core (Row), запись - ORM-объекты: поля у них одинаковые
         return cls(
             id=user.id,
             name=user.name,
             email=user.email,
             created_at=user.created_at
         )
+    
+    @strawberry.field
+    async def order_count(self, info: Info) -> int:
+        stats = await info.context["user_stats_loader"].load(self.id)
+        return stats.order_count if stats else 0
+    
+    @strawberry.field
+    async def total_spent(self, info: Info) -> Decimal:
+        stats = await info.context["user_stats_loader"].load(self.id)
+        return stats.total_spent if stats else Decimal(0)
 
 @strawberry.type
 class Order:
@@ -29,7 +43,7 @@ class Order:
     created_at: datetime
     
     @classmethod
-    def from_db_model(cls, order: OrderModel) -> "Order":
+    def from_db_model(cls, order: Union[OrderModel, Row]) -> "Order":
         return cls(
             id=order.id,
             user_id=order.user_id,
@@ -37,6 +51,39 @@ class Order:
             price=order.price,
             created_at=order.created_at
         )
+
+
+@strawberry.type
+class UserStats:
+    user_id: int
+    order_count: int
+    total_spent: Decimal
+    avg_price: Optional[Decimal]
+    
+    @classmethod
+    def from_row(cls, row) -> "UserStats":
+        return cls(
+            user_id=row.user_id,
+            order_count=row.order_count,
+            total_spent=row.total_spent,
+            avg_price=row.avg_price
+        )
+
+@strawberry.type
+class DailyOrderStats:
+    day: date
+    order_count: int
+    total_spent: Decimal
+    avg_price: Decimal
+    
+    @classmethod
+    def from_row(cls, row) -> "DailyOrderStats":
+        return cls(
+            day=row.day,
+            order_count=row.order_count,
+            total_spent=row.total_spent,
+            avg_price=row.avg_price
+        )
         
 @strawberry.input
 class UserInput:
@@ -47,4 +94,24 @@ class UserInput:
 class OrderInput:
     user_id: int
     product_name: str
-    price: Decimal
\ No newline at end of file
+    price: Decimal
+
+@strawberry.input
+class OrderFilterInput:
+    price_min: Optional[Decimal] = None
+    price_max: Optional[Decimal] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    product_prefix: Optional[str] = None
+    # id, price, created_at или product_name; "-" в начале - по убыванию
+    sort: str = "id"
+    
+    def to_filter(self) -> OrderFilter:
+        return OrderFilter(
+            price_min=self.price_min,
+            price_max=self.price_max,
+            created_from=self.created_from,
+            created_to=self.created_to,
+            product_prefix=self.product_prefix,
+            sort=self.sort
+        )
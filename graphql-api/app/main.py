@@ -1,33 +1,85 @@
 from fastapi import FastAPI
 from strawberry.fastapi import GraphQLRouter
 from app.graphql.schema import schema
-from common.models.base import Base
-from common.database.connection import engine
+from app.graphql.loaders import get_context
+from common.database.schema import partition_maintenance, prepare_schema
+from common.database.connection import engine, replica_router
+from common.database.warmup import warm_up
+from common.monitoring.logging_setup import setup_logging
+from common.monitoring.asgi import ServerTimingMiddleware, admin_router, metrics_router
+from common.middleware.compression import CompressionMiddleware
+from common.middleware.deadline import DeadlineMiddleware
+from common.monitoring.profiler import PROFILER_ENABLED, loop_lag_monitor
+from common.monitoring.readiness import readiness
+from common.runtime import configure_loop
 import logging
+import os
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-)
+# Настройка логирования: JSON, запись в поток в фоновом потоке
+setup_logging("graphql-api")
 logger = logging.getLogger(__name__)
 
+# GraphiQL на GET /graphql; false - только API (страница не отдается, схема доступна интроспекцией)
+GRAPHQL_PLAYGROUND = os.getenv("GRAPHQL_PLAYGROUND", "true").lower() == "true"
+
 app = FastAPI(title="GraphQL API для сравнительного анализа")
 
+# Сжатие ответов по Accept-Encoding (gzip/br/zstd)
+app.add_middleware(CompressionMiddleware)
+
+# Срок запроса (передается в БД как statement_timeout) и отмена обработки при отключении клиента
+app.add_middleware(DeadlineMiddleware, service="graphql-api")
+
+# Замер фаз запроса: заголовок Server-Timing и гистограммы Prometheus.
+# Подключается последним, чтобы замер включал и сжатие
+app.add_middleware(ServerTimingMiddleware, service="graphql-api")
+
+# Запрос прогрева: разбор, валидация и резолверы частых полей, без данных (несуществующий ID)
+WARMUP_QUERY = """
+query WarmUp {
+  user(id: 0) { id name email createdAt orderCount totalSpent }
+  ordersByUser(userId: 0) { id userId productName price createdAt }
+}
+"""
+
+async def render_samples():
+    """Прогрев: выполнить запрос прогрева напрямую через схему, минуя HTTP и метрики"""
+    result = await schema.execute(WARMUP_QUERY, context_value=await get_context())
+    if result.errors:
+        raise RuntimeError(f"Ошибка запроса прогрева: {result.errors[0].message}")
+
 # Создаем роутер GraphQL
-graphql_app = GraphQLRouter(schema)
+graphql_app = GraphQLRouter(schema, context_getter=get_context, graphiql=GRAPHQL_PLAYGROUND)
 
 # Подключаем GraphQL-маршрут
 app.include_router(graphql_app, prefix="/graphql")
+app.include_router(metrics_router)
 
-# Создаем таблицы при запуске приложения
+# Профилирование по запросу, только если явно включено
+if PROFILER_ENABLED:
+    app.include_router(admin_router)
+
+# Проверяем версию схемы БД (или создаем схему при SCHEMA_STARTUP=create) при запуске приложения
 @app.on_event("startup")
 async def init_db():
+    # Пул потоков по умолчанию и запись о выбранной среде выполнения
+    configure_loop("graphql-api")
+
     async with engine.begin() as conn:
-        # Раскомментируйте следующую строку, чтобы сбросить базу при каждом запуске
-        # await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
-    logger.info("База данных инициализирована")
+        await conn.run_sync(prepare_schema)
+    logger.info("База данных готова")
+
+    # Контроль блокировок цикла событий
+    loop_lag_monitor.start("graphql-api")
+
+    # Проверки доступности реплик для чтения (если заданы)
+    replica_router.start()
+
+    # Продление секций заказов вперед (ORDERS_PARTITIONED), в том числе при SCHEMA_STARTUP=verify
+    partition_maintenance.start(engine)
+
+    # Прогрев в фоне: соединения пула, подготовленные запросы, первый запрос; до конца - /ready 503
+    readiness.start("graphql-api", warm_up(render_samples))
 
 # Корневой маршрут
 @app.get("/")
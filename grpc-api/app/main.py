@@ -1,44 +1,82 @@
 import os
-import asyncio
 import logging
 import grpc
 from grpc.aio import server
-from grpc_reflection.v1alpha import reflection
-from common.database.connection import get_db, engine
-from common.models.base import Base
+from common.database.connection import get_db, engine, replica_router
+from common.database.schema import partition_maintenance, prepare_schema
+from common.database.warmup import sample_order, sample_user, warm_up
+from common.monitoring.logging_setup import setup_logging
+from common.monitoring.admin_server import metrics_handler, start_admin_server
+from common.monitoring.grpc_interceptor import ServerTimingInterceptor
+from common.middleware.admission import ADMISSION_ENABLED
+from common.middleware.admission_grpc import AdmissionInterceptor
+from common.middleware.deadline_grpc import DeadlineInterceptor
+from common.monitoring.profiler import PROFILER_ENABLED, loop_lag_handler, loop_lag_monitor, profile_handler
+from common.monitoring.readiness import readiness, ready_handler
+from common.runtime import configure_loop, run
 from app.services.user_service import UserServicer
 from app.services.order_service import OrderServicer
 from app.protos import service_pb2_grpc, service_pb2
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-)
+# Настройка логирования: JSON, запись в поток в фоновом потоке
+setup_logging("grpc-api")
 logger = logging.getLogger(__name__)
 
 # Определение порта для прослушивания
 PORT = os.getenv("PORT", "50051")
+# Порт служебного HTTP-сервера (метрики Prometheus и профилирование)
+ADMIN_PORT = int(os.getenv("ADMIN_PORT", "9091"))
+# Reflection для grpcurl без proto-файлов; false - сервис стартует без grpc_reflection
+GRPC_REFLECTION = os.getenv("GRPC_REFLECTION", "true").lower() == "true"
+
+async def render_samples():
+    """Прогрев: сериализация и разбор сообщения каждого типа, пользователь и заказ - с данными"""
+    for name in service_pb2.DESCRIPTOR.message_types_by_name:
+        message_class = getattr(service_pb2, name)
+        message_class.FromString(message_class().SerializeToString())
+
+    user, order = sample_user(), sample_order()
+    users = service_pb2.Users()
+    user_pb = users.users.add(id=user.id, name=user.name, email=user.email)
+    user_pb.created_at.FromDatetime(user.created_at)
+    orders = service_pb2.Orders()
+    order_pb = orders.orders.add(
+        id=order.id, user_id=order.user_id, product_name=order.product_name, price=float(order.price)
+    )
+    order_pb.created_at.FromDatetime(order.created_at)
+    for message in (users, orders):
+        type(message).FromString(message.SerializeToString())
 
 async def serve():
     """Запуск gRPC сервера"""
-    # Создаем таблицы в базе данных
+    # Пул потоков по умолчанию и запись о выбранной среде выполнения
+    configure_loop("grpc-api")
+
+    # Проверяем версию схемы БД (или создаем схему при SCHEMA_STARTUP=create)
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-        logger.info("База данных инициализирована")
+        await conn.run_sync(prepare_schema)
+        logger.info("База данных готова")
     
-    # Создаем gRPC сервер
-    server_instance = server()
+    # Создаем gRPC сервер с замером фаз вызова
+    # Срок вызова от клиента передается в БД как statement_timeout
+    interceptors = [ServerTimingInterceptor("grpc-api"), DeadlineInterceptor("grpc-api")]
+    if ADMISSION_ENABLED:
+        # Контроль допуска внутри замера: отказы тоже попадают в метрики задержки
+        interceptors.append(AdmissionInterceptor("grpc-api"))
+    server_instance = server(interceptors=interceptors)
     
     # Добавляем сервисы
     service_pb2_grpc.add_UserServiceServicer_to_server(UserServicer(get_db), server_instance)
     service_pb2_grpc.add_OrderServiceServicer_to_server(OrderServicer(get_db), server_instance)
     
-    service_names = (
-        service_pb2.DESCRIPTOR.services_by_name['UserService'].full_name,
-        service_pb2.DESCRIPTOR.services_by_name['OrderService'].full_name,
-    )
-    reflection.enable_server_reflection(service_names, server_instance)
+    if GRPC_REFLECTION:
+        # Импорт по требованию: модуль reflection тянет за собой свои дескрипторы protobuf
+        from grpc_reflection.v1alpha import reflection
+        service_names = (
+            service_pb2.DESCRIPTOR.services_by_name['UserService'].full_name,
+            service_pb2.DESCRIPTOR.services_by_name['OrderService'].full_name,
+        )
+        reflection.enable_server_reflection(service_names, server_instance)
 
     # Определяем адрес для прослушивания
     listen_addr = f'[::]:{PORT}'
@@ -47,6 +85,25 @@ async def serve():
     # Запускаем сервер
     await server_instance.start()
     logger.info(f"Сервер запущен на {listen_addr}")
+
+    # Служебный HTTP-сервер для сбора метрик и профилирования
+    admin_routes = {"/metrics": metrics_handler, "/ready": ready_handler}
+    if PROFILER_ENABLED:
+        admin_routes["/admin/profile"] = profile_handler
+        admin_routes["/admin/loop-lag"] = loop_lag_handler
+    admin_server = await start_admin_server(admin_routes, ADMIN_PORT)
+
+    # Контроль блокировок цикла событий
+    loop_lag_monitor.start("grpc-api")
+
+    # Проверки доступности реплик для чтения (если заданы)
+    replica_router.start()
+
+    # Продление секций заказов вперед (ORDERS_PARTITIONED), в том числе при SCHEMA_STARTUP=verify
+    partition_maintenance.start(engine)
+
+    # Прогрев в фоне: соединения пула, подготовленные запросы, сообщения; до конца - /ready 503
+    readiness.start("grpc-api", warm_up(render_samples))
     
     try:
         # Держим сервер запущенным
@@ -54,7 +111,13 @@ async def serve():
     except KeyboardInterrupt:
         logger.info("Получен сигнал прерывания, завершаем работу...")
         await server_instance.stop(0)
+    finally:
+        readiness.stop()
+        loop_lag_monitor.stop()
+        replica_router.stop()
+        partition_maintenance.stop()
+        admin_server.close()
 
 if __name__ == '__main__':
-    # Запускаем сервер в цикле событий asyncio
-    asyncio.run(serve())
\ No newline at end of file
+    # Запускаем сервер в цикле событий выбранной реализации (EVENT_LOOP, common/runtime.py)
+    run(serve())
\ No newline at end of file
@@ -15,7 +15,7 @@ from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__
 from google.protobuf import empty_pb2 as google_dot_protobuf_dot_empty__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rservice.proto\x12\x0busersorders\x1a\x1fgoogle/protobuf/timestamp.proto\x1a\x1bgoogle/protobuf/empty.proto\"\x19\n\x0bUserRequest\x12\n\n\x02id\x18\x01 \x01(\x05\"0\n\x11\x43reateUserRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\"_\n\x04User\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12.\n\ncreated_at\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\")\n\x05Users\x12 \n\x05users\x18\x01 \x03(\x0b\x32\x11.usersorders.User\"\x1a\n\x0cOrderRequest\x12\n\n\x02id\x18\x01 \x01(\x05\"J\n\x12\x43reateOrderRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x14\n\x0cproduct_name\x18\x02 \x01(\t\x12\r\n\x05price\x18\x03 \x01(\x01\"y\n\x05Order\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0f\n\x07user_id\x18\x02 \x01(\x05\x12\x14\n\x0cproduct_name\x18\x03 \x01(\t\x12\r\n\x05price\x18\x04 \x01(\x01\x12.\n\ncreated_at\x18\x05 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\",\n\x06Orders\x12\"\n\x06orders\x18\x01 \x03(\x0b\x32\x12.usersorders.Order\"2\n\x0e\x44\x65leteResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t2\x8b\x02\n\x0bUserService\x12\x38\n\x08GetUsers\x12\x16.google.protobuf.Empty\x1a\x12.usersorders.Users\"\x00\x12\x38\n\x07GetUser\x12\x18.usersorders.UserRequest\x1a\x11.usersorders.User\"\x00\x12\x41\n\nCreateUser\x12\x1e.usersorders.CreateUserRequest\x1a\x11.usersorders.User\"\x00\x12\x45\n\nDeleteUser\x12\x18.usersorders.UserRequest\x1a\x1b.usersorders.DeleteResponse\"\x00\x32\x9d\x02\n\x0cOrderService\x12:\n\tGetOrders\x12\x16.google.protobuf.Empty\x1a\x13.usersorders.Orders\"\x00\x12\x42\n\x0fGetOrdersByUser\x12\x18.usersorders.UserRequest\x1a\x13.usersorders.Orders\"\x00\x12\x44\n\x0b\x43reateOrder\x12\x1f.usersorders.CreateOrderRequest\x1a\x12.usersorders.Order\"\x00\x12G\n\x0b\x44\x65leteOrder\x12\x19.usersorders.OrderRequest\x1a\x1b.usersorders.DeleteResponse\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rservice.proto\x12\x0busersorders\x1a\x1fgoogle/protobuf/timestamp.proto\x1a\x1bgoogle/protobuf/empty.proto\"\x19\n\x0bUserRequest\x12\n\n\x02id\x18\x01 \x01(\x05\"0\n\x11\x43reateUserRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\"_\n\x04User\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12.\n\ncreated_at\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\")\n\x05Users\x12 \n\x05users\x18\x01 \x03(\x0b\x32\x11.usersorders.User\"Y\n\tUserStats\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x13\n\x0border_count\x18\x02 \x01(\x03\x12\x13\n\x0btotal_spent\x18\x03 \x01(\x01\x12\x11\n\tavg_price\x18\x04 \x01(\x01\"\x1a\n\x0cOrderRequest\x12\n\n\x02id\x18\x01 \x01(\x05\"\xbb\x01\n\x0bOrderFilter\x12\x11\n\tprice_min\x18\x01 \x01(\t\x12\x11\n\tprice_max\x18\x02 \x01(\t\x12\x30\n\x0c\x63reated_from\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12.\n\ncreated_to\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x16\n\x0eproduct_prefix\x18\x05 \x01(\t\x12\x0c\n\x04sort\x18\x06 \x01(\t\"K\n\x13OrdersByUserRequest\x12\n\n\x02id\x18\x01 \x01(\x05\x12(\n\x06\x66ilter\x18\x02 \x01(\x0b\x32\x18.usersorders.OrderFilter\"J\n\x12\x43reateOrderRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x14\n\x0cproduct_name\x18\x02 \x01(\t\x12\r\n\x05price\x18\x03 \x01(\x01\"y\n\x05Order\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0f\n\x07user_id\x18\x02 \x01(\x05\x12\x14\n\x0cproduct_name\x18\x03 \x01(\t\x12\r\n\x05price\x18\x04 \x01(\x01\x12.\n\ncreated_at\x18\x05 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\",\n\x06Orders\x12\"\n\x06orders\x18\x01 \x03(\x0b\x32\x12.usersorders.Order\"\x19\n\tCopyChunk\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\" \n\x0cImportResult\x12\x10\n\x08imported\x18\x01 \x01(\x03\"2\n\x0e\x44\x65leteResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t2\xcf\x02\n\x0bUserService\x12\x38\n\x08GetUsers\x12\x16.google.protobuf.Empty\x1a\x12.usersorders.Users\"\x00\x12\x38\n\x07GetUser\x12\x18.usersorders.UserRequest\x1a\x11.usersorders.User\"\x00\x12\x41\n\nCreateUser\x12\x1e.usersorders.CreateUserRequest\x1a\x11.usersorders.User\"\x00\x12\x45\n\nDeleteUser\x12\x18.usersorders.UserRequest\x1a\x1b.usersorders.DeleteResponse\"\x00\x12\x42\n\x0cGetUserStats\x12\x18.usersorders.UserRequest\x1a\x16.usersorders.UserStats\"\x00\x32\x83\x04\n\x0cOrderService\x12<\n\tGetOrders\x12\x18.usersorders.OrderFilter\x1a\x13.usersorders.Orders\"\x00\x12J\n\x0fGetOrdersByUser\x12 .usersorders.OrdersByUserRequest\x1a\x13.usersorders.Orders\"\x00\x12\x44\n\x0b\x43reateOrder\x12\x1f.usersorders.CreateOrderRequest\x1a\x12.usersorders.Order\"\x00\x12G\n\x0b\x44\x65leteOrder\x12\x19.usersorders.OrderRequest\x1a\x1b.usersorders.DeleteResponse\"\x00\x12\x42\n\x0c\x45xportOrders\x12\x16.google.protobuf.Empty\x1a\x16.usersorders.CopyChunk\"\x00\x30\x01\x12N\n\x0cImportOrders\x12\x1f.usersorders.CreateOrderRequest\x1a\x19.usersorders.ImportResult\"\x00(\x01\x12\x46\n\rRestoreOrders\x12\x16.usersorders.CopyChunk\x1a\x19.usersorders.ImportResult\"\x00(\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -30,18 +30,28 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _globals['_USER']._serialized_end=264
   _globals['_USERS']._serialized_start=266
   _globals['_USERS']._serialized_end=307
-  _globals['_ORDERREQUEST']._serialized_start=309
-  _globals['_ORDERREQUEST']._serialized_end=335
-  _globals['_CREATEORDERREQUEST']._serialized_start=337
-  _globals['_CREATEORDERREQUEST']._serialized_end=411
-  _globals['_ORDER']._serialized_start=413
-  _globals['_ORDER']._serialized_end=534
-  _globals['_ORDERS']._serialized_start=536
-  _globals['_ORDERS']._serialized_end=580
-  _globals['_DELETERESPONSE']._serialized_start=582
-  _globals['_DELETERESPONSE']._serialized_end=632
-  _globals['_USERSERVICE']._serialized_start=635
-  _globals['_USERSERVICE']._serialized_end=902
-  _globals['_ORDERSERVICE']._serialized_start=905
-  _globals['_ORDERSERVICE']._serialized_end=1190
+  _globals['_USERSTATS']._serialized_start=309
+  _globals['_USERSTATS']._serialized_end=398
+  _globals['_ORDERREQUEST']._serialized_start=400
+  _globals['_ORDERREQUEST']._serialized_end=426
+  _globals['_ORDERFILTER']._serialized_start=429
+  _globals['_ORDERFILTER']._serialized_end=616
+  _globals['_ORDERSBYUSERREQUEST']._serialized_start=618
+  _globals['_ORDERSBYUSERREQUEST']._serialized_end=693
+  _globals['_CREATEORDERREQUEST']._serialized_start=695
+  _globals['_CREATEORDERREQUEST']._serialized_end=769
+  _globals['_ORDER']._serialized_start=771
+  _globals['_ORDER']._serialized_end=892
+  _globals['_ORDERS']._serialized_start=894
+  _globals['_ORDERS']._serialized_end=938
+  _globals['_COPYCHUNK']._serialized_start=940
+  _globals['_COPYCHUNK']._serialized_end=965
+  _globals['_IMPORTRESULT']._serialized_start=967
+  _globals['_IMPORTRESULT']._serialized_end=999
+  _globals['_DELETERESPONSE']._serialized_start=1001
+  _globals['_DELETERESPONSE']._serialized_end=1051
+  _globals['_USERSERVICE']._serialized_start=1054
+  _globals['_USERSERVICE']._serialized_end=1389
+  _globals['_ORDERSERVICE']._serialized_start=1392
+  _globals['_ORDERSERVICE']._serialized_end=1907
 # @@protoc_insertion_point(module_scope)
@@ -36,6 +36,11 @@ class UserServiceStub(object):
                 request_serializer=service__pb2.UserRequest.SerializeToString,
                 response_deserializer=service__pb2.DeleteResponse.FromString,
                 )
+        self.GetUserStats = channel.unary_unary(
+                '/usersorders.UserService/GetUserStats',
+                request_serializer=service__pb2.UserRequest.SerializeToString,
+                response_deserializer=service__pb2.UserStats.FromString,
+                )
 
 
 class UserServiceServicer(object):
@@ -70,6 +75,13 @@ class UserServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetUserStats(self, request, context):
+        """Статистика заказов пользователя, посчитанная в БД
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_UserServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -93,6 +105,11 @@ def add_UserServiceServicer_to_server(servicer, server):
                     request_deserializer=service__pb2.UserRequest.FromString,
                     response_serializer=service__pb2.DeleteResponse.SerializeToString,
             ),
+            'GetUserStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetUserStats,
+                    request_deserializer=service__pb2.UserRequest.FromString,
+                    response_serializer=service__pb2.UserStats.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'usersorders.UserService', rpc_method_handlers)
@@ -172,6 +189,23 @@ class UserService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def GetUserStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/usersorders.UserService/GetUserStats',
+            service__pb2.UserRequest.SerializeToString,
+            service__pb2.UserStats.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
 
 class OrderServiceStub(object):
     """Сервис заказов
@@ -185,12 +219,12 @@ class OrderServiceStub(object):
         """
         self.GetOrders = channel.unary_unary(
                 '/usersorders.OrderService/GetOrders',
-                request_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+                request_serializer=service__pb2.OrderFilter.SerializeToString,
                 response_deserializer=service__pb2.Orders.FromString,
                 )
         self.GetOrdersByUser = channel.unary_unary(
                 '/usersorders.OrderService/GetOrdersByUser',
-                request_serializer=service__pb2.UserRequest.SerializeToString,
+                request_serializer=service__pb2.OrdersByUserRequest.SerializeToString,
                 response_deserializer=service__pb2.Orders.FromString,
                 )
         self.CreateOrder = channel.unary_unary(
@@ -203,6 +237,21 @@ class OrderServiceStub(object):
                 request_serializer=service__pb2.OrderRequest.SerializeToString,
                 response_deserializer=service__pb2.DeleteResponse.FromString,
                 )
+        self.ExportOrders = channel.unary_stream(
+                '/usersorders.OrderService/ExportOrders',
+                request_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+                response_deserializer=service__pb2.CopyChunk.FromString,
+                )
+        self.ImportOrders = channel.stream_unary(
+                '/usersorders.OrderService/ImportOrders',
+                request_serializer=service__pb2.CreateOrderRequest.SerializeToString,
+                response_deserializer=service__pb2.ImportResult.FromString,
+                )
+        self.RestoreOrders = channel.stream_unary(
+                '/usersorders.OrderService/RestoreOrders',
+                request_serializer=service__pb2.CopyChunk.SerializeToString,
+                response_deserializer=service__pb2.ImportResult.FromString,
+                )
 
 
 class OrderServiceServicer(object):
@@ -210,14 +259,14 @@ class OrderServiceServicer(object):
     """
 
     def GetOrders(self, request, context):
-        """Получить все заказы
+        """Получить все заказы (пустой фильтр совместим с google.protobuf.Empty)
         """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
     def GetOrdersByUser(self, request, context):
-        """Получить заказы по ID пользователя
+        """Получить заказы по ID пользователя (совместим с UserRequest)
         """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
@@ -237,17 +286,38 @@ class OrderServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ExportOrders(self, request, context):
+        """Выгрузить все заказы потоком фрагментов COPY BINARY
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ImportOrders(self, request_iterator, context):
+        """Загрузить новые заказы одной командой COPY: все или ничего
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RestoreOrders(self, request_iterator, context):
+        """Загрузить заказы вместе с ID из потока ExportOrders
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_OrderServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
             'GetOrders': grpc.unary_unary_rpc_method_handler(
                     servicer.GetOrders,
-                    request_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                    request_deserializer=service__pb2.OrderFilter.FromString,
                     response_serializer=service__pb2.Orders.SerializeToString,
             ),
             'GetOrdersByUser': grpc.unary_unary_rpc_method_handler(
                     servicer.GetOrdersByUser,
-                    request_deserializer=service__pb2.UserRequest.FromString,
+                    request_deserializer=service__pb2.OrdersByUserRequest.FromString,
                     response_serializer=service__pb2.Orders.SerializeToString,
             ),
             'CreateOrder': grpc.unary_unary_rpc_method_handler(
@@ -260,6 +330,21 @@ def add_OrderServiceServicer_to_server(servicer, server):
                     request_deserializer=service__pb2.OrderRequest.FromString,
                     response_serializer=service__pb2.DeleteResponse.SerializeToString,
             ),
+            'ExportOrders': grpc.unary_stream_rpc_method_handler(
+                    servicer.ExportOrders,
+                    request_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                    response_serializer=service__pb2.CopyChunk.SerializeToString,
+            ),
+            'ImportOrders': grpc.stream_unary_rpc_method_handler(
+                    servicer.ImportOrders,
+                    request_deserializer=service__pb2.CreateOrderRequest.FromString,
+                    response_serializer=service__pb2.ImportResult.SerializeToString,
+            ),
+            'RestoreOrders': grpc.stream_unary_rpc_method_handler(
+                    servicer.RestoreOrders,
+                    request_deserializer=service__pb2.CopyChunk.FromString,
+                    response_serializer=service__pb2.ImportResult.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'usersorders.OrderService', rpc_method_handlers)
@@ -283,7 +368,7 @@ class OrderService(object):
             timeout=None,
             metadata=None):
         return grpc.experimental.unary_unary(request, target, '/usersorders.OrderService/GetOrders',
-            google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            service__pb2.OrderFilter.SerializeToString,
             service__pb2.Orders.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -300,7 +385,7 @@ class OrderService(object):
             timeout=None,
             metadata=None):
         return grpc.experimental.unary_unary(request, target, '/usersorders.OrderService/GetOrdersByUser',
-            service__pb2.UserRequest.SerializeToString,
+            service__pb2.OrdersByUserRequest.SerializeToString,
             service__pb2.Orders.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -338,3 +423,54 @@ class OrderService(object):
             service__pb2.DeleteResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ExportOrders(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/usersorders.OrderService/ExportOrders',
+            google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            service__pb2.CopyChunk.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ImportOrders(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/usersorders.OrderService/ImportOrders',
+            service__pb2.CreateOrderRequest.SerializeToString,
+            service__pb2.ImportResult.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def RestoreOrders(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/usersorders.OrderService/RestoreOrders',
+            service__pb2.CopyChunk.SerializeToString,
+            service__pb2.ImportResult.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -2,9 +2,33 @@ import grpc
 from google.protobuf.timestamp_pb2 import Timestamp
 from google.protobuf import empty_pb2
 from sqlalchemy.ext.asyncio import AsyncSession
-from common.database.crud import order_crud, user_crud
+from common.database.crud import order_crud
+from common.database.deadline import DeadlineExceeded
+from common.database.idempotency import IDEMPOTENCY_KEY_HEADER, IdempotencyError, idempotency
+from common.database.bulk import export_orders_binary, import_orders, restore_orders_binary
+from common.database.filters import OrderFilter
 from app.protos import service_pb2, service_pb2_grpc
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+
+def _price(value: str):
+    """Цена фильтра из десятичной строки, пустая строка - фильтр не задан"""
+    if not value:
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Неверная цена: {value}")
+
+def order_filter_from_pb(message) -> OrderFilter:
+    """Фильтры списка заказов из protobuf; ValueError при неверных значениях"""
+    return OrderFilter(
+        price_min=_price(message.price_min),
+        price_max=_price(message.price_max),
+        created_from=message.created_from.ToDatetime() if message.HasField("created_from") else None,
+        created_to=message.created_to.ToDatetime() if message.HasField("created_to") else None,
+        product_prefix=message.product_prefix or None,
+        sort=message.sort or "id"
+    )
 
 class OrderServicer(service_pb2_grpc.OrderServiceServicer):
     """Реализация сервиса заказов"""
@@ -13,9 +37,16 @@ class OrderServicer(service_pb2_grpc.OrderServiceServicer):
         self.db_factory = db_factory
     
     async def GetOrders(self, request, context):
-        """Получить все заказы"""
+        """Получить все заказы с фильтрами"""
+        try:
+            filters = order_filter_from_pb(request)
+        except ValueError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(f"Неверный фильтр: {e}")
+            return service_pb2.Orders()
+        
         async for db in self.db_factory():
-            orders = await order_crud.get_all(db)
+            orders = await order_crud.get_all_rows(db, filters)
             
             # Конвертируем в protobuf
             response = service_pb2.Orders()
@@ -35,16 +66,22 @@ class OrderServicer(service_pb2_grpc.OrderServiceServicer):
             return response
     
     async def GetOrdersByUser(self, request, context):
-        """Получить заказы пользователя"""
+        """Получить заказы пользователя с фильтрами"""
+        try:
+            filters = order_filter_from_pb(request.filter) if request.HasField("filter") else None
+        except ValueError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(f"Неверный фильтр: {e}")
+            return service_pb2.Orders()
+        
         async for db in self.db_factory():
-            # Проверяем существование пользователя
-            user = await user_crud.get_by_id(db, request.id)
-            if not user:
+            # Проверка пользователя и заказы - одним запросом
+            result = await order_crud.get_user_orders(db, request.id, filters)
+            if result is None:
                 context.set_code(grpc.StatusCode.NOT_FOUND)
                 context.set_details(f"Пользователь с ID {request.id} не найден")
                 return service_pb2.Orders()
-                
-            orders = await order_crud.get_by_user_id(db, request.id)
+            _, orders = result
             
             # Конвертируем в protobuf
             response = service_pb2.Orders()
@@ -64,23 +101,25 @@ class OrderServicer(service_pb2_grpc.OrderServiceServicer):
             return response
     
     async def CreateOrder(self, request, context):
-        """Создать новый заказ"""
+        """Создать новый заказ; повтор с тем же idempotency-key в метаданных возвращает созданный заказ"""
+        key = dict(context.invocation_metadata() or ()).get(IDEMPOTENCY_KEY_HEADER)
+        price = Decimal(str(request.price))
         async for db in self.db_factory():
-            # Проверяем существование пользователя
-            user = await user_crud.get_by_id(db, request.user_id)
-            if not user:
-                context.set_code(grpc.StatusCode.NOT_FOUND)
-                context.set_details(f"Пользователь с ID {request.user_id} не найден")
-                return service_pb2.Order()
-                
             try:
-                # Создаем заказ
-                order = await order_crud.create(
-                    db, 
-                    user_id=request.user_id, 
-                    product_name=request.product_name, 
-                    price=Decimal(str(request.price))
+                # Создаем заказ, существование пользователя проверяется в том же запросе
+                order = await idempotency.run(
+                    order_crud, key, (request.user_id, request.product_name, price),
+                    lambda: order_crud.create(
+                        db, 
+                        user_id=request.user_id, 
+                        product_name=request.product_name, 
+                        price=price
+                    ),
                 )
+                if order is None:
+                    context.set_code(grpc.StatusCode.NOT_FOUND)
+                    context.set_details(f"Пользователь с ID {request.user_id} не найден")
+                    return service_pb2.Order()
                 
                 # Конвертируем в protobuf
                 response = service_pb2.Order()
@@ -96,6 +135,15 @@ class OrderServicer(service_pb2_grpc.OrderServiceServicer):
                     response.created_at.CopyFrom(created_at)
                     
                 return response
+            except DeadlineExceeded:
+                # Срок вызова истек - ответ DEADLINE_EXCEEDED дает интерцептор
+                raise
+            except IdempotencyError as e:
+                context.set_code(
+                    grpc.StatusCode.ABORTED if e.reason == "in_progress" else grpc.StatusCode.INVALID_ARGUMENT
+                )
+                context.set_details(str(e))
+                return service_pb2.Order()
             except Exception as e:
                 context.set_code(grpc.StatusCode.INTERNAL)
                 context.set_details(f"Ошибка при создании заказа: {str(e)}")
@@ -115,4 +163,37 @@ class OrderServicer(service_pb2_grpc.OrderServiceServicer):
                 response.message = f"Заказ с ID {request.id} не найден"
                 context.set_code(grpc.StatusCode.NOT_FOUND)
             
-            return response
\ No newline at end of file
+            return response
+    
+    async def ExportOrders(self, request, context):
+        """Выгрузить все заказы потоком фрагментов COPY BINARY"""
+        async for chunk in export_orders_binary():
+            yield service_pb2.CopyChunk(data=chunk)
+    
+    async def ImportOrders(self, request_iterator, context):
+        """Загрузить новые заказы из потока одной командой COPY"""
+        async def records():
+            async for order in request_iterator:
+                yield order.user_id, order.product_name, Decimal(str(order.price)), None
+        
+        try:
+            imported = await import_orders(records())
+        except ValueError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return service_pb2.ImportResult()
+        return service_pb2.ImportResult(imported=imported)
+    
+    async def RestoreOrders(self, request_iterator, context):
+        """Загрузить заказы вместе с ID из потока ExportOrders"""
+        async def chunks():
+            async for chunk in request_iterator:
+                yield chunk.data
+        
+        try:
+            imported = await restore_orders_binary(chunks())
+        except ValueError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return service_pb2.ImportResult()
+        return service_pb2.ImportResult(imported=imported)
@@ -2,7 +2,9 @@ import grpc
 from google.protobuf.timestamp_pb2 import Timestamp
 from google.protobuf import empty_pb2
 from sqlalchemy.ext.asyncio import AsyncSession
-from common.database.crud import user_crud
+from common.database.crud import order_crud, user_crud
+from common.database.deadline import DeadlineExceeded
+from common.database.idempotency import IDEMPOTENCY_KEY_HEADER, IdempotencyError, idempotency
 from app.protos import service_pb2, service_pb2_grpc
 
 class UserServicer(service_pb2_grpc.UserServiceServicer):
@@ -14,7 +16,7 @@ class UserServicer(service_pb2_grpc.UserServiceServicer):
     async def GetUsers(self, request, context):
         """Получить всех пользователей"""
         async for db in self.db_factory():
-            users = await user_crud.get_all(db)
+            users = await user_crud.get_all_rows(db)
             
             # Конвертируем в protobuf
             response = service_pb2.Users()
@@ -35,7 +37,7 @@ class UserServicer(service_pb2_grpc.UserServiceServicer):
     async def GetUser(self, request, context):
         """Получить пользователя по ID"""
         async for db in self.db_factory():
-            user = await user_crud.get_by_id(db, request.id)
+            user = await user_crud.get_row_by_id(db, request.id)
             
             if not user:
                 context.set_code(grpc.StatusCode.NOT_FOUND)
@@ -57,11 +59,16 @@ class UserServicer(service_pb2_grpc.UserServiceServicer):
             return response
     
     async def CreateUser(self, request, context):
-        """Создать нового пользователя"""
+        """Создать нового пользователя; повтор с тем же idempotency-key в метаданных
+        возвращает созданного пользователя"""
+        key = dict(context.invocation_metadata() or ()).get(IDEMPOTENCY_KEY_HEADER)
         async for db in self.db_factory():
             # Создаем пользователя
             try:
-                user = await user_crud.create(db, name=request.name, email=request.email)
+                user = await idempotency.run(
+                    user_crud, key, (request.name, request.email),
+                    lambda: user_crud.create(db, name=request.name, email=request.email),
+                )
             
                 # Конвертируем в protobuf
                 response = service_pb2.User()
@@ -76,6 +83,15 @@ class UserServicer(service_pb2_grpc.UserServiceServicer):
                     response.created_at.CopyFrom(created_at)
                     
                 return response
+            except DeadlineExceeded:
+                # Срок вызова истек - ответ DEADLINE_EXCEEDED дает интерцептор
+                raise
+            except IdempotencyError as e:
+                context.set_code(
+                    grpc.StatusCode.ABORTED if e.reason == "in_progress" else grpc.StatusCode.INVALID_ARGUMENT
+                )
+                context.set_details(str(e))
+                return service_pb2.User()
             except Exception as e:
                 context.set_code(grpc.StatusCode.INTERNAL)
                 context.set_details(f"Ошибка при создании пользователя: {str(e)}")
@@ -95,4 +111,21 @@ class UserServicer(service_pb2_grpc.UserServiceServicer):
                 response.message = f"Пользователь с ID {request.id} не найден"
                 context.set_code(grpc.StatusCode.NOT_FOUND)
             
-            return response
\ No newline at end of file
+            return response
+    
+    async def GetUserStats(self, request, context):
+        """Статистика заказов пользователя"""
+        async for db in self.db_factory():
+            stats = await order_crud.get_user_stats(db, request.id)
+            
+            if not stats:
+                context.set_code(grpc.StatusCode.NOT_FOUND)
+                context.set_details(f"Пользователь с ID {request.id} не найден")
+                return service_pb2.UserStats()
+            
+            return service_pb2.UserStats(
+                user_id=stats.user_id,
+                order_count=stats.order_count,
+                total_spent=float(stats.total_spent),
+                avg_price=float(stats.avg_price or 0)
+            )
@@ -62,16 +62,34 @@ async def test_order_service():
     
     # Получение заказов пользователя
     print("\n-> Получение заказов пользователя:")
-    orders = await order_stub.GetOrdersByUser(service_pb2.UserRequest(id=user.id))
+    orders = await order_stub.GetOrdersByUser(service_pb2.OrdersByUserRequest(id=user.id))
     for o in orders.orders:
         print(f"Заказ: id={o.id}, user_id={o.user_id}, product={o.product_name}, price={o.price}")
     
     # Получение всех заказов
     print("\n-> Получение всех заказов:")
-    all_orders = await order_stub.GetOrders(empty_pb2.Empty())
+    all_orders = await order_stub.GetOrders(service_pb2.OrderFilter())
     for o in all_orders.orders:
         print(f"Заказ: id={o.id}, user_id={o.user_id}, product={o.product_name}, price={o.price}")
     
+    # Получение заказов с фильтром и сортировкой
+    print("\n-> Заказы дороже 1000, сначала дорогие:")
+    filtered = await order_stub.GetOrders(service_pb2.OrderFilter(price_min="1000", sort="-price"))
+    for o in filtered.orders:
+        print(f"Заказ: id={o.id}, user_id={o.user_id}, product={o.product_name}, price={o.price}")
+    
+    # Массовая загрузка и выгрузка через COPY
+    print("\n-> Массовая загрузка заказов:")
+    result = await order_stub.ImportOrders(iter([
+        service_pb2.CreateOrderRequest(user_id=user.id, product_name=f"Товар {i}", price=10 + i)
+        for i in range(100)
+    ]))
+    print(f"Загружено заказов: {result.imported}")
+    exported = 0
+    async for chunk in order_stub.ExportOrders(empty_pb2.Empty()):
+        exported += len(chunk.data)
+    print(f"Выгружено байт в формате COPY BINARY: {exported}")
+    
     # Удаление заказа
     print("\n-> Удаление заказа:")
     response = await order_stub.DeleteOrder(service_pb2.OrderRequest(id=order.id))
@@ -0,0 +1,31 @@
+import hashlib
+
+from fastapi import Request, Response
+
+
+def make_etag(request: Request, version) -> str:
+    """Сильный ETag: хеш версии данных и представления (путь и параметры запроса)"""
+    key = repr((request.url.path, str(request.url.query), version)).encode()
+    return '"' + hashlib.blake2b(key, digest_size=16).hexdigest() + '"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Совпадает ли ETag с одним из If-None-Match (слабое сравнение по RFC 9110)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified_response(etag: str) -> Response:
+    """Ответ 304 без тела"""
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    return response
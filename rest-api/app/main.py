@@ -1,30 +1,72 @@
 from fastapi import FastAPI
 from app.routes import users_router, orders_router
-from common.models.base import Base
-from common.database.connection import engine
+from app.responses import FastJSONResponse, render_samples
+from common.database.schema import partition_maintenance, prepare_schema
+from common.database.connection import engine, replica_router
+from common.database.warmup import warm_up
+from common.monitoring.logging_setup import setup_logging
+from common.monitoring.asgi import ServerTimingMiddleware, admin_router, metrics_router
+from common.middleware.compression import CompressionMiddleware
+from common.middleware.deadline import DeadlineMiddleware
+from common.middleware.admission import ADMISSION_ENABLED, AdmissionMiddleware
+from common.monitoring.profiler import PROFILER_ENABLED, loop_lag_monitor
+from common.monitoring.readiness import readiness
+from common.runtime import configure_loop
 import logging
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-)
+# Настройка логирования: JSON, запись в поток в фоновом потоке
+setup_logging("rest-api")
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="REST API для сравнительного анализа")
+app = FastAPI(
+    title="REST API для сравнительного анализа",
+    default_response_class=FastJSONResponse,
+)
+
+# Сжатие ответов по Accept-Encoding (gzip/br/zstd)
+app.add_middleware(CompressionMiddleware)
+
+# Контроль допуска: лимит частоты по клиентам и предел одновременных запросов, отказ - 429
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware, service="rest-api")
+
+# Срок запроса (передается в БД как statement_timeout) и отмена обработки при отключении клиента
+app.add_middleware(DeadlineMiddleware, service="rest-api")
+
+# Замер фаз запроса: заголовок Server-Timing и гистограммы Prometheus.
+# Подключается последним, чтобы замер включал и сжатие
+app.add_middleware(ServerTimingMiddleware, service="rest-api")
 
 # Подключаем маршруты
 app.include_router(users_router)
 app.include_router(orders_router)
+app.include_router(metrics_router)
 
-# Создаем таблицы при запуске приложения
+# Профилирование по запросу, только если явно включено
+if PROFILER_ENABLED:
+    app.include_router(admin_router)
+
+# Проверяем версию схемы БД (или создаем схему при SCHEMA_STARTUP=create) при запуске приложения
 @app.on_event("startup")
 async def init_db():
+    # Пул потоков по умолчанию и запись о выбранной среде выполнения
+    configure_loop("rest-api")
+
     async with engine.begin() as conn:
-        # Раскомментируйте следующую строку, чтобы сбросить базу при каждом запуске
-        # await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
-    logger.info("База данных инициализирована")
+        await conn.run_sync(prepare_schema)
+    logger.info("База данных готова")
+
+    # Контроль блокировок цикла событий
+    loop_lag_monitor.start("rest-api")
+
+    # Проверки доступности реплик для чтения (если заданы)
+    replica_router.start()
+
+    # Продление секций заказов вперед (ORDERS_PARTITIONED), в том числе при SCHEMA_STARTUP=verify
+    partition_maintenance.start(engine)
+
+    # Прогрев в фоне: соединения пула, подготовленные запросы, первые ответы; до конца - /ready 503
+    readiness.start("rest-api", warm_up(render_samples))
 
 # Корневой маршрут
 @app.get("/")
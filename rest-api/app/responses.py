@@ -0,0 +1,130 @@
+import csv
+import io
+import os
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Iterable, List
+
+import orjson
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import VERSION as PYDANTIC_VERSION
+from sqlalchemy import Row
+
+from app.schemas import OrderResponse, UserResponse
+from common.database.connection import async_session
+from common.database.warmup import sample_order, sample_user
+from common.monitoring.timing import phase
+
+# Схемы ответов поддерживают pydantic v1 и v2 (Config с orm_mode и from_attributes)
+PYDANTIC_V2 = PYDANTIC_VERSION.startswith("2.")
+
+# Размер пачки строк при потоковой выгрузке: одна пачка - один фрагмент ответа
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+
+def _default(obj: Any):
+    """Типы, которые orjson не сериализует сам"""
+    if isinstance(obj, Decimal):
+        # Как jsonable_encoder FastAPI для response_model: Decimal в JSON - число
+        return float(obj)
+    raise TypeError
+
+
+class FastJSONResponse(ORJSONResponse):
+    """JSON-ответ на orjson с поддержкой Decimal"""
+
+    def render(self, content: Any) -> bytes:
+        with phase("serialize"):
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def rows_response(rows: Iterable[Row]) -> FastJSONResponse:
+    """Ответ со списком строк БД без валидации через response_model"""
+    rows = list(rows)
+    if not rows:
+        return FastJSONResponse([])
+    fields = rows[0]._fields
+    return FastJSONResponse([dict(zip(fields, row)) for row in rows])
+
+
+def row_response(row: Row) -> FastJSONResponse:
+    """Ответ с одной строкой БД без валидации через response_model"""
+    return FastJSONResponse(dict(zip(row._fields, row)))
+
+
+async def _ndjson_chunks(partitions: AsyncIterator[List[Row]]) -> AsyncIterator[bytes]:
+    """Пачки строк в NDJSON: по объекту JSON на строку"""
+    async for rows in partitions:
+        fields = rows[0]._fields
+        with phase("serialize"):
+            chunk = b"".join(
+                orjson.dumps(dict(zip(fields, row)), default=_default) + b"\n" for row in rows
+            )
+        yield chunk
+
+
+async def _csv_chunks(partitions: AsyncIterator[List[Row]]) -> AsyncIterator[bytes]:
+    """Пачки строк в CSV с заголовком"""
+    header_written = False
+    async for rows in partitions:
+        with phase("serialize"):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if not header_written:
+                writer.writerow(rows[0]._fields)
+                header_written = True
+            writer.writerows(
+                [value.isoformat() if isinstance(value, datetime) else value for value in row]
+                for row in rows
+            )
+            chunk = buffer.getvalue().encode()
+        yield chunk
+
+
+def export_response(crud, export_format: str, filename: str) -> StreamingResponse:
+    """Потоковая выгрузка таблицы серверным курсором: память не зависит от размера таблицы"""
+    async def partitions():
+        # Собственная сессия: зависимость get_db может закрыться до окончания потока
+        async with async_session() as db:
+            async for rows in crud.stream_rows(db, EXPORT_BATCH_SIZE):
+                yield rows
+
+    if export_format == "csv":
+        body, media_type = _csv_chunks(partitions()), "text/csv"
+    else:
+        body, media_type = _ndjson_chunks(partitions()), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
+
+
+def copy_export_response(chunks: AsyncIterator[bytes], filename: str) -> StreamingResponse:
+    """Потоковая выгрузка фрагментов COPY BINARY как есть, без разбора строк"""
+    return StreamingResponse(
+        chunks,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{filename}.pgcopy"'},
+    )
+
+
+async def render_samples():
+    """Прогрев: первый ответ каждого вида на образцах строк - строка и список через orjson,
+    модель ответа создания через pydantic, фрагменты потоковой выгрузки"""
+    samples = ((sample_user(), UserResponse), (sample_order(), OrderResponse))
+    for row, schema in samples:
+        row_response(row)
+        rows_response([row])
+        if PYDANTIC_V2:
+            schema.model_validate(dict(row._mapping)).model_dump_json()
+        else:
+            schema.parse_obj(dict(row._mapping)).json()
+
+        async def partitions():
+            yield [row]
+
+        async for _ in _ndjson_chunks(partitions()):
+            pass
+        async for _ in _csv_chunks(partitions()):
+            pass
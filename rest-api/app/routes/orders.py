@@ -1,49 +1,170 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from common.database.connection import get_db
-from common.database.crud import order_crud, user_crud
-from app.schemas import OrderCreate, OrderUpdate, OrderResponse
-from typing import List
+from common.monitoring.asgi import TimedRoute
+from common.database.crud import order_crud
+from app.schemas import OrderCreate, OrderUpdate, OrderResponse, UserStatsResponse, DailyStatsResponse
+from app.responses import rows_response, row_response, export_response, copy_export_response
+from app.etag import make_etag, is_not_modified, not_modified_response, with_etag
+from common.database.bulk import export_orders_binary, import_orders, restore_orders_binary
+from common.database.filters import OrderFilter
+from common.database.idempotency import IdempotencyError, idempotency
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterator, List, Literal, Optional
+import orjson
 
-router = APIRouter(prefix="/orders", tags=["Orders"])
+router = APIRouter(prefix="/orders", tags=["Orders"], route_class=TimedRoute)
+
+def order_filter(
+    price_min: Optional[Decimal] = Query(None, ge=0),
+    price_max: Optional[Decimal] = Query(None, ge=0),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    product_prefix: Optional[str] = Query(None, min_length=1, max_length=255),
+    sort: str = Query("id", description="id, price, created_at или product_name; '-' в начале - по убыванию"),
+) -> OrderFilter:
+    """Фильтры и сортировка списка заказов из параметров запроса"""
+    try:
+        return OrderFilter(price_min, price_max, created_from, created_to, product_prefix, sort)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
 @router.get("/", response_model=List[OrderResponse])
-async def get_orders(db: AsyncSession = Depends(get_db)):
-    """Получение всех заказов"""
-    return await order_crud.get_all(db)
+async def get_orders(request: Request, filters: OrderFilter = Depends(order_filter),
+                     db: AsyncSession = Depends(get_db)):
+    """Получение всех заказов с фильтрами и сортировкой"""
+    if request.headers.get("if-none-match"):
+        # Сначала дешевая версия подходящих заказов: при совпадении отвечаем 304 без загрузки строк
+        etag = make_etag(request, await order_crud.get_all_version(db, filters))
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+    
+    # Заказы и версия для ETag - одним запросом
+    version, orders = await order_crud.get_all_rows_versioned(db, filters)
+    return with_etag(rows_response(orders), make_etag(request, version))
+
+def _order_record(line: bytes, number: int):
+    """Запись загрузки из строки NDJSON: {"user_id", "product_name", "price", "created_at"?}"""
+    try:
+        item = orjson.loads(line)
+        created_at = item.get("created_at")
+        return (
+            int(item["user_id"]),
+            str(item["product_name"]),
+            Decimal(str(item["price"])),
+            datetime.fromisoformat(created_at) if created_at else None,
+        )
+    except (KeyError, TypeError, ValueError, InvalidOperation, AttributeError) as e:
+        raise ValueError(f"Строка {number}: неверная запись заказа ({e!r})")
+
+async def _ndjson_order_records(chunks: AsyncIterator[bytes]):
+    """Записи загрузки из тела запроса в NDJSON по мере поступления, пустые строки пропускаются"""
+    buffer = b""
+    number = 0
+    async for chunk in chunks:
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield _order_record(line, number)
+    if buffer.strip():
+        yield _order_record(buffer, number + 1)
+
+@router.get("/export")
+async def export_orders(export_format: Literal["ndjson", "csv", "binary"] = Query("ndjson", alias="format")):
+    """Потоковая выгрузка всех заказов в NDJSON, CSV или бинарном формате COPY"""
+    if export_format == "binary":
+        return copy_export_response(export_orders_binary(), "orders")
+    return export_response(order_crud, export_format, "orders")
+
+@router.post("/import", status_code=201)
+async def import_orders_bulk(request: Request):
+    """Массовая загрузка заказов через COPY: новые заказы в NDJSON или
+    выгрузка ?format=binary с ID (Content-Type: application/octet-stream). Все или ничего"""
+    try:
+        if request.headers.get("content-type", "").startswith("application/octet-stream"):
+            imported = await restore_orders_binary(request.stream())
+        else:
+            imported = await import_orders(_ndjson_order_records(request.stream()))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"imported": imported}
+
+@router.get("/stats/daily", response_model=List[DailyStatsResponse])
+async def get_daily_stats(date_from: Optional[date] = None, date_to: Optional[date] = None,
+                          db: AsyncSession = Depends(get_db)):
+    """Заказы по дням в [date_from, date_to): число, сумма и средняя цена"""
+    return rows_response(await order_crud.get_daily_stats(db, date_from, date_to))
+
+@router.get("/stats/top-users", response_model=List[UserStatsResponse])
+async def get_top_users(limit: int = Query(10, ge=1, le=1000),
+                        by: Literal["total_spent", "order_count"] = "total_spent",
+                        db: AsyncSession = Depends(get_db)):
+    """Топ пользователей по сумме или числу заказов"""
+    return rows_response(await order_crud.get_top_users(db, limit, by))
 
 @router.get("/user/{user_id}", response_model=List[OrderResponse])
-async def get_user_orders(user_id: int, db: AsyncSession = Depends(get_db)):
-    """Получение заказов пользователя"""
-    # Проверяем существование пользователя
-    user = await user_crud.get_by_id(db, user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+async def get_user_orders(user_id: int, request: Request,
+                          filters: OrderFilter = Depends(order_filter),
+                          db: AsyncSession = Depends(get_db)):
+    """Получение заказов пользователя с фильтрами и сортировкой"""
+    if request.headers.get("if-none-match"):
+        # Сначала дешевая версия: при совпадении отвечаем 304 без загрузки строк.
+        # Версия включает версию пользователя, поэтому заодно проверяет его существование
+        version = await order_crud.get_user_orders_version(db, user_id, filters)
+        if version[0] is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        etag = make_etag(request, version)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
     
-    return await order_crud.get_by_user_id(db, user_id)
+    # Проверка пользователя, заказы и версия для ETag - одним запросом
+    result = await order_crud.get_user_orders(db, user_id, filters)
+    if result is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    version, orders = result
+    return with_etag(rows_response(orders), make_etag(request, version))
 
 @router.get("/{order_id}", response_model=OrderResponse)
-async def get_order(order_id: int, db: AsyncSession = Depends(get_db)):
+async def get_order(order_id: int, request: Request, db: AsyncSession = Depends(get_db)):
     """Получение заказа по ID"""
-    order = await order_crud.get_by_id(db, order_id)
-    if not order:
+    if request.headers.get("if-none-match"):
+        # Если запись не менялась, отвечаем 304 без загрузки и сериализации
+        version = await order_crud.get_version(db, order_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Order not found")
+        etag = make_etag(request, version)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+    
+    # Заказ и версия для ETag - одним запросом
+    result = await order_crud.get_row_by_id_versioned(db, order_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Order not found")
-    return order
+    version, order = result
+    return with_etag(row_response(order), make_etag(request, version))
 
 @router.post("/", response_model=OrderResponse)
-async def create_order(order: OrderCreate, db: AsyncSession = Depends(get_db)):
-    """Создание нового заказа"""
-    # Проверяем существование пользователя
-    user = await user_crud.get_by_id(db, order.user_id)
-    if not user:
+async def create_order(order: OrderCreate, db: AsyncSession = Depends(get_db),
+                       idempotency_key: Optional[str] = Header(None)):
+    """Создание нового заказа; повтор с тем же Idempotency-Key возвращает созданный заказ"""
+    # Существование пользователя проверяется в том же запросе INSERT
+    try:
+        created = await idempotency.run(
+            order_crud, idempotency_key, (order.user_id, order.product_name, order.price),
+            lambda: order_crud.create(
+                db, 
+                user_id=order.user_id, 
+                product_name=order.product_name, 
+                price=order.price
+            ),
+        )
+    except IdempotencyError as e:
+        raise HTTPException(status_code=409 if e.reason == "in_progress" else 422, detail=str(e))
+    if not created:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    return await order_crud.create(
-        db, 
-        user_id=order.user_id, 
-        product_name=order.product_name, 
-        price=order.price
-    )
+    return row_response(created)
 
 @router.delete("/{order_id}")
 async def delete_order(order_id: int, db: AsyncSession = Depends(get_db)):
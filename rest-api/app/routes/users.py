@@ -1,30 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from common.database.connection import get_db
-from common.database.crud import user_crud
-from app.schemas import UserCreate, UserUpdate, UserResponse
-from typing import List
+from common.monitoring.asgi import TimedRoute
+from common.database.crud import order_crud, user_crud
+from common.database.idempotency import IdempotencyError, idempotency
+from app.schemas import UserCreate, UserUpdate, UserResponse, UserStatsResponse
+from app.responses import rows_response, row_response, export_response
+from app.etag import make_etag, is_not_modified, not_modified_response, with_etag
+from typing import List, Literal, Optional
 
-router = APIRouter(prefix="/users", tags=["Users"])
+router = APIRouter(prefix="/users", tags=["Users"], route_class=TimedRoute)
 
 @router.get("/", response_model=List[UserResponse])
-async def get_users(db: AsyncSession = Depends(get_db)):
+async def get_users(request: Request, db: AsyncSession = Depends(get_db)):
     """Получение всех пользователей"""
-    users = await user_crud.get_all(db)
-    return [user for user in users]
+    if request.headers.get("if-none-match"):
+        # Сначала дешевая версия: если данные не менялись, отвечаем 304 без загрузки строк
+        etag = make_etag(request, await user_crud.get_all_version(db))
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+    
+    # Строки и версия для ETag - одним запросом. Строки БД сериализуются напрямую,
+    # response_model используется только для документации
+    version, users = await user_crud.get_all_rows_versioned(db)
+    return with_etag(rows_response(users), make_etag(request, version))
+
+@router.get("/export")
+async def export_users(export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format")):
+    """Потоковая выгрузка всех пользователей в NDJSON или CSV"""
+    return export_response(user_crud, export_format, "users")
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
+async def get_user(user_id: int, request: Request, db: AsyncSession = Depends(get_db)):
     """Получение пользователя по ID"""
-    user = await user_crud.get_by_id(db, user_id)
-    if not user:
+    if request.headers.get("if-none-match"):
+        # Если запись не менялась, отвечаем 304 без загрузки и сериализации
+        version = await user_crud.get_version(db, user_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        etag = make_etag(request, version)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+    
+    # Запись и версия для ETag - одним запросом
+    result = await user_crud.get_row_by_id_versioned(db, user_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    version, user = result
+    return with_etag(row_response(user), make_etag(request, version))
+
+@router.get("/{user_id}/stats", response_model=UserStatsResponse)
+async def get_user_stats(user_id: int, db: AsyncSession = Depends(get_db)):
+    """Число заказов, сумма и средняя цена заказов пользователя, посчитанные в БД"""
+    stats = await order_crud.get_user_stats(db, user_id)
+    if not stats:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return row_response(stats)
 
 @router.post("/", response_model=UserResponse)
-async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
-    """Создание нового пользователя"""
-    return await user_crud.create(db, name=user.name, email=user.email)
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db),
+                      idempotency_key: Optional[str] = Header(None)):
+    """Создание нового пользователя; повтор с тем же Idempotency-Key возвращает созданного пользователя"""
+    try:
+        return await idempotency.run(
+            user_crud, idempotency_key, (user.name, user.email),
+            lambda: user_crud.create(db, name=user.name, email=user.email),
+        )
+    except IdempotencyError as e:
+        raise HTTPException(status_code=409 if e.reason == "in_progress" else 422, detail=str(e))
 
 @router.delete("/{user_id}")
 async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
@@ -1,2 +1,3 @@
 from .user import UserBase, UserCreate, UserUpdate, UserResponse
-from .order import OrderBase, OrderCreate, OrderUpdate, OrderResponse
\ No newline at end of file
+from .order import OrderBase, OrderCreate, OrderUpdate, OrderResponse
+from .stats import UserStatsResponse, DailyStatsResponse
\ No newline at end of file
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+# Статистика заказов пользователя
+class UserStatsResponse(BaseModel):
+    user_id: int
+    order_count: int
+    total_spent: Decimal
+    avg_price: Optional[Decimal] = None
+
+# Статистика заказов за день
+class DailyStatsResponse(BaseModel):
+    day: date
+    order_count: int
+    total_spent: Decimal
+    avg_price: Decimal
@@ -5,9 +5,6 @@ import json
 import os
 import sys
 import traceback
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
 from tabulate import tabulate
 
 print("Скрипт запущен.")
@@ -22,6 +19,15 @@ os.makedirs('results/graphs', exist_ok=True)
 print("Директории созданы.")
 sys.stdout.flush()
 
+def plotting():
+    """matplotlib и numpy импортируются только при построении графиков: сама загрузка
+    и сводка результатов без них запускаются заметно быстрее"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import numpy as np
+    return plt, np
+
 def load_k6_json(file_path):
     """Загружает данные из результатов k6"""
     print(f"Пытаюсь загрузить файл: {file_path}")
@@ -336,6 +342,7 @@ def analyze_load_results():
     graphql_values = [load_comparison['GraphQL'][label] for label in labels]
     grpc_values = [load_comparison['gRPC'][label] for label in labels]
     
+    plt, np = plotting()
     x = np.arange(len(labels))
     width = 0.25
     
@@ -570,6 +577,7 @@ def analyze_latency_results():
     p95_values = [metrics['p95'] for metrics in latencies.values()]
     p99_values = [metrics['p99'] for metrics in latencies.values()]
     
+    plt, np = plotting()
     x = np.arange(len(labels))
     width = 0.25
     
@@ -786,6 +794,7 @@ def analyze_throughput_results():
     labels = list(throughput.keys())
     rps_values = [metrics['rps'] for metrics in throughput.values()]
     
+    plt, np = plotting()
     plt.figure(figsize=(10, 6))
     ax = plt.axes()
     
@@ -996,6 +1005,7 @@ def main():
         print(tabulate(summary_data, headers="firstrow", tablefmt="grid"))
         
         # Создаем сводный график с основными метриками
+        plt, np = plotting()
         plt.figure(figsize=(14, 10))
         
         # Создаем 4 подграфика для основных метрик
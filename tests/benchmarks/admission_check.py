@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Контроль допуска (common/middleware/admission.py) на модели сервиса, без БД и HTTP.
+
+Сервис - пул из BENCH_POOL "соединений", запрос занимает соединение на BENCH_SERVICE_MS:
+лишние запросы ждут в очереди к пулу, как к пулу SQLAlchemy. BENCH_CLIENTS клиентов
+без пауз шлют запросы BENCH_DURATION секунд.
+
+1. Предел одновременных запросов: off, fixed, aimd, gradient - пропускная способность,
+   задержки допущенных запросов, доля и время отказов, итоговый предел.
+2. Корзины токенов: один клиент шлет втрое чаще RATE_LIMIT_RPS - допущено около
+   rate * время + burst; два "процесса" с общими корзинами (MemoryBuckets стоит на месте
+   Redis) вместе получают ту же квоту, а не двойную.
+
+Проверки (код выхода 1, если не прошли): с aimd и gradient p99 допущенных запросов ниже,
+чем без предела, отказ - быстрее BENCH_REJECT_BUDGET_MS, квоты корзин соблюдаются.
+
+Запуск из корня репозитория: PYTHONPATH=. python tests/benchmarks/admission_check.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+from common.middleware.admission import Admission, ConcurrencyLimit, MemoryBuckets, Rejected
+
+POOL = int(os.getenv("BENCH_POOL", "10"))
+SERVICE_MS = float(os.getenv("BENCH_SERVICE_MS", "5"))
+CLIENTS = int(os.getenv("BENCH_CLIENTS", "200"))
+DURATION = float(os.getenv("BENCH_DURATION", "3"))
+TARGET_LATENCY_MS = float(os.getenv("BENCH_TARGET_LATENCY_MS", "25"))
+REJECT_BUDGET_MS = float(os.getenv("BENCH_REJECT_BUDGET_MS", "1"))
+RATE = float(os.getenv("BENCH_RATE", "50"))
+BURST = float(os.getenv("BENCH_BURST", "10"))
+RESULTS_FILE = os.getenv("BENCH_RESULTS", "results/benchmarks/admission.json")
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 2)
+
+
+async def flood(admission: Admission) -> dict:
+    pool = asyncio.Semaphore(POOL)
+    admitted, rejected = [], []
+    deadline = time.perf_counter() + DURATION
+
+    async def client(number: int):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                ticket = await admission.enter(f"client-{number}")
+            except Rejected:
+                rejected.append(time.perf_counter() - started)
+                # Клиент повторяет после короткой паузы, как по Retry-After с малым значением
+                await asyncio.sleep(0.01)
+                continue
+            async with pool:
+                await asyncio.sleep(SERVICE_MS / 1000)
+            admission.exit(ticket)
+            admitted.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(client(i) for i in range(CLIENTS)))
+    total = len(admitted) + len(rejected)
+    return {
+        "admitted_per_second": round(len(admitted) / DURATION, 1),
+        "admitted_ms": {"p50": percentile(admitted, 0.5), "p99": percentile(admitted, 0.99)},
+        "rejected_share": round(len(rejected) / total, 3) if total else 0.0,
+        "rejected_p99_ms": percentile(rejected, 0.99),
+        "final_limit": int(admission.limit.limit) if admission.limit else None,
+    }
+
+
+async def rate_limit(processes: int) -> dict:
+    """Один клиент втрое чаще квоты через processes "процессов" с общими корзинами"""
+    buckets = MemoryBuckets(RATE, BURST)
+    admissions = [Admission("check", buckets) for _ in range(processes)]
+    admitted = 0
+    interval = 1 / (RATE * 3)
+    started = time.perf_counter()
+    number = 0
+    while time.perf_counter() - started < DURATION:
+        try:
+            await admissions[number % processes].enter("client")
+            admitted += 1
+        except Rejected:
+            pass
+        number += 1
+        await asyncio.sleep(interval)
+    elapsed = time.perf_counter() - started
+    return {"processes": processes, "admitted": admitted, "expected": round(RATE * elapsed + BURST)}
+
+
+async def main() -> int:
+    results = {"pool": POOL, "service_ms": SERVICE_MS, "clients": CLIENTS, "duration_s": DURATION}
+    failures = []
+    for algorithm in ("off", "fixed", "aimd", "gradient"):
+        limit = None
+        if algorithm != "off":
+            limit = ConcurrencyLimit(algorithm, initial=2 * POOL, target_latency=TARGET_LATENCY_MS / 1000)
+        result = results[algorithm] = await flood(Admission("check", limit=limit))
+        print(f"{algorithm:8} допущено {result['admitted_per_second']:7.1f}/с, "
+              f"p50 {result['admitted_ms']['p50']:7.2f} мс, p99 {result['admitted_ms']['p99']:7.2f} мс; "
+              f"отказов {result['rejected_share'] * 100:5.1f}%, p99 отказа {result['rejected_p99_ms']:.3f} мс, "
+              f"предел {result['final_limit']}")
+        if algorithm != "off" and result["rejected_p99_ms"] > REJECT_BUDGET_MS:
+            failures.append(f"{algorithm}: отказ p99 {result['rejected_p99_ms']} мс дольше {REJECT_BUDGET_MS} мс")
+    for algorithm in ("aimd", "gradient"):
+        if results[algorithm]["admitted_ms"]["p99"] >= results["off"]["admitted_ms"]["p99"]:
+            failures.append(f"{algorithm}: p99 допущенных запросов не ниже, чем без предела")
+
+    for processes in (1, 2):
+        result = results[f"rate_limit_{processes}"] = await rate_limit(processes)
+        print(f"корзины, процессов {processes}: допущено {result['admitted']}, ожидалось около {result['expected']}")
+        if abs(result["admitted"] - result["expected"]) > 0.1 * result["expected"] + 2:
+            failures.append(f"корзины, процессов {processes}: допущено {result['admitted']} вместо {result['expected']}")
+
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for failure in failures:
+        print(f"ОШИБКА: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
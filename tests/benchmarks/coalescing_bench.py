@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Объединение одинаковых одновременных чтений (common/database/coalescing.py).
+
+BENCH_CONCURRENCY "клиентов" в своих сессиях одновременно читают всех пользователей
+(user_crud.get_all_rows, как GET /users/ и запрос users в GraphQL), BENCH_WAVES волн подряд.
+Режимы: off - каждый запрос идет в БД, on - одинаковые одновременные запросы объединяются.
+Для каждого режима - число запросов к БД, задержки и чтений в секунду; отдельно - накладные
+расходы на вызов без конкуренции (последовательные вызовы).
+
+SQLite в памяти, запуск из корня репозитория: PYTHONPATH=. python tests/benchmarks/coalescing_bench.py
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from common.database import coalescing
+from common.database.crud import user_crud
+from common.models.base import Base
+from common.models.models import User
+
+USERS = int(os.getenv("BENCH_USERS", "10000"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "50"))
+WAVES = int(os.getenv("BENCH_WAVES", "20"))
+SEQUENTIAL = int(os.getenv("BENCH_SEQUENTIAL", "200"))
+RESULTS_FILE = os.getenv("BENCH_RESULTS", "results/benchmarks/coalescing.json")
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))], 2)
+
+
+async def read(engine) -> float:
+    started = time.perf_counter()
+    async with AsyncSession(engine) as db:
+        await user_crud.get_all_rows(db)
+    return (time.perf_counter() - started) * 1000
+
+
+async def run(engine, statements: list) -> dict:
+    statements.clear()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(WAVES):
+        latencies += await asyncio.gather(*(read(engine) for _ in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - started
+
+    sequential_started = time.perf_counter()
+    for _ in range(SEQUENTIAL):
+        await read(engine)
+    sequential_ms = (time.perf_counter() - sequential_started) / SEQUENTIAL * 1000
+    return {
+        "db_queries": len(statements) - SEQUENTIAL,
+        "reads": len(latencies),
+        "reads_per_second": round(len(latencies) / elapsed, 1),
+        "latency_ms": {"p50": percentile(latencies, 0.5), "p99": percentile(latencies, 0.99)},
+        "sequential_ms": round(sequential_ms, 3),
+    }
+
+
+async def main():
+    engine = create_async_engine(
+        "sqlite+aiosqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        now = datetime.now()
+        await conn.execute(insert(User), [
+            {"name": f"user {i}", "email": f"user{i}@example.com", "created_at": now}
+            for i in range(USERS)
+        ])
+
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+    results = {"users": USERS, "concurrency": CONCURRENCY, "waves": WAVES}
+    configured = coalescing.DB_COALESCE
+    for mode, queries in (("off", set()), ("on", {"all_rows"})):
+        coalescing.DB_COALESCE = queries
+        await read(engine)
+        results[mode] = await run(engine, statements)
+        result = results[mode]
+        print(f"{mode:3} запросов к БД {result['db_queries']:5} на {result['reads']} чтений, "
+              f"{result['reads_per_second']:8.1f} чтений/с, p50 {result['latency_ms']['p50']:8.2f} мс, "
+              f"p99 {result['latency_ms']['p99']:8.2f} мс; без конкуренции {result['sequential_ms']:.3f} мс")
+    coalescing.DB_COALESCE = configured
+    await engine.dispose()
+
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
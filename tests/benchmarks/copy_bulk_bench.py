@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Пропускная способность массовой загрузки и выгрузки заказов (строк в секунду):
+- create: построчно через BaseCRUD.create (ORM, транзакция на строку)
+- copy_import: common.database.bulk.import_orders (COPY BINARY, одна транзакция)
+- stream_export: order_crud.stream_rows (серверный курсор SQLAlchemy, как /orders/export)
+- copy_export: common.database.bulk.export_orders_binary (COPY BINARY)
+
+Заказы создаются для отдельного пользователя, который в конце удаляется вместе с ними.
+Нужен Postgres (переменные POSTGRES_*, как у API).
+Запуск из корня репозитория: PYTHONPATH=. python tests/benchmarks/copy_bulk_bench.py
+"""
+
+import asyncio
+import json
+import os
+import time
+from decimal import Decimal
+
+from sqlalchemy import delete, func, select
+
+from common.database.bulk import export_orders_binary, import_orders
+from common.database.connection import async_session, engine
+from common.database.crud import BaseCRUD, order_crud, user_crud
+from common.database.schema import create_schema
+from common.models.models import Order, User
+
+CREATE_ROWS = int(os.getenv("BENCH_CREATE_ROWS", "2000"))
+COPY_ROWS = int(os.getenv("BENCH_COPY_ROWS", "100000"))
+RESULTS_FILE = os.getenv("BENCH_RESULTS", "results/benchmarks/copy_bulk.json")
+
+
+def rate(rows: int, seconds: float) -> dict:
+    return {"rows": rows, "seconds": round(seconds, 3), "rows_per_sec": round(rows / seconds)}
+
+
+async def bench_create(user_id: int) -> dict:
+    started = time.perf_counter()
+    async with async_session() as db:
+        for i in range(CREATE_ROWS):
+            await BaseCRUD.create(
+                order_crud, db, user_id=user_id, product_name=f"create {i}", price=Decimal(i % 10000) / 100
+            )
+    return rate(CREATE_ROWS, time.perf_counter() - started)
+
+
+async def bench_copy_import(user_id: int) -> dict:
+    records = ((user_id, f"copy {i}", Decimal(i % 10000) / 100, None) for i in range(COPY_ROWS))
+    started = time.perf_counter()
+    imported = await import_orders(records)
+    return rate(imported, time.perf_counter() - started)
+
+
+async def bench_stream_export() -> dict:
+    rows = 0
+    started = time.perf_counter()
+    async with async_session() as db:
+        async for partition in order_crud.stream_rows(db):
+            rows += len(partition)
+    return rate(rows, time.perf_counter() - started)
+
+
+async def bench_copy_export(rows: int) -> dict:
+    size = 0
+    started = time.perf_counter()
+    async for chunk in export_orders_binary():
+        size += len(chunk)
+    result = rate(rows, time.perf_counter() - started)
+    result["bytes"] = size
+    return result
+
+
+async def main():
+    async with engine.begin() as conn:
+        await conn.run_sync(create_schema)
+    async with async_session() as db:
+        user = await user_crud.create(db, name="copy bench", email=f"copy-bench-{time.time_ns()}@example.com")
+
+    results = {}
+    try:
+        results["create"] = await bench_create(user.id)
+        results["copy_import"] = await bench_copy_import(user.id)
+        async with async_session() as db:
+            total = (await db.execute(select(func.count()).select_from(Order))).scalar_one()
+        results["stream_export"] = await bench_stream_export()
+        results["copy_export"] = await bench_copy_export(total)
+    finally:
+        # Заказы удаляются каскадом в БД, без загрузки в ORM
+        async with async_session() as db:
+            await db.execute(delete(User).where(User.id == user.id))
+            await db.commit()
+        await engine.dispose()
+
+    for name, r in results.items():
+        print(f"{name:14} {r['rows']:8} строк за {r['seconds']:8.3f} с  {r['rows_per_sec']:10} строк/с")
+
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Накладные расходы SQLAlchemy на вызов частых запросов CRUD:
+- dynamic: select(...).where(... == значение) собирается при каждом вызове (как было)
+- prebuilt: запрос собран один раз с bindparam (BaseCRUD/OrderCRUD)
+
+Два замера на вызов:
+- build: сборка запроса и ключа кеша компиляции, без БД
+- call: полный вызов get_by_id / get_by_user_id через AsyncSession на SQLite в памяти
+
+Запуск из корня репозитория: PYTHONPATH=. python tests/benchmarks/crud_statement_cache_bench.py
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from common.database.crud import order_crud, user_crud
+from common.models.base import Base
+from common.models.models import Order, User
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "5000"))
+USERS = 100
+RESULTS_FILE = os.getenv("BENCH_RESULTS", "results/benchmarks/crud_statement_cache.json")
+
+
+def per_call_us(started: float, calls: int) -> float:
+    return round((time.perf_counter() - started) / calls * 1e6, 2)
+
+
+def bench_build() -> dict:
+    """Сборка запроса и ключа кеша на вызов"""
+    started = time.perf_counter()
+    for i in range(ITERATIONS):
+        select(User).where(User.id == i)._generate_cache_key()
+    dynamic = per_call_us(started, ITERATIONS)
+
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        user_crud._select_by_id._generate_cache_key()
+    prebuilt = per_call_us(started, ITERATIONS)
+    return {"dynamic_us": dynamic, "prebuilt_us": prebuilt}
+
+
+async def dynamic_get_by_id(db: AsyncSession, id: int):
+    result = await db.execute(select(User).where(User.id == id))
+    return result.scalars().first()
+
+
+async def dynamic_get_by_user_id(db: AsyncSession, user_id: int):
+    result = await db.execute(select(Order).where(Order.user_id == user_id))
+    return result.scalars().all()
+
+
+async def bench_calls(session_factory) -> dict:
+    """Полный вызов через сессию; identity map сбрасывается, чтобы каждый раз создавались объекты"""
+    cases = {
+        "get_by_id": (dynamic_get_by_id, user_crud.get_by_id),
+        "get_by_user_id": (dynamic_get_by_user_id, order_crud.get_by_user_id),
+    }
+    results = {}
+    async with session_factory() as db:
+        for name, (dynamic, prebuilt) in cases.items():
+            timings = {}
+            for variant, method in (("dynamic_us", dynamic), ("prebuilt_us", prebuilt)):
+                # Прогрев: компиляция и кеш подготовленных запросов
+                for i in range(100):
+                    await method(db, i % USERS + 1)
+                started = time.perf_counter()
+                for i in range(ITERATIONS):
+                    await method(db, i % USERS + 1)
+                    db.expunge_all()
+                timings[variant] = per_call_us(started, ITERATIONS)
+            results[name] = timings
+    return results
+
+
+async def main():
+    engine = create_async_engine(
+        "sqlite+aiosqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        now = datetime.now()
+        await conn.execute(insert(User), [
+            {"name": f"user {i}", "email": f"user{i}@example.com", "created_at": now}
+            for i in range(USERS)
+        ])
+        await conn.execute(insert(Order), [
+            {"user_id": i % USERS + 1, "product_name": f"product {i}", "price": Decimal("9.99"), "created_at": now}
+            for i in range(USERS * 5)
+        ])
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    results = {"iterations": ITERATIONS, "build": bench_build(), **await bench_calls(session_factory)}
+    await engine.dispose()
+
+    for name in ("build", "get_by_id", "get_by_user_id"):
+        timings = results[name]
+        print(f"{name:15} dynamic {timings['dynamic_us']:8.2f} мкс  prebuilt {timings['prebuilt_us']:8.2f} мкс")
+
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Сроки запросов и отмена обработки (common/middleware/deadline.py) на ASGI-приложении без сервера.
+
+Обработчик "выполняет запрос к БД" BENCH_WORK_MS миллисекунд (asyncio.sleep на месте asyncpg).
+1. Срок: заголовок x-request-timeout-ms - ответ 504 вскоре после срока, обработка отменена,
+   time_remaining() внутри обработчика видит срок.
+2. Отключение клиента с CANCEL_ON_DISCONNECT: обработка отменяется сразу, а не после BENCH_WORK_MS.
+3. Быстрый запрос с телом (POST) проходит без изменений.
+4. Потоковая выгрузка (/export) дольше срока отдается целиком: срок к ней не применяется.
+5. Запрос без срока с CANCEL_ON_DISCONNECT по умолчанию (выключено) передается приложению
+   напрямую; накладные расходы middleware на BENCH_REQUESTS быстрых запросов - без отмены
+   при отключении и с ней.
+Для каждого случая - время до ответа или отмены и прирост api_requests_abandoned_total.
+
+Проверки (код выхода 1, если не прошли): отмена не позже BENCH_CANCEL_BUDGET_MS после срока
+или отключения, прерванные запросы учтены в метриках.
+
+Запуск из корня репозитория: PYTHONPATH=. python tests/benchmarks/deadline_check.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+from common.database.deadline import time_remaining
+from common.middleware import deadline
+from common.middleware.deadline import DeadlineMiddleware
+from common.monitoring.metrics import ABANDONED_REQUESTS
+
+WORK_MS = float(os.getenv("BENCH_WORK_MS", "2000"))
+TIMEOUT_MS = float(os.getenv("BENCH_TIMEOUT_MS", "100"))
+DISCONNECT_MS = float(os.getenv("BENCH_DISCONNECT_MS", "100"))
+CANCEL_BUDGET_MS = float(os.getenv("BENCH_CANCEL_BUDGET_MS", "50"))
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "10000"))
+RESULTS_FILE = os.getenv("BENCH_RESULTS", "results/benchmarks/deadline.json")
+
+SERVICE = "deadline-check"
+# Частей потоковой выгрузки: по полсрока на часть, вся выгрузка - вдвое дольше срока
+EXPORT_PARTS = 4
+
+
+async def handler(scope, receive, send):
+    """Читает тело, "выполняет запрос" и отвечает телом и оставшимся сроком"""
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            break
+    remaining = time_remaining()
+    state = scope["state"]
+    state["remaining"] = remaining
+    state["receive"] = receive
+    try:
+        if scope["path"] == "/slow":
+            await asyncio.sleep(WORK_MS / 1000)
+        if scope["path"].endswith("/export"):
+            # Заголовки сразу, тело - частями дольше срока
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            for part in range(EXPORT_PARTS):
+                await asyncio.sleep(TIMEOUT_MS / 1000 / 2)
+                await send({"type": "http.response.body", "body": b"%d\n" % part, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+            return
+    except asyncio.CancelledError:
+        state["cancelled_at"] = time.perf_counter()
+        raise
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def call(path: str, headers=(), body=b"", disconnect_after_ms=None) -> dict:
+    app = DeadlineMiddleware(handler, service=SERVICE)
+    scope = {"type": "http", "path": path, "headers": list(headers), "state": {}}
+    sent = [{"type": "http.request", "body": body, "more_body": False}]
+    response = {"status": None, "body": b""}
+
+    async def receive():
+        if sent:
+            return sent.pop()
+        # Дальше клиент молчит до отключения
+        if disconnect_after_ms is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(disconnect_after_ms / 1000)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        else:
+            response["body"] += message.get("body", b"")
+
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    finished = time.perf_counter()
+    state = scope["state"]
+    remaining = state.get("remaining")
+    return {
+        "status": response["status"],
+        "direct": state.get("receive") is receive,
+        "body": response["body"].decode(),
+        "elapsed_ms": round((finished - started) * 1000, 1),
+        "cancelled_after_ms": (
+            round((state["cancelled_at"] - started) * 1000, 1) if "cancelled_at" in state else None
+        ),
+        "remaining_ms": None if remaining is None else round(remaining * 1000, 1),
+    }
+
+
+async def overhead_us(app) -> float:
+    """Среднее время быстрого запроса через app в микросекундах"""
+    scope = {"type": "http", "path": "/fast", "headers": [], "state": {}}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / REQUESTS * 1e6
+
+
+def abandoned(reason: str) -> float:
+    return ABANDONED_REQUESTS.labels(SERVICE, reason)._value.get()
+
+
+async def main() -> int:
+    results = {"work_ms": WORK_MS, "timeout_ms": TIMEOUT_MS, "disconnect_ms": DISCONNECT_MS}
+    failures = []
+
+    before = abandoned("deadline")
+    result = results["deadline"] = await call("/slow", headers=[(b"x-request-timeout-ms", str(TIMEOUT_MS).encode())])
+    result["abandoned"] = abandoned("deadline") - before
+    print(f"срок {TIMEOUT_MS:.0f} мс: ответ {result['status']} через {result['elapsed_ms']} мс, "
+          f"обработка отменена через {result['cancelled_after_ms']} мс, срок в обработчике "
+          f"{result['remaining_ms']} мс, прервано {result['abandoned']:.0f}")
+    if result["status"] != 504:
+        failures.append(f"срок: ответ {result['status']} вместо 504")
+    if result["cancelled_after_ms"] is None or result["cancelled_after_ms"] > TIMEOUT_MS + CANCEL_BUDGET_MS:
+        failures.append("срок: обработка не отменена вовремя")
+    if result["remaining_ms"] is None or result["remaining_ms"] > TIMEOUT_MS:
+        failures.append("срок: обработчик не видит срок запроса")
+    if result["abandoned"] != 1:
+        failures.append("срок: прерванный запрос не учтен в метриках")
+
+    configured = deadline.CANCEL_ON_DISCONNECT
+    deadline.CANCEL_ON_DISCONNECT = True
+    before = abandoned("client_disconnect")
+    result = results["client_disconnect"] = await call("/slow", disconnect_after_ms=DISCONNECT_MS)
+    deadline.CANCEL_ON_DISCONNECT = configured
+    result["abandoned"] = abandoned("client_disconnect") - before
+    print(f"отключение через {DISCONNECT_MS:.0f} мс: обработка отменена через "
+          f"{result['cancelled_after_ms']} мс (без отмены - {WORK_MS:.0f} мс), прервано {result['abandoned']:.0f}")
+    if result["cancelled_after_ms"] is None or result["cancelled_after_ms"] > DISCONNECT_MS + CANCEL_BUDGET_MS:
+        failures.append("отключение: обработка не отменена вовремя")
+    if result["abandoned"] != 1:
+        failures.append("отключение: прерванный запрос не учтен в метриках")
+
+    result = results["fast"] = await call("/fast", body=b'{"name":"check"}')
+    print(f"быстрый запрос: ответ {result['status']} через {result['elapsed_ms']} мс")
+    if result["status"] != 200 or result["body"] != '{"name":"check"}':
+        failures.append("быстрый запрос: ответ изменен")
+
+    timeout_header = [(b"x-request-timeout-ms", str(TIMEOUT_MS).encode())]
+    result = results["export"] = await call("/orders/export", headers=timeout_header)
+    print(f"выгрузка со сроком {TIMEOUT_MS:.0f} мс: ответ {result['status']} через {result['elapsed_ms']} мс, "
+          f"частей {result['body'].count(chr(10))} из {EXPORT_PARTS}")
+    expected = "".join(f"{part}\n" for part in range(EXPORT_PARTS))
+    if result["status"] != 200 or result["body"] != expected or result["cancelled_after_ms"] is not None:
+        failures.append("выгрузка: поток оборван по сроку")
+
+    deadline.CANCEL_ON_DISCONNECT = False
+    result = results["plain"] = await call("/fast")
+    result["handler_us"] = round(await overhead_us(handler), 1)
+    result["middleware_us"] = round(await overhead_us(DeadlineMiddleware(handler, service=SERVICE)), 1)
+    deadline.CANCEL_ON_DISCONNECT = True
+    result["cancel_on_disconnect_us"] = round(await overhead_us(DeadlineMiddleware(handler, service=SERVICE)), 1)
+    deadline.CANCEL_ON_DISCONNECT = configured
+    print(f"запрос без срока: обработчик {result['handler_us']} мкс, через middleware "
+          f"{result['middleware_us']} мкс, с CANCEL_ON_DISCONNECT {result['cancel_on_disconnect_us']} мкс")
+    if result["status"] != 200 or not result["direct"]:
+        failures.append("запрос без срока: идет через наблюдателя без CANCEL_ON_DISCONNECT")
+
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for failure in failures:
+        print(f"ОШИБКА: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
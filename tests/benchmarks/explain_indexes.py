@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Проверка, что фильтры списка заказов используют индексы.
+
+В одной транзакции заполняет таблицы синтетическими данными, выполняет ANALYZE
+и EXPLAIN (FORMAT JSON) для запросов, которые строит order_crud.select_orders.
+В конце транзакция откатывается, данные в БД не меняются.
+Код выхода 1, если в плане нет ожидаемого индекса.
+
+Нужен Postgres (переменные POSTGRES_*, как у API).
+Запуск из корня репозитория: PYTHONPATH=. python tests/benchmarks/explain_indexes.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import timedelta
+from decimal import Decimal
+
+from sqlalchemy import text
+
+from common.database.connection import engine
+from common.database.crud import order_crud
+from common.database.filters import OrderFilter
+from common.database.schema import create_schema
+from common.models.models import Order
+
+USERS = int(os.getenv("EXPLAIN_USERS", "1000"))
+ORDERS = int(os.getenv("EXPLAIN_ORDERS", "100000"))
+RESULTS_FILE = os.getenv("EXPLAIN_RESULTS", "results/benchmarks/explain_indexes.json")
+
+
+async def fill(conn):
+    """Синтетические пользователи и заказы; возвращает (ID первого пользователя, текущее время БД)"""
+    first_user_id = (await conn.execute(text(
+        "INSERT INTO users (name, email, created_at) "
+        "SELECT 'explain ' || g, 'explain-' || g || '@example.com', now() "
+        "FROM generate_series(1, :users) g RETURNING id"
+    ), {"users": USERS})).scalars().all()[0]
+    # Заказы равномерно по пользователям, датам (шаг - минута), ценам и префиксам названий
+    await conn.execute(text(
+        "INSERT INTO orders (user_id, product_name, price, created_at) "
+        "SELECT :first + g % :users, 'product-' || md5(g::text), "
+        "(g * 7919 % 100000) / 100.0, now() - g * interval '1 minute' "
+        "FROM generate_series(1, :orders) g"
+    ), {"first": first_user_id, "users": USERS, "orders": ORDERS})
+    await conn.execute(text("ANALYZE users"))
+    await conn.execute(text("ANALYZE orders"))
+    now = (await conn.execute(text("SELECT now()::timestamp"))).scalar_one()
+    return first_user_id, now
+
+
+def index_names(plan) -> set:
+    """Имена всех индексов в плане"""
+    names = set()
+    if "Index Name" in plan:
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names |= index_names(child)
+    return names
+
+
+async def explain(conn, stmt):
+    """План запроса как JSON; параметры подставляются литералами, как в custom plan"""
+    sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql)
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+async def main() -> int:
+    columns = Order.__table__.columns
+    results = []
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            await conn.run_sync(create_schema)
+            user_id, now = await fill(conn)
+            cases = [
+                ("user_orders_by_date", "ix_orders_user_id_created_at",
+                 order_crud.select_orders(columns, user_id, OrderFilter(
+                     created_from=now - timedelta(days=30), sort="-created_at"))),
+                ("created_at_range", "ix_orders_created_at",
+                 order_crud.select_orders(columns, filters=OrderFilter(
+                     created_from=now - timedelta(hours=6), created_to=now, sort="-created_at"))),
+                ("price_range", "ix_orders_price",
+                 order_crud.select_orders(columns, filters=OrderFilter(
+                     price_min=Decimal("100.00"), price_max=Decimal("105.00"), sort="price"))),
+                ("product_prefix", "ix_orders_product_name_prefix",
+                 order_crud.select_orders(columns, filters=OrderFilter(
+                     product_prefix="product-ab", sort="product_name"))),
+            ]
+            for name, expected, stmt in cases:
+                plan = await explain(conn, stmt)
+                used = sorted(index_names(plan))
+                ok = expected in used
+                results.append({
+                    "case": name,
+                    "expected_index": expected,
+                    "indexes": used,
+                    "node": plan["Node Type"],
+                    "total_cost": plan["Total Cost"],
+                    "ok": ok,
+                })
+                print(f"{'OK  ' if ok else 'FAIL'} {name}: ожидается {expected}, в плане {used or 'нет индексов'}")
+        finally:
+            await transaction.rollback()
+    await engine.dispose()
+
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
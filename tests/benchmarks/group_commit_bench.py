@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Групповая фиксация заказов (ORDER_GROUP_COMMIT, common/database/group_commit.py).
+
+BENCH_CLIENTS клиентов без пауз создают заказы через order_crud.create BENCH_DURATION секунд.
+Режимы: off - транзакция и фиксация на каждый заказ; on - заказы одновременных запросов
+пишутся пачками, с задержкой накопления BENCH_DELAYS_MS миллисекунд. Для каждого режима -
+заказов в секунду, задержки создания, число фиксаций и средний размер пачки.
+
+Postgres (переменные POSTGRES_*, как у API), таблицы - в схеме bench_group_commit (удаляется
+в конце); пачки пишутся через unnest массивов. Дополнительно - проверка изоляции ошибок
+(код выхода 1, если не прошла): в одной пачке с обычными заказами заказ с названием длиннее
+255 символов и заказ с ценой вне NUMERIC(10,2) получают ошибку, заказ несуществующего
+пользователя - None, остальные создаются.
+
+Запуск из корня репозитория: PYTHONPATH=. python tests/benchmarks/group_commit_bench.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from decimal import Decimal
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from common.database import crud
+from common.database.connection import engine as base_engine
+from common.models.base import Base
+from common.models.models import User
+
+CLIENTS = int(os.getenv("BENCH_CLIENTS", "100"))
+DURATION = float(os.getenv("BENCH_DURATION", "3"))
+USERS = int(os.getenv("BENCH_USERS", "100"))
+DELAYS_MS = [float(delay) for delay in os.getenv("BENCH_DELAYS_MS", "1,2,5").split(",")]
+MAX_BATCH = int(os.getenv("BENCH_MAX_BATCH", "100"))
+RESULTS_FILE = os.getenv("BENCH_RESULTS", "results/benchmarks/group_commit.json")
+
+POSTGRES_SCHEMA = "bench_group_commit"
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 2)
+
+
+async def run(engine, commits: list) -> dict:
+    commits.clear()
+    latencies = []
+    deadline = time.perf_counter() + DURATION
+
+    async def client(number: int):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            async with AsyncSession(engine) as db:
+                order = await crud.order_crud.create(
+                    db, user_id=number % USERS + 1, product_name=f"product {number}", price=Decimal("9.99")
+                )
+            assert order is not None
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(number) for number in range(CLIENTS)))
+    elapsed = time.perf_counter() - started
+    return {
+        "orders_per_second": round(len(latencies) / elapsed, 1),
+        "latency_ms": {"p50": percentile(latencies, 0.5), "p99": percentile(latencies, 0.99)},
+        "commits": len(commits),
+        "orders_per_commit": round(len(latencies) / max(1, len(commits)), 1),
+    }
+
+
+async def check_isolation(engine) -> dict:
+    """Пачка с заказами, которые не подходят колонкам или без пользователя: ошибку получает
+    только такой заказ, остальные создаются"""
+    orders = {
+        "ok": (1, "product ok", Decimal("9.99")),
+        "long_name": (1, "x" * 300, Decimal("9.99")),
+        "price_overflow": (1, "product overflow", Decimal("1000000000")),
+        "no_user": (USERS + 1000, "product no user", Decimal("9.99")),
+        "ok_after": (2, "product ok after", Decimal("19.99")),
+    }
+    crud.ORDER_GROUP_COMMIT = True
+    # Задержка накопления с запасом: все заказы попадают в одну пачку
+    crud.order_crud._group_commit.max_delay = 0.05
+
+    async def create(user_id, product_name, price):
+        async with AsyncSession(engine) as db:
+            return await crud.order_crud.create(db, user_id=user_id, product_name=product_name, price=price)
+
+    created = await asyncio.gather(*(create(*order) for order in orders.values()), return_exceptions=True)
+    outcome = {
+        name: "error" if isinstance(result, DBAPIError) else "none" if result is None else
+        "created" if result.product_name == orders[name][1] else repr(result)
+        for name, result in zip(orders, created)
+    }
+    expected = {"ok": "created", "long_name": "error", "price_overflow": "error", "no_user": "none", "ok_after": "created"}
+    return {"outcome": outcome, "isolated": outcome == expected}
+
+
+async def main() -> int:
+    async with base_engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {POSTGRES_SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {POSTGRES_SCHEMA}"))
+    # Таблицы моделей и запросы order_crud - в отдельной схеме
+    engine = base_engine.execution_options(schema_translate_map={None: POSTGRES_SCHEMA})
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [
+            {"name": f"user {i}", "email": f"user{i}@example.com"} for i in range(USERS)
+        ])
+
+    commits = []
+    event.listen(base_engine.sync_engine, "commit", lambda *args: commits.append(1))
+
+    results = {"clients": CLIENTS, "duration_s": DURATION, "max_batch": MAX_BATCH}
+    modes = [("off", None)] + [(f"on_{delay:g}ms", delay) for delay in DELAYS_MS]
+    configured = crud.ORDER_GROUP_COMMIT
+    for mode, delay in modes:
+        crud.ORDER_GROUP_COMMIT = delay is not None
+        if delay is not None:
+            crud.order_crud._group_commit.max_delay = delay / 1000
+            crud.order_crud._group_commit.max_batch = MAX_BATCH
+        result = results[mode] = await run(engine, commits)
+        print(f"{mode:9} {result['orders_per_second']:8.1f} заказов/с, p50 {result['latency_ms']['p50']:8.2f} мс, "
+              f"p99 {result['latency_ms']['p99']:8.2f} мс; фиксаций {result['commits']:6}, "
+              f"заказов на фиксацию {result['orders_per_commit']:6.1f}")
+
+    failures = []
+    result = results["isolation"] = await check_isolation(engine)
+    print(f"изоляция ошибок в пачке: {result['outcome']}")
+    if not result["isolated"]:
+        failures.append("ошибка одного заказа в пачке досталась другим заказам")
+    async with base_engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA {POSTGRES_SCHEMA} CASCADE"))
+    crud.ORDER_GROUP_COMMIT = configured
+    await base_engine.dispose()
+
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for failure in failures:
+        print(f"ОШИБКА: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
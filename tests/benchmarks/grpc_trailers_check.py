@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Trailing metadata gRPC-вызовов через цепочку интерцепторов grpc-api
+(ServerTimingInterceptor, DeadlineInterceptor, AdmissionInterceptor) на локальном сервере без БД.
+
+1. Отказ допуска (лимит частоты: корзина на один запрос) - RESOURCE_EXHAUSTED и
+   grpc-retry-pushback-ms в trailing metadata: замер фаз не затирает подсказку клиенту.
+2. Допущенный вызов, обработчик которого сам задает trailing metadata, - в ответе и его
+   метаданные, и server-timing.
+
+Проверки (код выхода 1, если не прошли) - по обоим пунктам.
+
+Запуск из корня репозитория: PYTHONPATH=. python tests/benchmarks/grpc_trailers_check.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import grpc
+
+from common.middleware.admission import Admission, MemoryBuckets
+from common.middleware.admission_grpc import AdmissionInterceptor
+from common.middleware.deadline_grpc import DeadlineInterceptor
+from common.monitoring.grpc_interceptor import ServerTimingInterceptor
+
+RESULTS_FILE = os.getenv("BENCH_RESULTS", "results/benchmarks/grpc_trailers.json")
+
+SERVICE = "grpc-trailers-check"
+OWN_TRAILER = ("x-check", "handler")
+
+
+def identity(data: bytes) -> bytes:
+    return data
+
+
+def as_dict(metadata) -> dict:
+    return {key: value for key, value in metadata or ()}
+
+
+async def echo(request, context):
+    """Обработчик со своими trailing metadata"""
+    context.set_trailing_metadata((OWN_TRAILER,))
+    return request
+
+
+async def main() -> int:
+    admission = AdmissionInterceptor(SERVICE)
+    # Корзина на один запрос без пополнения за время проверки: второй вызов получает отказ
+    admission.admission = Admission(SERVICE, MemoryBuckets(rate=0.1, burst=1))
+    server = grpc.aio.server(interceptors=[
+        ServerTimingInterceptor(SERVICE), DeadlineInterceptor(SERVICE), admission,
+    ])
+    server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler("check.Check", {
+        "Echo": grpc.unary_unary_rpc_method_handler(echo, identity, identity),
+    }),))
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+
+    results = {}
+    failures = []
+    try:
+        async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+            call = channel.unary_unary("/check.Check/Echo", identity, identity)
+
+            admitted = call(b"ping", timeout=5)
+            await admitted
+            trailers = as_dict(await admitted.trailing_metadata())
+            results["admitted"] = trailers
+            print(f"допущенный вызов: {trailers}")
+            if trailers.get(OWN_TRAILER[0]) != OWN_TRAILER[1] or "server-timing" not in trailers:
+                failures.append("допущенный вызов: trailing metadata обработчика или server-timing потеряны")
+
+            try:
+                await call(b"ping", timeout=5)
+                code, trailers = grpc.StatusCode.OK, {}
+            except grpc.aio.AioRpcError as e:
+                code, trailers = e.code(), as_dict(e.trailing_metadata())
+            results["rejected"] = {"code": code.name, "trailers": trailers}
+            print(f"отказ допуска: {code.name}, {trailers}")
+            if code != grpc.StatusCode.RESOURCE_EXHAUSTED or "grpc-retry-pushback-ms" not in trailers:
+                failures.append("отказ допуска: нет grpc-retry-pushback-ms в trailing metadata")
+    finally:
+        await server.stop(None)
+
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for failure in failures:
+        print(f"ОШИБКА: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ключи идемпотентности при создании заказов (common/database/idempotency.py).
+
+BENCH_REQUESTS запросов создают заказы, каждый клиент повторяет свой запрос BENCH_RETRIES раз:
+половина повторов - одновременно с первым запросом (клиент не дождался ответа), остальные -
+после него. Без ключа каждый повтор создает заказ-дубликат, с ключом - заказов столько же,
+сколько запросов, а повторы не обращаются к БД. Для каждого режима - число заказов, запросов
+к БД и время создания и повтора.
+
+Проверки (код выхода 1, если не прошли): с ключом нет дубликатов, повторы с теми же
+параметрами получают тот же заказ (в том числе с ценой в другой записи: 0.99 и 0.990),
+повтор с другими параметрами отклоняется.
+
+SQLite в памяти, запуск из корня репозитория: PYTHONPATH=. python tests/benchmarks/idempotency_check.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from decimal import Decimal
+
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from common.database.crud import order_crud
+from common.database.idempotency import Idempotency, IdempotencyError, MemoryStore
+from common.models.base import Base
+from common.models.models import Order, User
+
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "200"))
+RETRIES = int(os.getenv("BENCH_RETRIES", "4"))
+RESULTS_FILE = os.getenv("BENCH_RESULTS", "results/benchmarks/idempotency.json")
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 3)
+
+
+async def create(engine, idempotency: Idempotency, key, number: int, latencies: list):
+    started = time.perf_counter()
+    async with AsyncSession(engine) as db:
+        price = Decimal(number % 100) + Decimal("0.99")
+        order = await idempotency.run(
+            order_crud, key, (1, f"product {number}", price),
+            lambda: order_crud.create(db, user_id=1, product_name=f"product {number}", price=price),
+        )
+    latencies.append(time.perf_counter() - started)
+    return order
+
+
+async def run(engine, statements: list, with_key: bool) -> dict:
+    idempotency = Idempotency(MemoryStore())
+    async with engine.begin() as conn:
+        await conn.execute(Order.__table__.delete())
+    statements.clear()
+    first, retries = [], []
+    first_ids = []
+    same = True
+
+    async def client(number: int):
+        nonlocal same
+        key = f"request-{number}" if with_key else None
+        concurrent = RETRIES // 2
+        orders = await asyncio.gather(
+            create(engine, idempotency, key, number, first),
+            *(create(engine, idempotency, key, number, retries) for _ in range(concurrent)),
+        )
+        for _ in range(RETRIES - concurrent):
+            orders.append(await create(engine, idempotency, key, number, retries))
+        same = same and len({order.id for order in orders}) == 1
+        if number == 0:
+            first_ids.append(orders[0].id)
+
+    await asyncio.gather(*(client(number) for number in range(REQUESTS)))
+    first_order_id = first_ids[0]
+    async with engine.connect() as conn:
+        orders = (await conn.execute(select(func.count()).select_from(Order))).scalar()
+
+    result = {
+        "orders": orders,
+        "db_queries": len(statements),
+        "same_order": same,
+        "first_ms": {"p50": percentile(first, 0.5), "p99": percentile(first, 0.99)},
+        "retry_ms": {"p50": percentile(retries, 0.5), "p99": percentile(retries, 0.99)},
+    }
+    if with_key:
+        # Та же цена в другой записи - тот же заказ
+        async with AsyncSession(engine) as db:
+            try:
+                replayed = await idempotency.run(
+                    order_crud, "request-0", (1, "product 0", Decimal("0.990")),
+                    lambda: order_crud.create(db, user_id=1, product_name="product 0", price=Decimal("0.990")),
+                )
+                result["equivalent_price_replayed"] = replayed.id == first_order_id
+            except IdempotencyError:
+                result["equivalent_price_replayed"] = False
+        # Тот же ключ с другими параметрами
+        try:
+            await create(engine, idempotency, "request-0", 1, [])
+            result["mismatch_rejected"] = False
+        except IdempotencyError as e:
+            result["mismatch_rejected"] = e.reason == "mismatch"
+    return result
+
+
+async def main() -> int:
+    engine = create_async_engine(
+        "sqlite+aiosqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [{"name": "user", "email": "user@example.com"}])
+
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+    results = {"requests": REQUESTS, "retries": RETRIES}
+    failures = []
+    for mode, with_key in (("without_key", False), ("with_key", True)):
+        result = results[mode] = await run(engine, statements, with_key)
+        print(f"{mode:11} заказов {result['orders']:5} на {REQUESTS} запросов, запросов к БД "
+              f"{result['db_queries']:5}; создание p50 {result['first_ms']['p50']:7.3f} мс, "
+              f"повтор p50 {result['retry_ms']['p50']:7.3f} мс")
+    await engine.dispose()
+
+    result = results["with_key"]
+    if result["orders"] != REQUESTS:
+        failures.append(f"с ключом создано {result['orders']} заказов вместо {REQUESTS}")
+    if not result["same_order"]:
+        failures.append("повторы с ключом получили разные заказы")
+    if not result["equivalent_price_replayed"]:
+        failures.append("повтор с ключом и той же ценой в другой записи получил другой заказ")
+    if not result["mismatch_rejected"]:
+        failures.append("повтор с ключом и другими параметрами не отклонен")
+
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for failure in failures:
+        print(f"ОШИБКА: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Время импорта сервисов при холодном старте и проверка бюджета.
+
+Для каждого сервиса в отдельном процессе выполняется import app.main - то, что делает
+uvicorn (или python -m app.main у gRPC) до приема первого запроса, без подключения к БД:
+- время процесса (запуск интерпретатора и импорт), медиана IMPORT_REPEATS запусков
+  после одного прогревочного (байткод уже скомпилирован);
+- отчет python -X importtime: собственное время импорта, сложенное по пакетам верхнего
+  уровня, и самые медленные модули.
+
+Проверки (код выхода 1, если не прошли):
+- медиана не больше IMPORT_BUDGET_MS;
+- при старте не импортируются необязательные модули (LAZY_MODULES): они загружаются
+  только при использовании.
+
+Сервис без установленных зависимостей (например, в контейнере tests есть только
+зависимости REST API) пропускается.
+
+Запуск из корня репозитория: python tests/benchmarks/import_time_report.py [сервис ...]
+В контейнере сервиса (код в /app): SERVICE_DIR=/app python import_time_report.py graphql-api
+"""
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+SERVICES = ("rest-api", "graphql-api", "grpc-api")
+REPEATS = int(os.getenv("IMPORT_REPEATS", "5"))
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "2000"))
+TOP_MODULES = int(os.getenv("IMPORT_TOP_MODULES", "15"))
+RESULTS_FILE = os.getenv("BENCH_RESULTS", "results/benchmarks/import_time.json")
+# Корень с каталогами сервисов и common; по умолчанию - на два уровня выше этого файла
+SERVICES_ROOT = os.getenv("SERVICES_ROOT", os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Не нужны для обслуживания запросов и не должны замедлять старт.
+# Пакет grpc_reflection (без подмодулей) импортирует сам grpc, поэтому проверяется v1alpha
+LAZY_MODULES = ("grpc_reflection.v1alpha", "alembic", "matplotlib", "pandas")
+
+# import time:       self [us] |   cumulative | imported package
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def service_dir(service: str) -> str:
+    return os.getenv("SERVICE_DIR") or os.path.join(SERVICES_ROOT, service)
+
+
+def run_import(directory: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    """Импорт app.main в новом процессе; common ищется в SERVICES_ROOT и в каталоге сервиса"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [directory, SERVICES_ROOT, env.get("PYTHONPATH")]))
+    args = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", "import app.main"]
+    return subprocess.run(args, cwd=directory, env=env, capture_output=True, text=True)
+
+
+def missing_dependency(stderr: str):
+    """Имя отсутствующего стороннего пакета или None, если импорт упал по другой причине"""
+    match = re.search(r"ModuleNotFoundError: No module named '([\w.]+)'", stderr)
+    if match and match.group(1).split(".")[0] not in ("app", "common"):
+        return match.group(1)
+    return None
+
+
+def parse_importtime(stderr: str) -> list:
+    """Строки отчета -X importtime: (модуль, собственное время, накопленное время) в мс"""
+    modules = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            modules.append((match.group(4), int(match.group(1)) / 1000, int(match.group(2)) / 1000))
+    return modules
+
+
+def measure(service: str) -> dict:
+    directory = service_dir(service)
+    if not os.path.exists(os.path.join(directory, "app", "main.py")):
+        return {"skipped": f"нет {directory}/app/main.py"}
+
+    # Прогрев: компиляция байткода и кэш файловой системы
+    warmup = run_import(directory)
+    if warmup.returncode != 0:
+        missing = missing_dependency(warmup.stderr)
+        if missing:
+            return {"skipped": f"не установлен {missing}"}
+        raise RuntimeError(f"{service}: импорт app.main завершился ошибкой\n{warmup.stderr}")
+
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        run_import(directory)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    modules = parse_importtime(run_import(directory, importtime=True).stderr)
+    packages = defaultdict(float)
+    for name, self_ms, _ in modules:
+        packages[name.split(".")[0]] += self_ms
+    imported = {name for name, _, _ in modules}
+
+    return {
+        "median_ms": round(statistics.median(timings), 1),
+        "budget_ms": BUDGET_MS,
+        "modules": len(modules),
+        "packages_ms": {name: round(ms, 1) for name, ms in sorted(packages.items(), key=lambda item: -item[1])},
+        "slowest_modules": [
+            {"module": name, "self_ms": round(self_ms, 1), "cumulative_ms": round(cumulative_ms, 1)}
+            for name, self_ms, cumulative_ms in sorted(modules, key=lambda module: -module[1])[:TOP_MODULES]
+        ],
+        "lazy_modules_imported": [
+            lazy for lazy in LAZY_MODULES if any(name == lazy or name.startswith(lazy + ".") for name in imported)
+        ],
+    }
+
+
+def main() -> int:
+    services = sys.argv[1:] or SERVICES
+    results, failures = {}, []
+    for service in services:
+        result = results[service] = measure(service)
+        if "skipped" in result:
+            print(f"{service}: пропущен ({result['skipped']})")
+            continue
+
+        print(f"\n{service}: импорт {result['median_ms']:.0f} мс (бюджет {BUDGET_MS:.0f} мс), "
+              f"модулей: {result['modules']}")
+        for name, ms in list(result["packages_ms"].items())[:10]:
+            print(f"  {name:32} {ms:8.1f} мс")
+        if result["median_ms"] > BUDGET_MS:
+            failures.append(f"{service}: импорт {result['median_ms']:.0f} мс больше бюджета {BUDGET_MS:.0f} мс")
+        if result["lazy_modules_imported"]:
+            failures.append(f"{service}: при старте импортируются {', '.join(result['lazy_modules_imported'])}")
+
+    os.makedirs(os.path.dirname(RESULTS_FILE) or ".", exist_ok=True)
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    for failure in failures:
+        print(f"ОШИБКА: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Сравнение пропускной способности цикла событий при разных настройках логирования:
+- echo: basicConfig + синхронный вывод каждого SQL-запроса (как engine с echo=True)
+- queue_all: QueueHandler + JSON, каждый SQL-запрос в лог
+- queue_sampled: QueueHandler + JSON, в лог только медленные запросы
+
+Запуск из корня репозитория: PYTHONPATH=. python tests/benchmarks/logging_bench.py
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+from common.monitoring.logging_setup import TEXT_FORMAT, log_sql, setup_logging
+
+# Параметры нагрузки
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "20000"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "50"))
+QUERIES_PER_REQUEST = 2
+# Доля "медленных" запросов в выборке
+SLOW_RATIO = 0.01
+
+STATEMENT = (
+    "SELECT users.id, users.name, users.email, users.created_at \n"
+    "FROM users \nWHERE users.id = $1::INTEGER"
+)
+
+engine_logger = logging.getLogger("sqlalchemy.engine.Engine")
+
+
+def log_echo(duration_ms):
+    """Вывод, аналогичный echo=True: запрос и параметры"""
+    engine_logger.info(STATEMENT)
+    engine_logger.info("[generated in %.5fs] %r", duration_ms / 1000, (42,))
+
+
+def log_all(duration_ms):
+    """Каждый запрос в лог через очередь"""
+    log_sql(STATEMENT, duration_ms, slow_query_ms=0)
+
+
+def log_sampled(duration_ms):
+    """Только медленные запросы"""
+    log_sql(STATEMENT, duration_ms, slow_query_ms=100, sample_rate=0)
+
+
+async def run_load(log_query):
+    """Имитация запросов: переключение контекста и логирование SQL"""
+    queue = asyncio.Queue()
+    for _ in range(REQUESTS):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            for _ in range(QUERIES_PER_REQUEST):
+                await asyncio.sleep(0)
+                log_query(150.0 if random.random() < SLOW_RATIO else 1.5)
+
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+
+
+def configure_echo(stream):
+    """Синхронный вывод в поток, как logging.basicConfig"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    # SQLAlchemy по умолчанию глушит свои логгеры до WARNING, echo=True включает INFO
+    engine_logger.setLevel(logging.INFO)
+    return None
+
+
+def measure(name, configure, log_query):
+    """Замерить один режим, возвращает запросов в секунду"""
+    with tempfile.TemporaryFile("w") as stream:
+        listener = configure(stream)
+        started = time.perf_counter()
+        asyncio.run(run_load(log_query))
+        elapsed = time.perf_counter() - started
+        # Дожидаемся записи очереди отдельно: цикл событий это время не тратит
+        if listener is not None:
+            atexit.unregister(listener.stop)
+            listener.stop()
+        total = time.perf_counter() - started
+
+    rps = REQUESTS / elapsed
+    print(f"{name:<15} {rps:>12.0f} запросов/с  (цикл событий {elapsed:.2f} с, с дозаписью лога {total:.2f} с)")
+    sys.stdout.flush()
+    return {"mode": name, "rps": rps, "loop_seconds": elapsed, "total_seconds": total}
+
+
+def main():
+    print(f"Запросов: {REQUESTS}, параллельно: {CONCURRENCY}, SQL на запрос: {QUERIES_PER_REQUEST}")
+    results = [
+        measure("echo", configure_echo, log_echo),
+        measure("queue_all", lambda stream: setup_logging("bench", stream), log_all),
+        measure("queue_sampled", lambda stream: setup_logging("bench", stream), log_sampled),
+    ]
+
+    os.makedirs("results/benchmarks", exist_ok=True)
+    with open("results/benchmarks/logging.json", "w") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
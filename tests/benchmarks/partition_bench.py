@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Обычная таблица заказов против секционированной по месяцам created_at.
+
+В схемах bench_heap и bench_part создаются копии orders (обычная и секционированная,
+с теми же индексами) и заполняются BENCH_ROWS синтетическими заказами за BENCH_MONTHS
+месяцев. Запросы - те же методы order_crud, что у API: схема подменяется через
+schema_translate_map. Для каждого запроса - медиана времени и число просканированных секций
+по EXPLAIN ANALYZE. Отдельно - удаление самого старого месяца: DELETE против DROP секции.
+В конце обе схемы удаляются.
+
+Нужен Postgres (переменные POSTGRES_*, как у API); заполнение десятков миллионов строк
+занимает минуты.
+Запуск из корня репозитория: PYTHONPATH=. python tests/benchmarks/partition_bench.py
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from common.database.connection import engine
+from common.database.crud import order_crud
+from common.database.filters import OrderFilter
+from common.database.partitions import add_months, partition_name
+from common.models.models import Order
+
+ROWS = int(os.getenv("BENCH_ROWS", "20000000"))
+MONTHS = int(os.getenv("BENCH_MONTHS", "24"))
+USERS = int(os.getenv("BENCH_USERS", "100000"))
+REPEATS = int(os.getenv("BENCH_REPEATS", "5"))
+RESULTS_FILE = os.getenv("BENCH_RESULTS", "results/benchmarks/partitions.json")
+
+SCHEMAS = {"heap": "bench_heap", "partitioned": "bench_part"}
+
+COLUMNS = (
+    "id integer NOT NULL, user_id integer NOT NULL, product_name varchar(255) NOT NULL, "
+    "price numeric(10, 2) NOT NULL, created_at timestamp NOT NULL"
+)
+
+
+async def create_tables(conn, first_month: date, end: date):
+    heap, part = SCHEMAS["heap"], SCHEMAS["partitioned"]
+    for schema in SCHEMAS.values():
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+    await conn.execute(text(f"CREATE TABLE {heap}.orders ({COLUMNS}, PRIMARY KEY (id))"))
+    await conn.execute(text(
+        f"CREATE TABLE {part}.orders ({COLUMNS}, PRIMARY KEY (id, created_at)) PARTITION BY RANGE (created_at)"
+    ))
+    month = first_month
+    while month < end:
+        await conn.execute(text(
+            f"CREATE TABLE {part}.{partition_name(month)} PARTITION OF {part}.orders "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+        month = add_months(month, 1)
+
+    # Индексы модели Order - те же, что создает create_schema
+    for schema in SCHEMAS.values():
+        translated = await conn.execution_options(schema_translate_map={None: schema})
+        await translated.run_sync(lambda sync: [index.create(sync) for index in Order.__table__.indexes])
+
+
+async def fill(conn, start: date, end: datetime):
+    """Заказы равномерно по времени в [start, end)"""
+    for schema in SCHEMAS.values():
+        started = time.perf_counter()
+        await conn.execute(text(
+            f"INSERT INTO {schema}.orders (id, user_id, product_name, price, created_at) "
+            "SELECT g, g % :users + 1, 'product-' || (g % 1000), (g * 7919 % 100000) / 100.0, "
+            "CAST(:end AS timestamp) - (g::float8 / :rows) * (CAST(:end AS timestamp) - CAST(:start AS timestamp)) "
+            "FROM generate_series(1, :rows) g"
+        ), {"users": USERS, "rows": ROWS, "start": start, "end": end})
+        await conn.execute(text(f"ANALYZE {schema}.orders"))
+        print(f"{schema}: {ROWS} строк за {time.perf_counter() - started:.1f} с")
+
+
+def scanned_relations(plan) -> int:
+    """Сколько таблиц (секций) реально просканировано: узлы с Relation Name, которые выполнялись"""
+    count = 1 if "Relation Name" in plan and plan.get("Actual Loops", 0) > 0 else 0
+    return count + sum(scanned_relations(child) for child in plan.get("Plans", []))
+
+
+async def run_case(conn, schema: str, call, stmt) -> dict:
+    timings = []
+    for _ in range(REPEATS):
+        async with AsyncSession(bind=conn) as db:
+            started = time.perf_counter()
+            await call(db)
+            timings.append((time.perf_counter() - started) * 1000)
+    sql = str(stmt.compile(
+        dialect=engine.dialect, schema_translate_map={None: schema}, render_schema_translate=True,
+        compile_kwargs={"literal_binds": True},
+    ))
+    plan = (await conn.exec_driver_sql("EXPLAIN (ANALYZE, FORMAT JSON) " + sql)).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return {"median_ms": round(statistics.median(timings), 2), "scanned_tables": scanned_relations(plan[0]["Plan"])}
+
+
+async def main():
+    end = datetime.combine(date.today(), datetime.min.time())
+    first_month = add_months(end.date().replace(day=1), -MONTHS)
+    last_day = OrderFilter(created_from=end - timedelta(days=1), created_to=end, sort="-created_at")
+    month_from = add_months(end.date().replace(day=1), -1)
+    month_to = end.date().replace(day=1)
+    user_month = OrderFilter(created_from=month_from, created_to=month_to)
+    columns = Order.__table__.columns
+
+    # Методы order_crud и их запросы для EXPLAIN
+    cases = {
+        "last_day": (
+            lambda db: order_crud.get_all_rows(db, last_day),
+            order_crud.select_orders(columns, filters=last_day),
+        ),
+        "user_last_month": (
+            lambda db: order_crud.get_rows_by_user_id(db, 42, user_month),
+            order_crud.select_orders(columns, 42, user_month),
+        ),
+        "daily_stats_last_month": (
+            lambda db: order_crud.get_daily_stats(db, month_from, month_to),
+            order_crud.daily_stats_statement(month_from, month_to),
+        ),
+        "by_id": (
+            lambda db: order_crud.get_row_by_id(db, ROWS // 2),
+            order_crud._select_row_by_id.params(id=ROWS // 2),
+        ),
+    }
+
+    results = {"rows": ROWS, "months": MONTHS}
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await create_tables(conn, first_month, end.date() + timedelta(days=1))
+        await fill(conn, first_month, end)
+
+        for name, schema in SCHEMAS.items():
+            translated = await conn.execution_options(schema_translate_map={None: schema})
+            results[name] = {
+                case: await run_case(translated, schema, call, stmt) for case, (call, stmt) in cases.items()
+            }
+
+            # Удаление самого старого месяца: DELETE по строкам или DROP секции
+            started = time.perf_counter()
+            if name == "heap":
+                await conn.execute(text(
+                    f"DELETE FROM {schema}.orders WHERE created_at < :oldest_end"
+                ), {"oldest_end": add_months(first_month, 1)})
+            else:
+                await conn.execute(text(f"DROP TABLE {schema}.{partition_name(first_month)}"))
+            results[name]["drop_oldest_month_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+        for schema in SCHEMAS.values():
+            await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    await engine.dispose()
+
+    for case in [*cases, "drop_oldest_month_ms"]:
+        heap, part = results["heap"][case], results["partitioned"][case]
+        if isinstance(heap, dict):
+            print(f"{case:24} обычная {heap['median_ms']:9.2f} мс ({heap['scanned_tables']} табл.)  "
+                  f"секции {part['median_ms']:9.2f} мс ({part['scanned_tables']} табл.)")
+        else:
+            print(f"{case:24} DELETE {heap:9.2f} мс  DROP секции {part:9.2f} мс")
+
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Проверка маршрутизации запросов между основным сервером БД и репликами.
+
+Вместо Postgres - отдельные файлы SQLite: в каждом одна строка users с именем узла,
+поэтому по результату чтения видно, какой узел ответил. Недоступная реплика - файл
+в несуществующем каталоге. Код выхода 1, если маршрутизация не совпала с ожидаемой.
+
+Запуск из корня репозитория: PYTHONPATH=. python tests/benchmarks/replica_routing_check.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from common.database.routing import ReplicaRouter, RoutingSession
+from common.models.base import Base
+from common.models.models import User
+
+STICKY_SECONDS = 0.2
+
+failures = []
+
+
+def expect(name: str, actual, expected):
+    ok = actual == expected
+    if not ok:
+        failures.append(name)
+    print(f"{'OK  ' if ok else 'FAIL'} {name}: {actual} (ожидается {expected})")
+
+
+async def node(path: str, name: str):
+    """Движок SQLite с одной строкой users, имя которой - имя узла"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User).values(name=name, email=f"{name}@example.com"))
+    return engine
+
+
+async def read_node(session_factory) -> str:
+    """Какой узел ответил на чтение в новой сессии"""
+    async with session_factory() as db:
+        return (await db.execute(select(User.name).limit(1))).scalar_one()
+
+
+async def main() -> int:
+    workdir = tempfile.mkdtemp()
+    primary = await node(os.path.join(workdir, "primary.db"), "primary")
+    replica1 = await node(os.path.join(workdir, "replica1.db"), "replica1")
+    replica2 = await node(os.path.join(workdir, "replica2.db"), "replica2")
+    broken = create_async_engine(f"sqlite+aiosqlite:///{workdir}/missing/replica3.db")
+
+    router = ReplicaRouter(primary, [replica1, replica2, broken], sticky_seconds=STICKY_SECONDS)
+    session_factory = sessionmaker(
+        primary, class_=AsyncSession, sync_session_class=RoutingSession,
+        router=router, expire_on_commit=False,
+    )
+
+    await router.check()
+    expect("исключена недоступная реплика", len(router.healthy), 2)
+
+    reads = [await read_node(session_factory) for _ in range(4)]
+    expect("чтения по кругу между репликами", reads, ["replica1", "replica2"] * 2)
+
+    async with session_factory() as db:
+        first = (await db.execute(select(User.name).limit(1))).scalar_one()
+        second = (await db.execute(select(User.email).limit(1))).scalar_one()
+        expect("одна реплика на сессию", second, f"{first}@example.com")
+
+    async with session_factory() as db:
+        db.add(User(name="written", email="written@example.com"))
+        await db.commit()
+        names = (await db.execute(select(User.name).order_by(User.id))).scalars().all()
+        expect("чтение после записи в сессии - основной сервер", names, ["primary", "written"])
+
+    expect("чтение сразу после записи - основной сервер", await read_node(session_factory), "primary")
+    await asyncio.sleep(STICKY_SECONDS)
+    expect("после окна - снова реплика", (await read_node(session_factory)).startswith("replica"), True)
+
+    router.replicas = [broken]
+    await router.check()
+    expect("без доступных реплик - основной сервер", await read_node(session_factory), "primary")
+
+    for engine in (primary, replica1, replica2, broken):
+        await engine.dispose()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Сравнение путей ответа GET /users/ и GET /orders/ для 10k строк:
+- orm: ORM-объекты + response_model + стандартный JSONResponse (как было)
+- rows: проекция колонок + прямая сериализация orjson (FastJSONResponse)
+
+Проверки (код выхода 1, если не прошли): оба пути отдают одинаковый JSON, цена заказа
+в ответе строками - число, как у response_model на pydantic v1 (на pydantic v2 response_model
+отдает Decimal строкой, поэтому цена сравнивается как число).
+
+БД - SQLite в памяти, поэтому замеряется только серверная часть без сети и Postgres.
+Запуск из корня репозитория: PYTHONPATH=. python tests/benchmarks/rest_serialization_bench.py
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+
+# Код REST API (app.schemas, app.responses)
+REST_API_PATH = os.getenv(
+    "REST_API_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "rest-api"),
+)
+sys.path.insert(0, REST_API_PATH)
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.responses import FastJSONResponse, rows_response
+from app.schemas import OrderResponse, UserResponse
+from common.models.base import Base
+from common.models.models import Order, User
+
+ROWS = int(os.getenv("BENCH_ROWS", "10000"))
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "20"))
+
+
+def create_session() -> Session:
+    """SQLite в памяти с ROWS пользователями и ROWS заказами"""
+    # Одно соединение на все потоки: TestClient выполняет приложение в своем потоке
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": f"User {i}", "email": f"user{i}@example.com", "created_at": now}
+            for i in range(ROWS)
+        ])
+        conn.execute(insert(Order), [
+            {"user_id": i + 1, "product_name": f"Product {i}", "price": Decimal(i % 1000) + Decimal("0.50"),
+             "created_at": now}
+            for i in range(ROWS)
+        ])
+    return Session(engine)
+
+
+def build_app(session: Session) -> FastAPI:
+    orm_app = FastAPI(default_response_class=JSONResponse)
+
+    @orm_app.get("/orm/users/", response_model=List[UserResponse])
+    async def get_users_orm():
+        users = session.execute(select(User)).scalars().all()
+        # Сбрасываем identity map, чтобы каждый запрос заново создавал объекты
+        session.expunge_all()
+        return [user for user in users]
+
+    @orm_app.get("/rows/users/", response_model=List[UserResponse], response_class=FastJSONResponse)
+    async def get_users_rows():
+        return rows_response(session.execute(select(*User.__table__.columns)).all())
+
+    @orm_app.get("/orm/orders/", response_model=List[OrderResponse])
+    async def get_orders_orm():
+        orders = session.execute(select(Order)).scalars().all()
+        session.expunge_all()
+        return [order for order in orders]
+
+    @orm_app.get("/rows/orders/", response_model=List[OrderResponse], response_class=FastJSONResponse)
+    async def get_orders_rows():
+        return rows_response(session.execute(select(*Order.__table__.columns)).all())
+
+    return orm_app
+
+
+def measure(client: TestClient, path: str):
+    """Среднее время ответа и размер тела"""
+    response = client.get(path)  # прогрев
+    assert response.status_code == 200 and len(response.json()) == ROWS
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        client.get(path)
+    elapsed = (time.perf_counter() - started) / ITERATIONS
+    return {"path": path, "avg_ms": elapsed * 1000, "rps": 1 / elapsed, "bytes": len(response.content)}
+
+
+def same_json(client: TestClient, resource: str) -> bool:
+    """Одинаковый JSON обоих путей; цена заказа в ответе строками - число"""
+    orm = client.get(f"/orm/{resource}/").json()
+    rows = client.get(f"/rows/{resource}/").json()
+    if resource == "orders":
+        if not all(isinstance(row["price"], (int, float)) for row in rows):
+            return False
+        orm = [dict(row, price=float(row["price"])) for row in orm]
+    return orm == rows
+
+
+def main() -> int:
+    print(f"Строк: {ROWS}, итераций: {ITERATIONS}")
+    session = create_session()
+    client = TestClient(build_app(session))
+
+    results = []
+    failures = []
+    for resource in ("users", "orders"):
+        pair = [measure(client, f"/orm/{resource}/"), measure(client, f"/rows/{resource}/")]
+        for result in pair:
+            print(f"{result['path']:<15} {result['avg_ms']:>9.1f} мс  {result['rps']:>7.1f} запросов/с  {result['bytes']} байт")
+        print(f"Ускорение: {pair[0]['avg_ms'] / pair[1]['avg_ms']:.1f}x")
+        if not same_json(client, resource):
+            failures.append(f"/{resource}/: ответ строками отличается от ответа через response_model")
+        results += pair
+
+    os.makedirs("results/benchmarks", exist_ok=True)
+    with open("results/benchmarks/rest_serialization.json", "w") as f:
+        json.dump(results, f, indent=2)
+
+    for failure in failures:
+        print(f"ОШИБКА: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Чтение 100k заказов: ORM-объекты против строк Core.
+- orm: order_crud.get_all - объекты Order в identity map сессии (как было)
+- rows: order_crud.get_all_rows - компактные Row без ORM-состояния (используется всеми API)
+
+Для каждого варианта: лучшее время стены и CPU из BENCH_ITERATIONS прогонов
+и пик памяти Python (tracemalloc) при загрузке. БД - SQLite в памяти.
+Запуск из корня репозитория: PYTHONPATH=. python tests/benchmarks/row_read_bench.py
+"""
+
+import asyncio
+import json
+import os
+import time
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from common.database.crud import order_crud
+from common.models.base import Base
+from common.models.models import Order, User
+
+ORDERS = int(os.getenv("BENCH_ORDERS", "100000"))
+USERS = 1000
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "3"))
+RESULTS_FILE = os.getenv("BENCH_RESULTS", "results/benchmarks/row_read.json")
+
+VARIANTS = {
+    "orm": order_crud.get_all,
+    "rows": order_crud.get_all_rows,
+}
+
+
+async def fill(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        now = datetime.now()
+        await conn.execute(insert(User), [
+            {"name": f"user {i}", "email": f"user{i}@example.com", "created_at": now}
+            for i in range(USERS)
+        ])
+        await conn.execute(insert(Order), [
+            {
+                "user_id": i % USERS + 1,
+                "product_name": f"product {i}",
+                "price": Decimal(i % 10000) / 100,
+                "created_at": now,
+            }
+            for i in range(ORDERS)
+        ])
+
+
+async def measure(session_factory, load) -> dict:
+    wall, cpu = [], []
+    for _ in range(ITERATIONS):
+        async with session_factory() as db:
+            wall_started, cpu_started = time.perf_counter(), time.process_time()
+            result = await load(db)
+            wall.append(time.perf_counter() - wall_started)
+            cpu.append(time.process_time() - cpu_started)
+            assert len(result) == ORDERS
+            del result
+
+    # Память - отдельным прогоном: tracemalloc замедляет выполнение
+    async with session_factory() as db:
+        tracemalloc.start()
+        result = await load(db)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+
+    return {
+        "wall_s": round(min(wall), 3),
+        "cpu_s": round(min(cpu), 3),
+        "peak_mb": round(peak / 1024 / 1024, 1),
+    }
+
+
+async def main():
+    engine = create_async_engine(
+        "sqlite+aiosqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    await fill(engine)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    results = {"orders": ORDERS, "iterations": ITERATIONS}
+    for name, load in VARIANTS.items():
+        results[name] = await measure(session_factory, load)
+        r = results[name]
+        print(f"{name:5} стена {r['wall_s']:7.3f} с  CPU {r['cpu_s']:7.3f} с  пик памяти {r['peak_mb']:7.1f} МБ")
+    await engine.dispose()
+
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Первые запросы после старта: без прогрева и после прогрева пула (common/database/warmup.py).
+
+Для каждого раунда создается новый движок, как при запуске сервиса: одно соединение уже
+открыто проверкой схемы, остальные - нет. В режиме warm перед нагрузкой выполняется
+warm_engine. Затем BENCH_CONCURRENCY одновременных "запросов" (заказы пользователя и сам
+пользователь, как GET /orders/user/{id}) - первая волна - и столько же волн после нее.
+Сравниваются задержки первой волны и установившиеся.
+
+Нужен Postgres (переменные POSTGRES_*, как у API) со схемой после миграций.
+Запуск из корня репозитория: PYTHONPATH=. python tests/benchmarks/warmup_bench.py
+"""
+
+import asyncio
+import json
+import os
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from common.database.connection import DATABASE_URL, _create_engine
+from common.database.crud import order_crud, user_crud
+from common.database.warmup import warm_engine
+
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "5"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "5"))
+WAVES = int(os.getenv("BENCH_WAVES", "20"))
+RESULTS_FILE = os.getenv("BENCH_RESULTS", "results/benchmarks/warmup.json")
+
+
+async def request(engine, user_id: int) -> float:
+    started = time.perf_counter()
+    async with AsyncSession(engine) as db:
+        await user_crud.get_row_by_id(db, user_id)
+        await order_crud.get_rows_by_user_id(db, user_id)
+    return (time.perf_counter() - started) * 1000
+
+
+async def wave(engine, number: int) -> list:
+    return await asyncio.gather(*(request(engine, number * CONCURRENCY + i + 1) for i in range(CONCURRENCY)))
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))], 2)
+
+
+async def run(mode: str) -> dict:
+    first, steady = [], []
+    for _ in range(ROUNDS):
+        engine = _create_engine(DATABASE_URL)
+        # Как при старте сервиса: проверка схемы уже открыла одно соединение
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        if mode == "warm":
+            await warm_engine(engine, CONCURRENCY)
+        first += await wave(engine, 0)
+        for number in range(1, WAVES + 1):
+            steady += await wave(engine, number)
+        await engine.dispose()
+    return {
+        "first_wave_ms": {"p50": percentile(first, 0.5), "max": round(max(first), 2)},
+        "steady_ms": {"p50": percentile(steady, 0.5), "p99": percentile(steady, 0.99)},
+    }
+
+
+async def main():
+    results = {"concurrency": CONCURRENCY, "rounds": ROUNDS}
+    for mode in ("cold", "warm"):
+        results[mode] = await run(mode)
+        first, steady = results[mode]["first_wave_ms"], results[mode]["steady_ms"]
+        print(f"{mode:5} первая волна p50 {first['p50']:8.2f} мс, max {first['max']:8.2f} мс; "
+              f"дальше p50 {steady['p50']:6.2f} мс, p99 {steady['p99']:6.2f} мс")
+
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+#!/bin/bash
+
+# Время холодного старта API: от пересоздания контейнера до первого успешного ответа
+# и до готовности после прогрева (GET /ready).
+# Сравнивает SCHEMA_STARTUP=verify (только сверка версии схемы) и create (создание схемы сервисом).
+# Запуск на хосте из корня репозитория (нужны docker compose, curl и grpcurl): ./tests/cold-start.sh
+set -e
+
+RUNS="${RUNS:-3}"
+RESULTS=results/benchmarks/cold_start.csv
+mkdir -p results/benchmarks
+
+# Первый запрос к сервису; успех - сервис принимает запросы
+first_request() {
+  case "$1" in
+    rest-api) curl -sf -o /dev/null http://localhost:8000/ ;;
+    graphql-api) curl -sf -o /dev/null -H 'Content-Type: application/json' \
+      -d '{"query": "{ __typename }"}' http://localhost:8080/graphql ;;
+    grpc-api) grpcurl -plaintext localhost:50051 list > /dev/null 2>&1 ;;
+  esac
+}
+
+# Готовность после прогрева (GET /ready, у gRPC - на служебном порту)
+ready() {
+  case "$1" in
+    rest-api) curl -sf -o /dev/null http://localhost:8000/ready ;;
+    graphql-api) curl -sf -o /dev/null http://localhost:8080/ready ;;
+    grpc-api) curl -sf -o /dev/null http://localhost:9091/ready ;;
+  esac
+}
+
+now_ms() {
+  echo $(( $(date +%s%N) / 1000000 ))
+}
+
+# БД и схема готовы заранее: миграции - отдельный шаг и в замер не входят
+docker compose up -d db
+docker compose run --rm migrate
+
+echo "service,mode,run,ms,ready_ms" > "$RESULTS"
+for SERVICE in rest-api graphql-api grpc-api; do
+  for MODE in verify create; do
+    for RUN in $(seq 1 "$RUNS"); do
+      docker compose stop "$SERVICE" > /dev/null 2>&1
+      START=$(now_ms)
+      SCHEMA_STARTUP=$MODE docker compose up -d --no-deps --force-recreate "$SERVICE" > /dev/null 2>&1
+      until first_request "$SERVICE"; do
+        sleep 0.05
+      done
+      MS=$(( $(now_ms) - START ))
+      until ready "$SERVICE"; do
+        sleep 0.05
+      done
+      READY_MS=$(( $(now_ms) - START ))
+      echo "$SERVICE,$MODE,$RUN,$MS,$READY_MS" >> "$RESULTS"
+      echo "$SERVICE ($MODE, запуск $RUN): первый ответ $MS мс, готов после прогрева $READY_MS мс"
+    done
+  done
+done
+
+# Возвращаем сервисы в обычный режим
+docker compose up -d --no-deps --force-recreate rest-api graphql-api grpc-api > /dev/null 2>&1
+
+echo "Среднее время до первого ответа и до готовности, мс:"
+awk -F, 'NR > 1 { sum[$1 " " $2] += $4; ready[$1 " " $2] += $5; n[$1 " " $2]++ } END { for (k in sum) printf "  %-20s %8.0f %8.0f\n", k, sum[k] / n[k], ready[k] / n[k] }' "$RESULTS" | sort
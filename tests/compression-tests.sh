@@ -0,0 +1,36 @@
+#!/bin/bash
+
+# Сравнение сжатия ответов: задержка и объем трафика (k6) против CPU сервера (/metrics)
+mkdir -p results/compression
+
+REST_METRICS_URL="${REST_API_URL}/metrics"
+GRAPHQL_METRICS_URL="${GRAPHQL_API_URL%/graphql}/metrics"
+SUMMARY=results/compression/cpu_summary.csv
+
+# Процессорное время сервиса в секундах (стандартная метрика prometheus_client)
+cpu_seconds() {
+  curl -s "$1" | grep '^process_cpu_seconds_total' | awk '{print $2}'
+}
+
+echo "encoding,vus,rest_cpu_seconds,graphql_cpu_seconds" > "$SUMMARY"
+
+for ENCODING in identity gzip br zstd; do
+  for VUS in 1 10 50; do
+    echo "Сжатие: $ENCODING, VU: $VUS"
+
+    REST_CPU_BEFORE=$(cpu_seconds "$REST_METRICS_URL")
+    GRAPHQL_CPU_BEFORE=$(cpu_seconds "$GRAPHQL_METRICS_URL")
+
+    k6 run --env ENCODING=$ENCODING --stage 30s:$VUS k6-scripts/compression_test.js \
+      --out json=results/compression/${ENCODING}_${VUS}vu.json
+
+    REST_CPU_AFTER=$(cpu_seconds "$REST_METRICS_URL")
+    GRAPHQL_CPU_AFTER=$(cpu_seconds "$GRAPHQL_METRICS_URL")
+
+    REST_CPU=$(echo "$REST_CPU_AFTER - $REST_CPU_BEFORE" | bc)
+    GRAPHQL_CPU=$(echo "$GRAPHQL_CPU_AFTER - $GRAPHQL_CPU_BEFORE" | bc)
+    echo "$ENCODING,$VUS,$REST_CPU,$GRAPHQL_CPU" >> "$SUMMARY"
+  done
+done
+
+echo "Тесты сжатия завершены. CPU сервисов: $SUMMARY, трафик (data_received) и задержки: results/compression/"
@@ -0,0 +1,67 @@
+import http from 'k6/http';
+import { check, sleep } from 'k6';
+import { Counter, Rate, Trend } from 'k6/metrics';
+
+// Пользовательские метрики
+const successRate = new Rate('success_rate');
+const errorCounter = new Counter('errors');
+const restOrdersDuration = new Trend('rest_orders_duration');
+const graphqlOrdersDuration = new Trend('graphql_orders_duration');
+
+// Алгоритм сжатия: gzip, br, zstd или identity (без сжатия)
+const ENCODING = __ENV.ENCODING || 'identity';
+
+// Запрос на получение всех заказов
+const ordersQuery = `
+query {
+  orders {
+    id
+    userId
+    productName
+    price
+    createdAt
+  }
+}
+`;
+
+// Количество VU задается параметром запуска: --stage 30s:N
+export const options = {
+  thresholds: {
+    success_rate: ['rate>0.95'], // Успешных запросов должно быть более 95%
+  },
+};
+
+export default function () {
+  const headers = { 'Accept-Encoding': ENCODING };
+
+  // Список заказов через REST API
+  const restResponse = http.get(`${__ENV.REST_API_URL}/orders/`, { headers });
+  const restSuccess = check(restResponse, {
+    'rest status was 200': (r) => r.status === 200,
+    'rest encoding matches': (r) => ENCODING === 'identity' || r.headers['Content-Encoding'] === ENCODING,
+  });
+  successRate.add(restSuccess);
+  restOrdersDuration.add(restResponse.timings.duration);
+  if (!restSuccess) {
+    errorCounter.add(1);
+  }
+
+  // Список заказов через GraphQL API
+  const graphqlResponse = http.post(`${__ENV.GRAPHQL_API_URL}`,
+    JSON.stringify({ query: ordersQuery }),
+    {
+      headers: { ...headers, 'Content-Type': 'application/json' },
+    }
+  );
+  const graphqlSuccess = check(graphqlResponse, {
+    'graphql status was 200': (r) => r.status === 200,
+    'graphql response has no errors': (r) => !JSON.parse(r.body).errors,
+  });
+  successRate.add(graphqlSuccess);
+  graphqlOrdersDuration.add(graphqlResponse.timings.duration);
+  if (!graphqlSuccess) {
+    errorCounter.add(1);
+  }
+
+  sleep(1);
+}
@@ -0,0 +1,56 @@
+import http from 'k6/http';
+import { check, sleep } from 'k6';
+import { Counter, Trend } from 'k6/metrics';
+
+// Пользовательские метрики
+const fullReqDuration = new Trend('full_req_duration');
+const notModifiedReqDuration = new Trend('not_modified_req_duration');
+const notModifiedCounter = new Counter('not_modified');
+const errorCounter = new Counter('errors');
+
+export const options = {
+  vus: 10,
+  duration: '30s',
+  thresholds: {
+    errors: ['count<1'], // Ошибок быть не должно
+  },
+};
+
+// Опрос списков с If-None-Match: при неизменных данных сервер отвечает 304 без тела
+export default function () {
+  for (const path of ['/users/', '/orders/']) {
+    const fullResponse = http.get(`${__ENV.REST_API_URL}${path}`);
+    const etag = fullResponse.headers['Etag'];
+
+    const fullSuccess = check(fullResponse, {
+      'full status was 200': (r) => r.status === 200,
+      'full response has ETag': () => !!etag,
+    });
+    fullReqDuration.add(fullResponse.timings.duration);
+
+    if (!fullSuccess) {
+      errorCounter.add(1);
+      continue;
+    }
+
+    const conditionalResponse = http.get(`${__ENV.REST_API_URL}${path}`, {
+      headers: { 'If-None-Match': etag },
+    });
+
+    // Данные могли измениться между запросами, поэтому 200 тоже допустим
+    const conditionalSuccess = check(conditionalResponse, {
+      'conditional status was 304 or 200': (r) => r.status === 304 || r.status === 200,
+    });
+
+    if (conditionalResponse.status === 304) {
+      notModifiedCounter.add(1);
+      notModifiedReqDuration.add(conditionalResponse.timings.duration);
+    }
+
+    if (!conditionalSuccess) {
+      errorCounter.add(1);
+    }
+  }
+
+  sleep(1);
+}
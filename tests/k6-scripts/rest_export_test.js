@@ -0,0 +1,46 @@
+import http from 'k6/http';
+import { check, sleep } from 'k6';
+import { Counter, Trend } from 'k6/metrics';
+
+// Пользовательские метрики: время до первого байта (TTFB) и полное время ответа
+const listTtfb = new Trend('list_ttfb');
+const exportTtfb = new Trend('export_ttfb');
+const listDuration = new Trend('list_duration');
+const exportDuration = new Trend('export_duration');
+const errorCounter = new Counter('errors');
+
+export const options = {
+  vus: 5,
+  duration: '30s',
+  thresholds: {
+    errors: ['count<1'], // Ошибок быть не должно
+  },
+};
+
+export default function () {
+  // Тело не сохраняется на стороне k6, замеряются только тайминги
+  const params = { responseType: 'none' };
+
+  // Список заказов: сервер формирует весь ответ в памяти
+  const listResponse = http.get(`${__ENV.REST_API_URL}/orders/`, params);
+  // Потоковая выгрузка: первый фрагмент отправляется сразу после первой пачки строк
+  const exportResponse = http.get(`${__ENV.REST_API_URL}/orders/export`, params);
+
+  const success = check(listResponse, {
+    'list status was 200': (r) => r.status === 200,
+  }) && check(exportResponse, {
+    'export status was 200': (r) => r.status === 200,
+    'export is ndjson': (r) => (r.headers['Content-Type'] || '').startsWith('application/x-ndjson'),
+  });
+
+  if (!success) {
+    errorCounter.add(1);
+  }
+
+  listTtfb.add(listResponse.timings.waiting);
+  exportTtfb.add(exportResponse.timings.waiting);
+  listDuration.add(listResponse.timings.duration);
+  exportDuration.add(exportResponse.timings.duration);
+
+  sleep(1);
+}
@@ -0,0 +1,21 @@
+import http from 'k6/http';
+import { check } from 'k6';
+
+// Пропускная способность при постоянном числе VU (закрытая нагрузка): сколько запросов
+// в секунду успевает обработать сервис. Запускается из tests/worker-scaling.sh (разное число
+// рабочих процессов) и tests/runtime-bench.sh (asyncio и uvloop)
+const API = __ENV.API || 'rest';
+
+const usersQuery = JSON.stringify({ query: '{ users { id name email } }' });
+
+export const options = {
+  vus: Number(__ENV.VUS || 50),
+  duration: __ENV.DURATION || '30s',
+};
+
+export default function () {
+  const response = API === 'graphql'
+    ? http.post(__ENV.GRAPHQL_API_URL, usersQuery, { headers: { 'Content-Type': 'application/json' } })
+    : http.get(`${__ENV.REST_API_URL}/users/`);
+  check(response, { 'status was 200': (r) => r.status === 200 });
+}
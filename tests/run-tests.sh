@@ -24,6 +24,12 @@ k6 run --env STAGE=2 --stage 30s:10 k6-scripts/rest_load_test.js --out json=resu
 # Этап 3: 50 VU
 k6 run --env STAGE=3 --stage 30s:50 k6-scripts/rest_load_test.js --out json=results/rest/load_test_stage3.json
 
+echo "Запуск теста условных запросов (ETag) для REST API..."
+k6 run k6-scripts/rest_conditional_test.js --out json=results/rest/conditional_test.json
+
+echo "Запуск теста потоковой выгрузки для REST API..."
+k6 run k6-scripts/rest_export_test.js --out json=results/rest/export_test.json
+
 
 echo "==================================="
 echo "Запуск тестов GraphQL API"
@@ -46,10 +52,71 @@ k6 run --env STAGE=3 --stage 30s:50 k6-scripts/graphql_load_test.js --out json=r
 echo "Запуск теста overfetching для GraphQL API..."
 k6 run k6-scripts/graphql_overfetching_test.js --out json=results/graphql/overfetching_test.json
 
+echo "==================================="
+echo "Запуск тестов сжатия ответов"
+echo "==================================="
+./compression-tests.sh
+
 # Запускаем тесты gRPC, если они не запускаются
 echo "Запуск тестов gRPC API..."
 ./ghz-tests.sh
 
+# Python-бенчмарки серверных компонентов
+echo "==================================="
+echo "Запуск Python-бенчмарков"
+echo "==================================="
+mkdir -p results/benchmarks
+
+echo "Бенчмарк логирования..."
+python3 benchmarks/logging_bench.py
+
+echo "Бенчмарк сериализации ответа REST API (GET /users/ и /orders/, 10k строк)..."
+python3 benchmarks/rest_serialization_bench.py \
+    || echo "ВНИМАНИЕ: ответ строками отличается от ответа через response_model"
+
+echo "Бенчмарк накладных расходов частых запросов CRUD (сборка запроса на вызов и заранее собранный)..."
+python3 benchmarks/crud_statement_cache_bench.py
+
+echo "Бенчмарк объединения одинаковых одновременных чтений (GET /users/, 50 клиентов)..."
+python3 benchmarks/coalescing_bench.py
+
+echo "Бенчмарк групповой фиксации заказов (фиксация на заказ и пачками)..."
+python3 benchmarks/group_commit_bench.py \
+    || echo "ВНИМАНИЕ: групповая фиксация в Postgres не прошла проверку изоляции ошибок"
+
+echo "Бенчмарк чтения 100k заказов: ORM-объекты и строки Core..."
+python3 benchmarks/row_read_bench.py
+
+echo "Бенчмарк первых запросов после старта: без прогрева пула и после него..."
+python3 benchmarks/warmup_bench.py
+
+echo "Бенчмарк массовой загрузки и выгрузки заказов (построчно и через COPY)..."
+python3 benchmarks/copy_bulk_bench.py
+
+echo "Бенчмарк секционирования заказов по месяцам (обычная таблица и секции)..."
+python3 benchmarks/partition_bench.py
+
+echo "Проверка планов запросов с фильтрами заказов (EXPLAIN)..."
+python3 benchmarks/explain_indexes.py || echo "ВНИМАНИЕ: фильтры заказов не используют ожидаемые индексы"
+
+echo "Время импорта сервисов при холодном старте (здесь - REST API, остальные: ./tests/startup-imports.sh)..."
+python3 benchmarks/import_time_report.py || echo "ВНИМАНИЕ: импорт сервиса дольше бюджета или при старте загружаются необязательные модули"
+
+echo "Проверка контроля допуска: предел одновременных запросов и лимит частоты..."
+python3 benchmarks/admission_check.py || echo "ВНИМАНИЕ: контроль допуска не снизил задержки под перегрузкой или не соблюдает квоты"
+
+echo "Проверка trailing metadata gRPC: отказ допуска с grpc-retry-pushback-ms и server-timing..."
+python3 benchmarks/grpc_trailers_check.py || echo "ВНИМАНИЕ: интерцепторы gRPC теряют trailing metadata отказа допуска или обработчика"
+
+echo "Проверка сроков запросов и отмены обработки при отключении клиента..."
+python3 benchmarks/deadline_check.py || echo "ВНИМАНИЕ: обработка не отменяется по сроку запроса или при отключении клиента"
+
+echo "Проверка ключей идемпотентности: повторы создания заказов без дубликатов..."
+python3 benchmarks/idempotency_check.py || echo "ВНИМАНИЕ: повторы запросов с ключом идемпотентности создали дубликаты"
+
+echo "Проверка маршрутизации чтения на реплики..."
+python3 benchmarks/replica_routing_check.py || echo "ВНИМАНИЕ: маршрутизация запросов между основным сервером и репликами не совпала с ожидаемой"
+
 # Запускаем анализ результатов
 echo "Анализ результатов тестирования..."
 python3 analyze.py
\ No newline at end of file
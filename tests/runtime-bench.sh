@@ -0,0 +1,67 @@
+#!/bin/bash
+
+# Пропускная способность каждого API на стандартном asyncio (и h11 у REST и GraphQL)
+# и на uvloop (и httptools): common/runtime.py, переменные *_EVENT_LOOP и *_HTTP_PARSER.
+# Нагрузка - постоянное число соединений: k6 для REST и GraphQL, ghz для gRPC.
+# Запуск на хосте из корня репозитория (нужны docker compose, curl и python3): ./tests/runtime-bench.sh
+set -e
+
+CONCURRENCY="${CONCURRENCY:-50}"
+DURATION="${DURATION:-30s}"
+RESULTS=results/benchmarks/runtime.csv
+mkdir -p results/benchmarks
+
+ready_url() {
+  case "$1" in
+    rest-api) echo http://localhost:8000/ready ;;
+    graphql-api) echo http://localhost:8080/ready ;;
+    grpc-api) echo http://localhost:9091/ready ;;
+  esac
+}
+
+# Запросы в секунду и p95 в мс из отчета k6 (--summary-export) или ghz (--format json)
+summary() {
+  python3 - "$1" <<'PY'
+import json, sys
+report = json.load(open(sys.argv[1]))
+if "metrics" in report:
+    metrics = report["metrics"]
+    print(f"{metrics['http_reqs']['rate']:.1f},{metrics['http_req_duration']['p(95)']:.1f}")
+else:
+    p95 = next(item["latency"] for item in report["latencyDistribution"] if item["percentage"] == 95)
+    print(f"{report['rps']:.1f},{p95 / 1e6:.1f}")
+PY
+}
+
+docker compose up -d db
+docker compose run --rm migrate
+
+echo "service,runtime,rps,p95_ms" > "$RESULTS"
+for SERVICE in rest-api graphql-api grpc-api; do
+  PREFIX=$(echo "${SERVICE%-api}" | tr '[:lower:]' '[:upper:]')
+  for RUNTIME in asyncio uvloop; do
+    if [ "$RUNTIME" = uvloop ]; then LOOP=uvloop; PARSER=httptools; else LOOP=asyncio; PARSER=h11; fi
+    env "${PREFIX}_EVENT_LOOP=$LOOP" "${PREFIX}_HTTP_PARSER=$PARSER" \
+      docker compose up -d --no-deps --force-recreate "$SERVICE" > /dev/null 2>&1
+    until curl -sf -o /dev/null "$(ready_url "$SERVICE")"; do
+      sleep 0.2
+    done
+
+    REPORT="results/benchmarks/runtime_${SERVICE}_${RUNTIME}.json"
+    if [ "$SERVICE" = grpc-api ]; then
+      docker compose run --rm --no-deps -T tests ghz --proto /tests/protos/service.proto \
+        --call usersorders.UserService.GetUsers --insecure --concurrency "$CONCURRENCY" \
+        --duration "$DURATION" grpc-api:50051 --format json > "$REPORT"
+    else
+      docker compose run --rm --no-deps tests k6 run --quiet -e API="${SERVICE%-api}" \
+        -e VUS="$CONCURRENCY" -e DURATION="$DURATION" \
+        --summary-export "$REPORT" k6-scripts/worker_scaling_test.js > /dev/null
+    fi
+    LINE=$(summary "$REPORT")
+    echo "$SERVICE,$RUNTIME,$LINE" >> "$RESULTS"
+    echo "$SERVICE ($RUNTIME) - запросов/с и p95 (мс): $LINE"
+  done
+done
+
+# Возвращаем сервисы в обычный режим
+docker compose up -d --no-deps --force-recreate rest-api graphql-api grpc-api > /dev/null 2>&1
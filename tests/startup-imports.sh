@@ -0,0 +1,19 @@
+#!/bin/bash
+
+# Отчет о времени импорта и проверка бюджета холодного старта для всех трех сервисов,
+# каждый - в своем образе (там установлены его зависимости). БД для импорта не нужна.
+# Запуск на хосте из корня репозитория: ./tests/startup-imports.sh
+# Бюджет: IMPORT_BUDGET_MS (по умолчанию 2000 мс)
+
+mkdir -p results/benchmarks
+STATUS=0
+for SERVICE in rest-api graphql-api grpc-api; do
+  docker compose run --rm --no-deps -T \
+    -v "$PWD/tests/benchmarks:/bench" -v "$PWD/results:/results" \
+    -e SERVICE_DIR=/app -e SERVICES_ROOT=/app \
+    -e IMPORT_BUDGET_MS="${IMPORT_BUDGET_MS:-2000}" \
+    -e BENCH_RESULTS="/results/benchmarks/import_time_${SERVICE}.json" \
+    "$SERVICE" python /bench/import_time_report.py "$SERVICE" || STATUS=1
+done
+
+exit $STATUS
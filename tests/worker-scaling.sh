@@ -0,0 +1,46 @@
+#!/bin/bash
+
+# Масштабирование REST и GraphQL API по рабочим процессам: пропускная способность
+# (k6, постоянное число VU) при WEB_CONCURRENCY из WORKERS. Бюджет соединений с БД
+# (DB_CONNECTION_BUDGET) один на все процессы, поэтому растет только число ядер.
+# Запуск на хосте из корня репозитория (нужны docker compose, curl и python3): ./tests/worker-scaling.sh
+set -e
+
+WORKERS="${WORKERS:-1 2 4}"
+VUS="${VUS:-50}"
+DURATION="${DURATION:-30s}"
+RESULTS=results/benchmarks/worker_scaling.csv
+COMPOSE="docker compose -f docker-compose.yml -f docker-compose.workers.yml"
+mkdir -p results/benchmarks
+
+ready_url() {
+  case "$1" in
+    rest-api) echo http://localhost:8000/ready ;;
+    graphql-api) echo http://localhost:8080/ready ;;
+  esac
+}
+
+$COMPOSE up -d db
+$COMPOSE run --rm migrate
+
+echo "service,workers,rps,p95_ms" > "$RESULTS"
+for SERVICE in rest-api graphql-api; do
+  API="${SERVICE%-api}"
+  for W in $WORKERS; do
+    WEB_CONCURRENCY=$W $COMPOSE up -d --no-deps --force-recreate "$SERVICE" > /dev/null 2>&1
+    until curl -sf -o /dev/null "$(ready_url "$SERVICE")"; do
+      sleep 0.2
+    done
+
+    SUMMARY="results/benchmarks/worker_scaling_${API}_${W}.json"
+    $COMPOSE run --rm --no-deps tests k6 run --quiet -e API="$API" -e VUS="$VUS" -e DURATION="$DURATION" \
+      --summary-export "$SUMMARY" k6-scripts/worker_scaling_test.js > /dev/null
+    LINE=$(python3 -c "import json, sys; m = json.load(open(sys.argv[1]))['metrics']; \
+print(f\"{m['http_reqs']['rate']:.1f},{m['http_req_duration']['p(95)']:.1f}\")" "$SUMMARY")
+    echo "$SERVICE,$W,$LINE" >> "$RESULTS"
+    echo "$SERVICE, процессов: $W - запросов/с и p95 (мс): $LINE"
+  done
+done
+
+# Возвращаем сервисы в обычный режим (один процесс uvicorn)
+docker compose up -d --no-deps --force-recreate rest-api graphql-api > /dev/null 2>&1